@@ -1,14 +1,24 @@
 # -*- coding: utf-8 -*-
-'''Python Project中常用的函數、數據結構、修飾器等'''
+'''Python Project中常用的函數、數據結構、修飾器等。各子package在第一次訪問其名稱時才會被import'''
 
-from .utils import *
-'''常用的工具函數'''
+from typing import TYPE_CHECKING
+from . import utils
+from .utils.LazyImportUtils import setupLazyImport
 
-from .base_class import *
-'''常用的基類'''
+setupLazyImport(globals(), {
+    # 常用的工具函數(utils本身也是延遲導入，import它不會載入任何子模組)
+    'utils': utils.__all__,
+    # 常用的基類
+    'base_class': ['CrossModuleClass', 'CrossModuleClassMeta', 'CrossModuleEnum', 'CrossModuleEnumMeta', 'Singleton'],
+    # 常用的數據結構
+    'data_struct': ['Event', 'TYPE_CHECK_MODES', 'AsyncEvent', 'ListenerError', 'MultiKeyDict', 'ConcurrentMultiKeyDict', 'CacheMultiKeyDict'],
+    # 常用的修飾器
+    'decorator': ['ChainFunc', 'OSType', 'WinFunction', 'StaticWinFunction', 'MacFunction', 'StaticMacFunction', 'LinuxFunction',
+                  'StaticLinuxFunction', 'JavaFunction', 'StaticJavaFunction'],
+})
 
-from .data_struct import *
-'''常用的數據結構'''
-
-from .decorator import *
-'''常用的修飾器'''
+if TYPE_CHECKING:
+    from .utils import *
+    from .base_class import *
+    from .data_struct import *
+    from .decorator import *
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+'''benchmark腳本共用的工具。此package通常以目錄名被import(如source.PyProjectUtils)，這裡把上層目錄加入sys.path並以目錄名import'''
+
+import os, sys, time, statistics
+from typing import Callable
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = os.path.basename(PACKAGE_DIR)
+
+def importPackage():
+    '''import此package並返回'''
+    parentDir = os.path.dirname(PACKAGE_DIR)
+    if parentDir not in sys.path:
+        sys.path.insert(0, parentDir)
+    return __import__(PACKAGE_NAME)
+
+def bench(func: Callable, repeat: int = 5, number: int = 1) -> float:
+    '''運行func number次為一輪，共repeat輪，返回每次調用的最佳耗時(秒)'''
+    results = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        results.append((time.perf_counter() - start) / number)
+    return min(results)
+
+def median(values) -> float:
+    return statistics.median(values)
+
+def printTable(headers, rows):
+    '''以簡單的對齊格式打印結果表'''
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(h)), *(len(row[i]) for row in rows)) if rows else len(str(h)) for i, h in enumerate(headers)]
+    print('  '.join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print('  '.join('-' * w for w in widths))
+    for row in rows:
+        print('  '.join(cell.ljust(w) for cell, w in zip(row, widths)))
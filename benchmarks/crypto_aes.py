@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+'''
+AES文件加解密吞吐量(MB/s): 舊版AES-CBC(legacy) 對比 分塊AES-GCM容器(單線程與線程池)，
+以及在大文件末尾讀取一小段: decrypt_range 對比 完整解密。
+分塊格式的加解密數字(包括decrypt_range)都包含每次調用一次的scrypt密鑰派生(密鑰不會被緩存)。
+用法: python benchmarks/crypto_aes.py [--size 256] [--chunk-size 1024] [--workers 4] [--range 4096]
+'''
+
+import os, argparse, shutil, tempfile
+from common import importPackage, printTable, bench
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=256, help='明文大小(MB)')
+    parser.add_argument('--chunk-size', type=int, default=1024, help='分塊大小(KB)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--range', type=int, default=4096, help='隨機讀取的字節數')
+    args = parser.parse_args()
+
+    crypto = importPackage().utils.CryptoUtils
+    directory = tempfile.mkdtemp()
+    try:
+        plain = os.path.join(directory, 'plain.bin')
+        with open(plain, 'wb') as f:
+            for _ in range(args.size):
+                f.write(os.urandom(1 << 20))
+        chunkSize = args.chunk_size * 1024
+        legacyPath = crypto.encrypt_file('key', plain, outPath=os.path.join(directory), legacy=True)
+        os.rename(legacyPath, legacyPath + '.cbc')
+        legacyPath += '.cbc'
+
+        def chunked(workers):
+            return crypto.encrypt_file('key', plain, chunksize=chunkSize, workers=workers)
+
+        rows = []
+        encLegacy = bench(lambda: crypto.encrypt_file('key', plain, legacy=True), repeat=3)
+        decLegacy = bench(lambda: crypto.decrypt_file('key', legacyPath), repeat=3)
+        rows.append(('AES-CBC (legacy)', f'{args.size / encLegacy:,.0f}', f'{args.size / decLegacy:,.0f}'))
+        for workers in sorted({1, args.workers}):
+            enc = bench(lambda: chunked(workers), repeat=3)
+            chunkedPath = chunked(workers)
+            dec = bench(lambda: crypto.decrypt_file('key', chunkedPath, workers=workers), repeat=3)
+            rows.append((f'chunked AES-GCM, workers={workers}', f'{args.size / enc:,.0f}', f'{args.size / dec:,.0f}'))
+        with open(plain, 'rb') as f:
+            assert open(crypto.decrypt_file('key', chunkedPath), 'rb').read() == f.read()
+        printTable((f'{args.size}MB, chunk {args.chunk_size}KB', 'encrypt MB/s', 'decrypt MB/s'), rows)
+        print()
+
+        offset = (args.size << 20) - args.range - 12345
+        with open(plain, 'rb') as f:
+            f.seek(offset)
+            expected = f.read(args.range)
+        assert crypto.decrypt_range('key', chunkedPath, offset, args.range) == expected
+        ranged = bench(lambda: crypto.decrypt_range('key', chunkedPath, offset, args.range), repeat=5)
+        printTable((f'read {args.range} bytes near the end', 'seconds'), [
+            ('legacy: decrypt whole file', f'{decLegacy:.4f}'),
+            ('decrypt_range (incl. scrypt)', f'{ranged:.6f}'),
+        ])
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main()
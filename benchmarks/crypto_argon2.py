@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+'''
+Argon2吞吐量(hashes/s): 先用 Argon2Hasher.calibrate 按目標延遲選出參數，再比較
+舊版寫法(每次新建PasswordHasher、逐個運行) 對比 Argon2Hasher.hash 逐個 對比 hash_batch / verify_batch(進程池)
+以及 asyncio 中的 averify_batch。
+用法: python benchmarks/crypto_argon2.py [--target-ms 50] [--batch 64] [--workers 4]
+'''
+
+import os, argparse, asyncio, time
+import argon2
+from common import importPackage, printTable
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--target-ms', type=float, default=50)
+    parser.add_argument('--batch', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    crypto = importPackage().utils.CryptoUtils
+    start = time.perf_counter()
+    hasher = crypto.Argon2Hasher.calibrate(args.target_ms / 1000, workers=args.workers)
+    print(f'calibrated in {time.perf_counter() - start:.2f}s: {hasher}')
+    single = min(_timed(lambda: hasher.hash('password')) for _ in range(5))
+    print(f'one hash: {single * 1000:.1f} ms (target {args.target_ms} ms)')
+    print()
+
+    passwords = [f'password{i}' for i in range(args.batch)]
+    params = dict(zip(crypto.ARGON2_PARAMS, hasher.params))
+    hashes = hasher.hash_batch(passwords)
+    pairs = list(zip(hashes, passwords))
+    with hasher:
+        hasher.verify_batch(pairs[:args.workers * 2])  # 預熱進程池
+        cases = (
+            ('new PasswordHasher per call (old)', lambda: [argon2.PasswordHasher(**params).hash(p) for p in passwords]),
+            ('Argon2Hasher.hash one by one', lambda: [hasher.hash(p) for p in passwords]),
+            (f'hash_batch ({args.workers} processes)', lambda: hasher.hash_batch(passwords)),
+            ('Argon2Hasher.verify one by one', lambda: [hasher.verify(h, p) for h, p in pairs]),
+            (f'verify_batch ({args.workers} processes)', lambda: hasher.verify_batch(pairs)),
+            ('averify_batch (asyncio)', lambda: asyncio.run(hasher.averify_batch(pairs))),
+        )
+        rows = [(label, f'{args.batch / _timed(func):,.1f}') for label, func in cases]
+    printTable((f'batch of {args.batch}', 'hashes/s'), rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+'''
+文件hash吞吐量(MB/s): 舊版每次read(1024) 對比 hash_file 的大緩衝區讀取與mmap；hash_many 線程池對比逐個hash；
+以及 findDuplicateFiles(大小 -> 部分hash -> 完整hash) 對比 全部文件完整hash 後分組；
+FileHashCache: 首次warm(全部hash) 對比 再次warm(全部命中) 對比 不用緩存。
+用法: python benchmarks/crypto_hash.py [--size 256] [--files 32] [--file-size 16] [--algo sha256]
+'''
+
+import os, argparse, hashlib, shutil, tempfile, time
+from common import importPackage, printTable, bench
+
+def _oldHash(path: str, algo: str) -> str:
+    '''舊版 getXXXHash_fromFile 的讀法'''
+    h = hashlib.new(algo)
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(1024)
+            if not data:
+                break
+            h.update(data)
+    return h.hexdigest()
+
+def _writeRandom(path: str, size: int):
+    with open(path, 'wb') as f:
+        for _ in range(size // (1 << 20)):
+            f.write(os.urandom(1 << 20))
+        f.write(os.urandom(size % (1 << 20)))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=256, help='單個大文件大小(MB)')
+    parser.add_argument('--files', type=int, default=32, help='hash_many / 查重使用的文件數')
+    parser.add_argument('--file-size', type=int, default=16, help='hash_many / 查重每個文件大小(MB)')
+    parser.add_argument('--algo', default='sha256')
+    args = parser.parse_args()
+
+    crypto = importPackage().utils.CryptoUtils
+    directory = tempfile.mkdtemp()
+    try:
+        big = os.path.join(directory, 'big.bin')
+        _writeRandom(big, args.size << 20)
+        expected = _oldHash(big, args.algo)
+        assert crypto.hash_file(big, args.algo, useMmap=True) == crypto.hash_file(big, args.algo, useMmap=False) == expected
+        rows = []
+        for label, func in (('read(1024) (old)', lambda: _oldHash(big, args.algo)),
+                            (f'hash_file read({crypto.HASH_READ_SIZE >> 10}KB)', lambda: crypto.hash_file(big, args.algo, useMmap=False)),
+                            ('hash_file mmap', lambda: crypto.hash_file(big, args.algo, useMmap=True))):
+            rows.append((label, f'{args.size / bench(func, repeat=3):,.0f}'))
+        printTable((f'single file ({args.size}MB, {args.algo})', 'MB/s'), rows)
+        print()
+
+        # 一半文件兩兩相同，其餘大小相同但內容不同(需要部分hash才能區分)
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(directory, f'f{i}.bin')
+            if i % 2 and i < args.files // 2:
+                shutil.copy(paths[-1], path)
+            else:
+                _writeRandom(path, args.file_size << 20)
+            paths.append(path)
+        total = args.files * args.file_size
+        sequential = bench(lambda: [crypto.hash_file(p, args.algo) for p in paths], repeat=3)
+        threaded = bench(lambda: crypto.hash_many(paths, args.algo), repeat=3)
+        def fullGroups():
+            groups = {}
+            for path, digest in crypto.hash_many(paths, args.algo).items():
+                groups.setdefault(digest, []).append(path)
+            return [g for g in groups.values() if len(g) > 1]
+        expectedGroups = sorted(map(sorted, fullGroups()))
+        assert sorted(map(sorted, crypto.findDuplicateFiles(directory, algo=args.algo))) == expectedGroups
+        full = bench(fullGroups, repeat=3)
+        staged = bench(lambda: crypto.findDuplicateFiles(directory, algo=args.algo), repeat=3)
+        printTable((f'{args.files} files x {args.file_size}MB', 'seconds', 'MB/s'), [
+            ('hash_file one by one', f'{sequential:.3f}', f'{total / sequential:,.0f}'),
+            (f'hash_many ({os.cpu_count()} cpus)', f'{threaded:.3f}', f'{total / threaded:,.0f}'),
+            ('duplicates: full hash of all', f'{full:.3f}', ''),
+            ('duplicates: findDuplicateFiles', f'{staged:.3f}', ''),
+        ])
+        print()
+
+        # mtime需早於RACY_SECONDS才會被緩存
+        for path in paths:
+            os.utime(path, (time.time() - 60,) * 2)
+        cache = crypto.FileHashCache(os.path.join(directory, 'cache.db'))
+        start = time.perf_counter()
+        cache.warm(*paths, algo='sha256')
+        cold = time.perf_counter() - start
+        warm = bench(lambda: cache.warm(*paths, algo='sha256'), repeat=3)
+        noCache = bench(lambda: [crypto.getSHA256Hash_fromFile(p) for p in paths], repeat=3)
+        crypto.setFileHashCache(cache)
+        cached = bench(lambda: [crypto.getSHA256Hash_fromFile(p) for p in paths], repeat=3)
+        crypto.setFileHashCache(None)
+        stats = cache.stats()
+        cache.close()
+        printTable((f'FileHashCache ({args.files} files)', 'seconds'), [
+            ('warm() cold', f'{cold:.4f}'),
+            ('warm() again', f'{warm:.4f}'),
+            ('getSHA256Hash_fromFile, no cache', f'{noCache:.4f}'),
+            ('getSHA256Hash_fromFile, cached', f'{cached:.4f}'),
+        ])
+        print(f"hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']:.2f}")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+'''
+有一個慢監聽者(sleep --delay ms)時，觸發事件一方的耗時(us/次): Event.invoke(同步) 對比 AsyncEvent.fire(線程池) / fire_async(event loop)，
+以及觸發後等待全部完成的總耗時: submit / invoke_async。
+用法: python benchmarks/event_async.py [--events 200] [--delay 5] [--workers 8]
+'''
+
+import argparse, asyncio, time
+from common import importPackage, printTable
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=5, help='慢監聽者每次的耗時(ms)')
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    data = importPackage().data_struct
+    n, delay = args.events, args.delay / 1000
+    def fast(i):
+        pass
+    def slow(i):
+        time.sleep(delay)
+    async def slowAsync(i):
+        await asyncio.sleep(delay)
+    def make(cls, slowListener, **kwargs):
+        event = cls(int, **kwargs)
+        event += fast
+        event += slowListener
+        return event
+
+    rows = []
+    event = make(data.Event, slow)
+    start = time.perf_counter()
+    for i in range(n):
+        event.invoke(i)
+    total = time.perf_counter() - start
+    rows.append(('Event.invoke', f'{total / n * 1e6:,.0f}', f'{total * 1e3:,.0f}'))
+
+    event = make(data.AsyncEvent, slow, maxWorkers=args.workers)
+    event.submit(0).result() # start the pool threads
+    start = time.perf_counter()
+    futures = [event.submit(i) for i in range(n)]
+    fired = time.perf_counter() - start
+    for future in futures:
+        future.result()
+    rows.append(('AsyncEvent.submit / fire (thread pool)', f'{fired / n * 1e6:,.0f}', f'{(time.perf_counter() - start) * 1e3:,.0f}'))
+    event.close()
+
+    async def loop():
+        event = make(data.AsyncEvent, slowAsync)
+        start = time.perf_counter()
+        tasks = [event.fire_async(i) for i in range(n)]
+        fired = time.perf_counter() - start
+        await asyncio.gather(*tasks)
+        rows.append(('AsyncEvent.fire_async / invoke_async (event loop)', f'{fired / n * 1e6:,.0f}', f'{(time.perf_counter() - start) * 1e3:,.0f}'))
+        event.close()
+    asyncio.run(loop())
+    printTable((f'{n} events, slow listener {args.delay}ms', 'producer us/event', 'all done (ms)'), rows)
+
+if __name__ == '__main__':
+    main()
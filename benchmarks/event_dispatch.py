@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+'''
+Event每次觸發的耗時(ns/invoke): 改動前的Event(每次檢查類型並複製監聽者tuple) 對比 typeCheck='always' / 'first'，
+以及invoke_many批量觸發，監聽者數量分別為1與5。另外比較addListener在已有很多監聽者時的耗時。
+用法: python benchmarks/event_dispatch.py [--number 200000] [--listeners 1,5]
+'''
+
+import argparse
+from types import FunctionType, MethodType
+from common import importPackage, printTable, bench
+
+class _OldEvent:
+    '''改動前的Event'''
+
+    def __init__(self, *args):
+        self.args = tuple(args)
+        self._events = []
+    @property
+    def events(self):
+        return tuple(self._events)
+    def addListener(self, listener):
+        if isinstance(listener, FunctionType):
+            argLength = listener.__code__.co_argcount
+        elif isinstance(listener, MethodType):
+            argLength = listener.__code__.co_argcount - 1
+        else:
+            raise Exception("Listener must be function or method")
+        if len(self.args) != argLength:
+            raise Exception("Listener's arg length not match")
+        self._events.append(listener) if listener not in self.events else None
+    def invoke(self, *args):
+        if len(args) < len(self.args):
+            raise Exception("Parameter not provided")
+        elif len(args) > len(self.args):
+            raise Exception(f"Too many parameters")
+        for i, arg in enumerate(args):
+            if type(arg) is not self.args[i]:
+                raise Exception(f"Parameter: {arg} is not {self.args[i].__qualname__}")
+        for event in self.events:
+            event(*args)
+
+def _listeners(count:int) -> list:
+    listeners = []
+    for _ in range(count):
+        def listener(userId, name):
+            pass
+        listeners.append(listener)
+    return listeners
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=200_000)
+    parser.add_argument('--listeners', default='1,5')
+    args = parser.parse_args()
+
+    Event = importPackage().data_struct.Event
+    n = args.number
+    batch = [(i, 'name') for i in range(n)]
+    rows = []
+    for count in (int(c) for c in args.listeners.split(',')):
+        def make(factory):
+            event = factory()
+            for listener in _listeners(count):
+                event.addListener(listener)
+            return event
+        old, always, first = make(lambda: _OldEvent(int, str)), make(lambda: Event(int, str)), make(lambda: Event(int, str, typeCheck='first'))
+        def loop(event):
+            invoke = event.invoke
+            return lambda: [invoke(i, 'name') for i in range(n)]
+        cells = [bench(loop(event), repeat=3) / n * 1e9 for event in (old, always, first)]
+        cells += [bench(lambda: always.invoke_many(batch), repeat=3) / n * 1e9, bench(lambda: first.invoke_many(batch), repeat=3) / n * 1e9]
+        rows.append([f'{count} listener(s)'] + [f'{cell:,.0f}' for cell in cells])
+    printTable(('ns/invoke', 'before', "always", "first", "invoke_many always", "invoke_many first"), rows)
+
+    many = _listeners(2000)
+    def addAll(factory):
+        event = factory(int, str)
+        for listener in many:
+            event.addListener(listener)
+    printTable(('addListener x2000 (ms)', 'before', 'after'),
+               [('', f'{bench(lambda: addAll(_OldEvent), repeat=3) * 1e3:.1f}', f'{bench(lambda: addAll(Event), repeat=3) * 1e3:.1f}')])
+
+if __name__ == '__main__':
+    main()
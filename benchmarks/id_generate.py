@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+'''
+ID生成微基準(每個ID的耗時ns): 舊版generateUUID(uuid1 + urandom + uuid5) 對比 IDUtils各生成函數與批量generate_ids，
+以及MultiKeyDict.add的耗時；另外比較以隨機ID與可排序ID為主鍵插入SQLite的速度。
+用法: python benchmarks/id_generate.py [--number 200000] [--rows 200000]
+'''
+
+import os, argparse, tempfile, time, uuid
+from common import importPackage, printTable, bench
+
+def _oldGenerateUUID():
+    '''改動前的generateUUID'''
+    return str((uuid.uuid5(uuid.NAMESPACE_DNS, str(uuid.uuid1()) + str(os.urandom(16))))).replace('-', '')
+
+def _insert(pkg, ids) -> float:
+    '''以ids為TEXT主鍵逐批插入文件數據庫，返回rows/s'''
+    path = os.path.join(tempfile.mkdtemp(), 'ids.db')
+    db = pkg.utils.SQliteUtils.Database(path)
+    db['items'].create({'id': str, 'value': int}, pk='id')
+    start = time.perf_counter()
+    for i in range(0, len(ids), 1000):
+        db['items'].insert_all(({'id': id, 'value': j} for j, id in enumerate(ids[i:i + 1000])), engine='executemany')
+    elapsed = time.perf_counter() - start
+    db.close()
+    return len(ids) / elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=200_000)
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    pkg = importPackage()
+    ids = pkg.utils.IDUtils
+    n = args.number
+    cases = [
+        ('generateUUID (old)', lambda: [_oldGenerateUUID() for _ in range(n // 10)], n // 10),
+        ('uuid.uuid4().hex', lambda: [uuid.uuid4().hex for _ in range(n)], n),
+        ('generateRandomID', lambda: [ids.generateRandomID() for _ in range(n)], n),
+        ('generateSortableID hex', lambda: [ids.generateSortableID() for _ in range(n)], n),
+        ('generateSortableID ulid', lambda: [ids.generateSortableID('ulid') for _ in range(n)], n),
+        ('generate_ids(n) random hex', lambda: ids.generate_ids(n), n),
+        ('generate_ids(n) sortable hex', lambda: ids.generate_ids(n, sortable=True), n),
+    ]
+    baseline = None
+    rows = []
+    for label, func, count in cases:
+        perId = bench(func, repeat=3) / count * 1e9
+        baseline = baseline or perId
+        rows.append((label, f'{perId:,.0f}', f'{baseline / perId:.1f}x'))
+    MultiKeyDict = pkg.data_struct.MultiKeyDict
+    def adds():
+        d = MultiKeyDict(('a',))
+        for i in range(n):
+            d.add({'a': i}, i)
+    rows.append(('MultiKeyDict.add', f'{bench(adds, repeat=3) / n * 1e9:,.0f}', ''))
+    printTable(('generator', 'ns/id', 'vs old'), rows)
+    print()
+    printTable(('SQLite TEXT primary key', 'rows/s'), [
+        ('random IDs', f'{_insert(pkg, ids.generate_ids(args.rows)):,.0f}'),
+        ('sortable IDs', f'{_insert(pkg, ids.generate_ids(args.rows, sortable=True)):,.0f}'),
+    ])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+'''
+各入口的冷啟動import耗時(每次都在新的python進程中運行)。比較延遲導入(默認)與 PYPROJECTUTILS_EAGER_IMPORT=1 的差別。
+用法: python benchmarks/import_time.py [--repeat 5]
+'''
+
+import os, sys, subprocess, argparse
+from common import PACKAGE_DIR, PACKAGE_NAME, median, printTable
+
+ENTRY_POINTS = [
+    ('package root', None),
+    ('Singleton', 'Singleton'),
+    ('Event', 'Event'),
+    ('MultiKeyDict', 'MultiKeyDict'),
+    ('SQliteUtils.Database', 'Database'),
+    ('TypeUtils.simpleTypeCheck', 'simpleTypeCheck'),
+    ('CryptoUtils.generateUUID', 'generateUUID'),
+    ('IDUtils.generateRandomID', 'generateRandomID'),
+    ('NetworkUtils.getLocalIP', 'getLocalIP'),
+    ('SeleniumUtils.Chrome', 'Chrome'),
+    ('AI_Utils.count_tokens', 'count_tokens'),
+]
+
+def _coldStart(attr, eager: bool) -> float:
+    '''在新進程中import package並訪問attr，返回進程內測得的耗時(秒)。失敗時拋出RuntimeError'''
+    code = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {os.path.dirname(PACKAGE_DIR)!r})\n"
+        "start = time.perf_counter()\n"
+        f"import {PACKAGE_NAME} as pkg\n"
+        + (f"getattr(pkg, {attr!r})\n" if attr else "")
+        + "print(time.perf_counter() - start)\n"
+    )
+    env = dict(os.environ)
+    env.pop('PYPROJECTUTILS_EAGER_IMPORT', None)
+    if eager:
+        env['PYPROJECTUTILS_EAGER_IMPORT'] = '1'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout.strip().splitlines()[-1])
+
+def _measure(attr, eager: bool, repeat: int) -> str:
+    try:
+        return f'{median([_coldStart(attr, eager) for _ in range(repeat)]) * 1000:.1f} ms'
+    except RuntimeError as e:
+        return f'error ({e})'
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5, help='每個入口運行的進程數, 取中位數')
+    args = parser.parse_args()
+    rows = []
+    for label, attr in ENTRY_POINTS:
+        rows.append((label, _measure(attr, False, args.repeat)))
+    rows.append(('package root (eager)', _measure(None, True, args.repeat)))
+    printTable(('entry point', 'cold start (lazy)'), rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+'''
+MultiKeyDict內存與吞吐量: 舊版(UUID字符串為id、每個對象一個{keyName: key}字典) 對比 新版(整數slot、列式存儲)。
+內存為tracemalloc統計的、存入n個對象後仍被佔用的字節數。舊版的id預先生成，不計入add的耗時。
+用法: python benchmarks/multikeydict.py [--number 1000000]
+'''
+
+import argparse, gc, time, tracemalloc
+from common import importPackage, printTable
+from typing import Dict
+
+class _OldMultiKeyDict:
+    '''改動前MultiKeyDict中benchmark用到的部分(_idDict改為實例屬性，否則所有實例共用)'''
+
+    def __init__(self, keyNames):
+        self._keyNames = tuple(keyNames)
+        self._objects = {}
+        self._idDict = {}
+        self._dicts = {keyName: {} for keyName in self._keyNames}
+    def _hasKeyName(self, keyName):
+        return keyName in self._keyNames
+    def get(self, keyName, key, default=None):
+        if not self._hasKeyName(keyName):
+            raise KeyError(keyName)
+        try:
+            return self._objects[self._dicts[keyName][key]]
+        except KeyError:
+            return default
+    def values(self, keyName):
+        ret = []
+        for key, value in self._dicts[keyName].items():
+            ret.append(self._objects[value])
+        return tuple(ret)
+    def items(self, keyName):
+        ret = {}
+        for key, value in self._dicts[keyName].items():
+            ret[key] = self._objects[value]
+        return ret.items()
+    def add(self, KeyNamesAndKeys:Dict, value, id):
+        for keyName, key in KeyNamesAndKeys.items():
+            if not self._hasKeyName(keyName):
+                raise KeyError(keyName)
+            if key in self._dicts[keyName]:
+                raise KeyError(key)
+        self._objects[id] = value
+        self._idDict[id] = KeyNamesAndKeys
+        for keyName, key in KeyNamesAndKeys.items():
+            self._dicts[keyName][key] = id
+    def pop(self, keyName, key):
+        id = self._dicts[keyName].pop(key)
+        for _keyName, _key in self._idDict[id].items():
+            if _keyName != keyName and _key in self._dicts[_keyName]:
+                self._dicts[_keyName].pop(_key)
+        return self._objects.pop(id)
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def _memory(func) -> int:
+    '''func()返回的容器新增的內存(字節)'''
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return used
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    pkg = importPackage()
+    MultiKeyDict = pkg.data_struct.MultiKeyDict
+    n = args.number
+    ids = pkg.utils.IDUtils.generate_ids(n)  # 舊版每個對象的id(不計入耗時)
+    names = [f'name{i}' for i in range(n)]
+    rowsOf = lambda: [{'id': i, 'name': names[i]} for i in range(n)]
+    value = object()
+
+    def oldFilled():
+        d = _OldMultiKeyDict(('id', 'name'))
+        for i, row in enumerate(rowsOf()):
+            d.add(row, value, ids[i])
+        return d
+    def newFilled():
+        d = MultiKeyDict('id', 'name')
+        for row in rowsOf():
+            d.add(row, value)
+        return d
+
+    # 內存: 傳入add的{keyName: key}字典在新版中add後即可釋放，舊版則保留在_idDict中
+    rows = [('memory (MB)', f'{_memory(oldFilled) / 2**20:,.1f}', f'{_memory(newFilled) / 2**20:,.1f}')]
+    def throughput(label, oldFunc, newFunc):
+        rows.append((label, f'{n / _timed(oldFunc):,.0f}', f'{n / _timed(newFunc):,.0f}'))
+
+    old, new = _OldMultiKeyDict(('id', 'name')), MultiKeyDict('id', 'name')
+    oldRows, newRows = rowsOf(), rowsOf()
+    throughput('add (ops/s)', lambda: [old.add(row, value, ids[i]) for i, row in enumerate(oldRows)],
+               lambda: [new.add(row, value) for row in newRows])
+    throughput('get (ops/s)', lambda: [old.get('name', name) for name in names], lambda: [new.get('name', name) for name in names])
+    throughput('values(keyName) iterate (items/s)', lambda: [v for v in old.values('id')], lambda: [v for v in new.values('id')])
+    throughput('items(keyName) iterate (items/s)', lambda: [kv for kv in old.items('id')], lambda: [kv for kv in new.items('id')])
+    throughput('pop (ops/s)', lambda: [old.pop('id', i) for i in range(n)], lambda: [new.pop('id', i) for i in range(n)])
+
+    bulk = MultiKeyDict('id', 'name')
+    items = [(row, value) for row in newRows]
+    rows.append(('add_many (ops/s)', '', f'{n / _timed(lambda: bulk.add_many(items)):,.0f}'))
+    rows.append(('pop_many (ops/s)', '', f'{n / _timed(lambda: bulk.pop_many("id", range(n))):,.0f}'))
+    rows.append(('add_many, reusing free slots (ops/s)', '', f'{n / _timed(lambda: bulk.add_many(items)):,.0f}'))
+    printTable((f'{n:,} objects, 2 key names', 'old', 'new'), rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+'''
+CacheMultiKeyDict: 訪問的額外開銷(ns/op，對比沒有淘汰的MultiKeyDict)，以及在Zipf分佈的訪問下LRU與LFU的命中率。
+未命中時從"數據源"讀取並add回緩存。
+用法: python benchmarks/multikeydict_cache.py [--keys 100000] [--ops 300000] [--cache 0.1] [--zipf 1.1]
+'''
+
+import argparse, bisect, itertools, random, time
+from common import importPackage, printTable
+
+def _zipf(keys:int, ops:int, s:float, seed:int=0) -> list:
+    '''按Zipf(s)分佈抽取ops個key，key 0最常訪問'''
+    weights = list(itertools.accumulate(1 / (rank + 1) ** s for rank in range(keys)))
+    rnd = random.Random(seed)
+    return [bisect.bisect(weights, rnd.random() * weights[-1]) for _ in range(ops)]
+
+def _run(cache, accesses) -> float:
+    '''讀穿緩存(read-through)，返回ns/op'''
+    get, add = cache.get, cache.add
+    start = time.perf_counter()
+    for key in accesses:
+        if get('id', key) is None:
+            add({'id': key, 'name': f'name{key}'}, key)
+    return (time.perf_counter() - start) / len(accesses) * 1e9
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keys', type=int, default=100_000)
+    parser.add_argument('--ops', type=int, default=300_000)
+    parser.add_argument('--cache', type=float, default=0.1, help='緩存容量佔key數的比例')
+    parser.add_argument('--zipf', type=float, default=1.1)
+    args = parser.parse_args()
+
+    data = importPackage().data_struct
+    accesses = _zipf(args.keys, args.ops, args.zipf)
+    maxSize = int(args.keys * args.cache)
+    cases = (
+        ('MultiKeyDict (unbounded)', lambda: data.MultiKeyDict('id', 'name')),
+        ('CacheMultiKeyDict (unbounded)', lambda: data.CacheMultiKeyDict('id', 'name')),
+        (f'LRU maxSize={maxSize:,}', lambda: data.CacheMultiKeyDict('id', 'name', maxSize=maxSize)),
+        (f'LFU maxSize={maxSize:,}', lambda: data.CacheMultiKeyDict('id', 'name', maxSize=maxSize, policy='lfu')),
+        (f'LRU maxSize={maxSize:,}, ttl=60s', lambda: data.CacheMultiKeyDict('id', 'name', maxSize=maxSize, ttl=60)),
+    )
+    rows = []
+    for label, factory in cases:
+        cache = factory()
+        nsPerOp = _run(cache, accesses)
+        stats = cache.stats() if hasattr(cache, 'stats') else None
+        rows.append((label, f'{nsPerOp:,.0f}', f'{stats["hit_rate"]:.1%}' if stats else '', f'{stats["evictions"]:,}' if stats else ''))
+    printTable((f'{args.ops:,} zipf({args.zipf}) reads over {args.keys:,} keys', 'ns/op', 'hit rate', 'evictions'), rows)
+
+if __name__ == '__main__':
+    main()
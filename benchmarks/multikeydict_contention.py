@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+'''
+多線程共享MultiKeyDict的吞吐量(總ops/s): 以user / token / conn三個鍵索引的session表，
+每個線程按比例執行get / add(新session) / pop(舊session)。
+比較: MultiKeyDict外加一把全局鎖 對比 ConcurrentMultiKeyDict(stripes=1 與 --stripes)。
+有GIL的CPython中Python代碼本身不會並行，分段鎖的收益主要在於讀取不加鎖、寫入時的鎖交接更少；free-threaded構建中差距更大。
+用法: python benchmarks/multikeydict_contention.py [--sessions 100000] [--ops 50000] [--threads 1,2,4,8] [--writes 0.1] [--stripes 16]
+'''
+
+import sys, argparse, random, threading, time
+from common import importPackage, printTable
+
+class _LockedMultiKeyDict:
+    '''改動前的用法: 每個操作外加一把全局鎖'''
+
+    def __init__(self, d):
+        self._d = d
+        self._lock = threading.Lock()
+    def get(self, keyName, key):
+        with self._lock:
+            return self._d.get(keyName, key)
+    def add(self, keys, value):
+        with self._lock:
+            return self._d.add(keys, value)
+    def pop(self, keyName, key):
+        with self._lock:
+            return self._d.pop(keyName, key)
+
+def _keys(session:int) -> dict:
+    return {'user': session, 'token': f'token{session}', 'conn': -session}
+
+def _run(d, threads:int, ops:int, sessions:int, writes:float) -> float:
+    '''每個線程執行ops次操作，返回總ops/s'''
+    counter = iter(range(sessions, sys.maxsize))  # next()在GIL下是原子的，各線程取得不同的新session
+    barrier = threading.Barrier(threads + 1)
+    def worker(seed):
+        rnd = random.Random(seed)
+        plan = [rnd.random() for _ in range(ops)]
+        barrier.wait()
+        for r in plan:
+            if r < writes / 2:
+                d.add(_keys(next(counter)), None)
+            elif r < writes:
+                try:
+                    d.pop('token', f'token{rnd.randrange(sessions)}')
+                except KeyError:
+                    pass
+            else:
+                d.get('user', rnd.randrange(sessions))
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    return threads * ops / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=int, default=100_000)
+    parser.add_argument('--ops', type=int, default=50_000, help='每個線程的操作數')
+    parser.add_argument('--threads', default='1,2,4,8')
+    parser.add_argument('--writes', type=float, default=0.1, help='add + pop 的比例')
+    parser.add_argument('--stripes', type=int, default=16)
+    args = parser.parse_args()
+
+    pkg = importPackage()
+    items = [(_keys(i), None) for i in range(args.sessions)]
+    def filled(d):
+        d.add_many(items)
+        return d
+    cases = (
+        ('MultiKeyDict + global lock', lambda: _LockedMultiKeyDict(filled(pkg.data_struct.MultiKeyDict('user', 'token', 'conn')))),
+        ('ConcurrentMultiKeyDict stripes=1', lambda: filled(pkg.data_struct.ConcurrentMultiKeyDict('user', 'token', 'conn', stripes=1))),
+        (f'ConcurrentMultiKeyDict stripes={args.stripes}',
+         lambda: filled(pkg.data_struct.ConcurrentMultiKeyDict('user', 'token', 'conn', stripes=args.stripes))),
+    )
+    threadCounts = [int(t) for t in args.threads.split(',')]
+    rows = [[label] + [f'{_run(factory(), t, args.ops, args.sessions, args.writes):,.0f}' for t in threadCounts]
+            for label, factory in cases]
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    printTable([f'ops/s, {args.writes:.0%} writes, GIL {"on" if gil else "off"}'] + [f'{t} threads' for t in threadCounts], rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+'''
+MultiKeyDict的有序keyName: 時間窗口(範圍)查詢與前綴查詢，掃描keys(keyName)過濾 對比 rangeItems / prefixItems(O(log n + k))，
+以及ordered keyName令add增加的耗時。
+用法: python benchmarks/multikeydict_range.py [--number 1000000] [--window 1000] [--queries 200]
+'''
+
+import argparse, random
+from common import importPackage, printTable, bench
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=1_000_000)
+    parser.add_argument('--window', type=int, default=1000, help='每次查詢的時間窗口內約有多少個session')
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    MultiKeyDict = importPackage().data_struct.MultiKeyDict
+    n = args.number
+    rnd = random.Random(0)
+    times = rnd.sample(range(n * 10), n)  # 每個session的最後活動時間(ms)
+    items = [({'id': i, 'lastSeen': t, 'user': f'user{i:07d}'}, i) for i, t in enumerate(times)]
+
+    plain = MultiKeyDict('id', 'lastSeen', 'user')
+    ordered = MultiKeyDict('id', 'lastSeen', 'user', ordered=('lastSeen', 'user'))
+    addPlain = bench(lambda: MultiKeyDict('id', 'lastSeen', 'user').add_many(items), repeat=1)
+    addOrdered = bench(lambda: MultiKeyDict('id', 'lastSeen', 'user', ordered=('lastSeen', 'user')).add_many(items), repeat=1)
+    plain.add_many(items)
+    ordered.add_many(items)
+    extra = [({'id': -i, 'lastSeen': -i, 'user': f'x{i}'}, i) for i in range(1, 100_001)]
+    oneByOnePlain = bench(lambda: [plain.add(keys, value) for keys, value in extra] and plain.pop_many('id', range(-1, -100_001, -1)), repeat=1)
+    oneByOneOrdered = bench(lambda: [ordered.add(keys, value) for keys, value in extra] and ordered.pop_many('id', range(-1, -100_001, -1)), repeat=1)
+
+    starts = [rnd.randrange(n * 10) for _ in range(args.queries)]
+    span = args.window * 10
+    prefixes = [f'user{rnd.randrange(n // 1000):04d}' for _ in range(args.queries)]  # 每個前綴約1000個user
+    def scanWindows():
+        for start in starts:
+            [(t, plain['lastSeen', t]) for t in plain.keys('lastSeen') if start <= t < start + span]
+    def rangeWindows():
+        for start in starts:
+            ordered.rangeItems('lastSeen', start, start + span)
+    def scanPrefixes():
+        for prefix in prefixes:
+            [(u, plain['user', u]) for u in plain.keys('user') if u.startswith(prefix)]
+    def prefixQueries():
+        for prefix in prefixes:
+            ordered.prefixItems('user', prefix)
+    q = args.queries
+    rows = [
+        ('add_many (whole batch, s)', f'{addPlain:.2f}', f'{addOrdered:.2f}'),
+        ('add + pop one by one (us/op)', f'{oneByOnePlain / 2e5 * 1e6:.2f}', f'{oneByOneOrdered / 2e5 * 1e6:.2f}'),
+        (f'time window ~{args.window} rows (ms/query)', f'{bench(scanWindows, repeat=1) / q * 1e3:.2f}', f'{bench(rangeWindows, repeat=3) / q * 1e3:.3f}'),
+        ('prefix ~1000 rows (ms/query)', f'{bench(scanPrefixes, repeat=1) / q * 1e3:.2f}', f'{bench(prefixQueries, repeat=3) / q * 1e3:.3f}'),
+    ]
+    printTable((f'{n:,} sessions', 'plain (scan keys())', 'ordered=(lastSeen, user)'), rows)
+
+if __name__ == '__main__':
+    main()
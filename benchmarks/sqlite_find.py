@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+'''
+Table.find / find_first: 參數化+按形狀緩存SQL 對比 舊的字符串拼接方式。
+用法: python benchmarks/sqlite_find.py [--rows 1000000] [--lookups 20000]
+'''
+
+import argparse, random, time
+from common import importPackage, printTable
+
+def _old_find_first(table, *args):
+    '''舊實現: 每次都把值拼接進新的SQL字符串'''
+    sql = f"SELECT * FROM {table.name} WHERE "
+    for i, pattern in enumerate(args):
+        if i > 0:
+            sql += " AND "
+        sql += f"{pattern[0]} {pattern[1]} '{pattern[2]}'"
+    for data in table.db.query(sql):
+        return data
+    return None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=20_000)
+    args = parser.parse_args()
+
+    pkg = importPackage()
+    db = pkg.utils.SQliteUtils.Database(memory=True)
+    table = db['items']
+    start = time.perf_counter()
+    table.insert_all(({'id': i, 'name': f'name{i}', 'category': i % 100, 'value': random.random()} for i in range(args.rows)),
+                     pk='id', batch_size=200)
+    table.create_index(['name'])
+    table.create_index(['category', 'value'])
+    print(f'built {args.rows} rows in {time.perf_counter() - start:.1f}s')
+
+    keys = [random.randrange(args.rows) for _ in range(args.lookups)]
+    cases = [
+        ('find_first name = ?', lambda t, k: _old_find_first(t, ('name', '=', f'name{k}')),
+         lambda t, k: t.find_first('name', '=', f'name{k}')),
+        ('find_first category = ? AND value > ?', lambda t, k: _old_find_first(t, ('category', '=', k % 100), ('value', '>', 0.5)),
+         lambda t, k: t.find_first(('category', '=', k % 100), ('value', '>', 0.5))),
+    ]
+    rows = []
+    for label, old, new in cases:
+        results = []
+        for func in (old, new):
+            start = time.perf_counter()
+            for k in keys:
+                func(table, k)
+            results.append(args.lookups / (time.perf_counter() - start))
+        rows.append((label, f'{results[0]:,.0f}/s', f'{results[1]:,.0f}/s', f'{results[1] / results[0]:.2f}x'))
+    printTable(('query', 'string SQL', 'parameterized', 'speedup'), rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+'''
+文件導入吞吐量(rows/s, MB/s): utils.rows_from_file + insert_all(+TypeTracker, transform) 對比 Table.ingest
+(單進程 workers=0 與進程池)，分CSV與NDJSON。
+用法: python benchmarks/sqlite_ingest.py [--rows 300000] [--workers 4] [--part-size 8]
+'''
+
+import os, argparse, csv, json, tempfile, time
+from common import importPackage, printTable
+
+def _writeFiles(directory: str, rows: int):
+    csvPath, ndjsonPath = os.path.join(directory, 'data.csv'), os.path.join(directory, 'data.ndjson')
+    with open(csvPath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(('id', 'name', 'score', 'note'))
+        for i in range(rows):
+            writer.writerow((i, f'name {i % 1000}', f'{i / 7:.3f}', 'multi\nline, "quoted"' if i % 100 == 99 else 'plain'))
+    with open(ndjsonPath, 'w', encoding='utf-8') as f:
+        for i in range(rows):
+            f.write(json.dumps({'id': i, 'name': f'name {i % 1000}', 'score': i / 7, 'note': 'plain'}) + '\n')
+    return csvPath, ndjsonPath
+
+def _origin(sqlite, path: str, detectTypes: bool) -> int:
+    db = sqlite.Database(memory=True)
+    with open(path, 'rb') as f:
+        # 原版無法自動識別NDJSON, 需明確指定
+        rows, _ = sqlite.utils.rows_from_file(f, format=None if detectTypes else sqlite.Format.NL)
+        tracker = sqlite.utils.TypeTracker() if detectTypes else None
+        db['items'].insert_all(tracker.wrap(rows) if tracker else rows, batch_size=1000)
+    if tracker:
+        db['items'].transform(types=tracker.types)
+    return db['items'].count
+
+def _ingest(sqlite, path: str, workers: int, partSize: int) -> int:
+    db = sqlite.Database(memory=True)
+    stats = db['items'].ingest(path, workers=workers, part_size=partSize)
+    assert stats.rows == db['items'].count
+    return stats.rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=300_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--part-size', type=int, default=8, help='每個worker處理的範圍大小(MB)')
+    args = parser.parse_args()
+
+    sqlite = importPackage().utils.SQliteUtils
+    csvPath, ndjsonPath = _writeFiles(tempfile.mkdtemp(), args.rows)
+    partSize = args.part_size * 1024 * 1024
+    results = []
+    for label, path, detectTypes in (('CSV', csvPath, True), ('NDJSON', ndjsonPath, False)):
+        size = os.path.getsize(path) / 1024 / 1024
+        cases = (('rows_from_file + insert_all', lambda: _origin(sqlite, path, detectTypes)),
+                 ('ingest workers=0', lambda: _ingest(sqlite, path, 0, partSize)),
+                 (f'ingest workers={args.workers}', lambda: _ingest(sqlite, path, args.workers, partSize)))
+        baseline = None
+        for name, func in cases:
+            start = time.perf_counter()
+            count = func()
+            elapsed = time.perf_counter() - start
+            assert count == args.rows
+            baseline = baseline or elapsed
+            results.append((label, name, f'{count / elapsed:,.0f}', f'{size / elapsed:.1f}', f'{baseline / elapsed:.2f}x'))
+    printTable(('file', 'loader', 'rows/s', 'MB/s', 'speedup'), results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+'''
+Table.insert_all 吞吐量(rows/s): 多行VALUES引擎(默認) 對比 executemany引擎，分窄表與寬表。
+另外比較 upsert_all: INSERT OR IGNORE + UPDATE 對比 原生 ON CONFLICT DO UPDATE。
+用法: python benchmarks/sqlite_insert.py [--rows 200000] [--wide-columns 60] [--file]
+'''
+
+import os, argparse, tempfile, time
+from common import importPackage, printTable
+
+def _records(rows: int, columns: int):
+    return ({'id': i, **{f'c{j}': (i * 31 + j) % 1000 if j % 2 else f'value{j}_{i % 97}' for j in range(columns - 1)}}
+            for i in range(rows))
+
+def _run(pkg, engine: str, rows: int, columns: int, batch_size, path) -> float:
+    if path:
+        db = pkg.utils.SQliteUtils.Database(path, recreate=True)
+    else:
+        db = pkg.utils.SQliteUtils.Database(memory=True)
+    kwargs = {} if batch_size is None else {'batch_size': batch_size}
+    start = time.perf_counter()
+    db['items'].insert_all(_records(rows, columns), pk='id', engine=engine, **kwargs)
+    elapsed = time.perf_counter() - start
+    assert db['items'].count == rows
+    db.close()
+    return rows / elapsed
+
+def _runUpsert(pkg, native: bool, rows: int, columns: int, path) -> float:
+    '''表中已有一半的行, upsert全部rows行'''
+    db = pkg.utils.SQliteUtils.Database(path, recreate=True) if path else pkg.utils.SQliteUtils.Database(memory=True)
+    db.native_upsert = native
+    db['items'].insert_all(_records(rows // 2, columns), pk='id', engine='executemany')
+    start = time.perf_counter()
+    db['items'].upsert_all(_records(rows, columns), pk='id')
+    elapsed = time.perf_counter() - start
+    assert db['items'].count == rows
+    db.close()
+    return rows / elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--wide-columns', type=int, default=60)
+    parser.add_argument('--file', action='store_true', help='寫入臨時文件而不是內存數據庫')
+    args = parser.parse_args()
+
+    pkg = importPackage()
+    path = os.path.join(tempfile.mkdtemp(), 'insert.db') if args.file else None
+    rows = []
+    for label, columns in (('narrow', 4), ('wide', args.wide_columns)):
+        values = _run(pkg, 'values', args.rows, columns, None, path)
+        for batch_size in (None, 1_000, 50_000):
+            many = _run(pkg, 'executemany', args.rows, columns, batch_size, path)
+            rows.append((f'{label} ({columns} cols)', batch_size or 'default', f'{values:,.0f}', f'{many:,.0f}', f'{many / values:.2f}x'))
+    printTable(('table', 'executemany batch', 'VALUES rows/s', 'executemany rows/s', 'speedup'), rows)
+    print()
+    rows = []
+    for label, columns in (('narrow', 4), ('wide', args.wide_columns)):
+        fallback = _runUpsert(pkg, False, args.rows, columns, path)
+        native = _runUpsert(pkg, True, args.rows, columns, path)
+        rows.append((f'{label} ({columns} cols)', f'{fallback:,.0f}', f'{native:,.0f}', f'{native / fallback:.2f}x'))
+    printTable(('upsert_all', 'OR IGNORE + UPDATE rows/s', 'ON CONFLICT rows/s', 'speedup'), rows)
+
+if __name__ == '__main__':
+    main()
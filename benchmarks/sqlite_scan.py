@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+'''
+全表掃描: 比較 rows_where 各 row_format 的吞吐量(rows/s)，以及保留 --sample 行結果時每行的內存分配塊數與字節數(tracemalloc)。
+用法: python benchmarks/sqlite_scan.py [--rows 500000] [--columns 8] [--sample 20000]
+'''
+
+import argparse, time, tracemalloc
+from common import importPackage, printTable
+
+FORMATS = ('dict', 'tuple', 'record', 'columns', 'numpy')
+
+def _consume(table, row_format: str) -> int:
+    '''迭代並觸碰每一行(列式則觸碰每個chunk)，返回行數'''
+    count = 0
+    for item in table.rows_where(row_format=row_format):
+        if row_format in ('columns', 'numpy'):
+            count += len(next(iter(item.values())))
+        else:
+            count += 1
+    return count
+
+def _allocations(table, row_format: str, sample: int):
+    '''保留前sample行(列式為對應的chunk)時，每行平均的(分配塊數, 字節數)'''
+    tracemalloc.start()
+    rows = table.rows_where(row_format=row_format, limit=sample, chunk_size=sample)
+    before = tracemalloc.take_snapshot()
+    kept = list(rows)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del kept
+    return blocks / sample, size / sample
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--columns', type=int, default=8)
+    parser.add_argument('--sample', type=int, default=20_000)
+    args = parser.parse_args()
+
+    pkg = importPackage()
+    db = pkg.utils.SQliteUtils.Database(memory=True)
+    table = db['items']
+    table.insert_all(({'id': i, **{f'c{j}': i * j if j % 2 else f'v{i % 1000}' for j in range(args.columns - 1)}}
+                      for i in range(args.rows)), pk='id', engine='executemany')
+
+    results = []
+    for row_format in FORMATS:
+        try:
+            _consume(table, row_format)  # 預熱
+        except ImportError as e:
+            results.append((row_format, f'skipped ({e})', '', ''))
+            continue
+        start = time.perf_counter()
+        count = _consume(table, row_format)
+        elapsed = time.perf_counter() - start
+        assert count == args.rows
+        blocks, size = _allocations(table, row_format, args.sample)
+        results.append((row_format, f'{count / elapsed:,.0f}', f'{blocks:.1f}', f'{size:,.0f}'))
+    printTable(('row_format', 'rows/s', 'blocks/row', 'bytes/row'), results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+'''
+欄位類型推斷吞吐量(rows/s): utils.TypeTracker / utils.suggest_column_types(逐值檢查) 對比 typeinfer 的分塊版本，
+以及 TypeTracker(sample=...) 抽樣模式。數據為CSV式的字符串行(整數、浮點、文本列混合)。
+用法: python benchmarks/sqlite_typeinfer.py [--rows 200000] [--columns 12] [--sample 1000]
+'''
+
+import argparse
+from common import importPackage, printTable, bench
+
+def _rows(rows: int, columns: int):
+    kinds = ('int', 'float', 'text')
+    data = []
+    for i in range(rows):
+        row = {}
+        for j in range(columns):
+            kind = kinds[j % 3]
+            if kind == 'int':
+                row[f'c{j}'] = str(i * 7 + j)
+            elif kind == 'float':
+                row[f'c{j}'] = f'{i / 7 + j:.3f}'
+            else:
+                row[f'c{j}'] = f'name {i % 1000}'
+        data.append(row)
+    return data
+
+def _track(cls, data, **kwargs):
+    tracker = cls(**kwargs)
+    for _ in tracker.wrap(data):
+        pass
+    return tracker.types
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--columns', type=int, default=12)
+    parser.add_argument('--sample', type=int, default=1_000)
+    args = parser.parse_args()
+
+    pkg = importPackage()
+    utils = pkg.utils.SQliteUtils.utils
+    typeinfer = pkg.utils.SQliteUtils.typeinfer
+    data = _rows(args.rows, args.columns)
+    expected = _track(utils.TypeTracker, data)
+    assert _track(typeinfer.TypeTracker, data) == expected
+    assert typeinfer.suggest_column_types(data) == utils.suggest_column_types(data)
+
+    cases = (
+        ('TypeTracker', 'utils (per value)', lambda: _track(utils.TypeTracker, data)),
+        ('TypeTracker', 'typeinfer (chunked)', lambda: _track(typeinfer.TypeTracker, data)),
+        ('TypeTracker', f'typeinfer sample={args.sample}', lambda: _track(typeinfer.TypeTracker, data, sample=args.sample)),
+        ('suggest_column_types', 'utils (per value)', lambda: utils.suggest_column_types(data)),
+        ('suggest_column_types', 'typeinfer', lambda: typeinfer.suggest_column_types(data)),
+    )
+    results, baseline = [], {}
+    for name, label, func in cases:
+        rate = args.rows / bench(func, repeat=3)
+        baseline.setdefault(name, rate)
+        results.append((name, label, f'{rate:,.0f}', f'{rate / baseline[name]:.2f}x'))
+    printTable(('function', 'implementation', 'rows/s', 'speedup'), results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+'''
+類型檢查每次調用的耗時(ns)，按類型形狀分別比較: 改動前的simpleTypeCheck(每次解析類型) 對比 simpleTypeCheck(查找緩存的checker)
+對比 compile_checker預先取得的checker，以及simpleSubClassCheck改動前後。
+用法: python benchmarks/type_check.py [--number 20000]
+'''
+
+import argparse
+from typing import *
+from common import importPackage, printTable, bench
+
+def _oldSimpleSubClassCheck(smallerCls, largerCls):
+    '''改動前的simpleSubClassCheck'''
+    def _checkTypes(smallerTypes, largerTypes):
+        if Any in largerTypes:
+            return True
+        for smallerType in smallerTypes:
+            ok = False
+            for largerType in largerTypes:
+                if _oldSimpleSubClassCheck(smallerType, largerType):
+                    ok = True
+                    break
+            if not ok:
+                return False
+        return True
+    if largerCls == Any:
+        return True
+    elif smallerCls == Any:
+        return False
+    smallerTypeOrigin = get_origin(smallerCls)
+    largerTypeOrigin = get_origin(largerCls)
+    if smallerTypeOrigin is None and largerTypeOrigin is None:
+        return issubclass(smallerCls, largerCls)
+    elif smallerTypeOrigin is not None and largerTypeOrigin is None:
+        return issubclass(smallerTypeOrigin, largerCls)
+    elif smallerTypeOrigin is None and largerTypeOrigin is not None:
+        if not issubclass(smallerCls, largerTypeOrigin):
+            return False
+        if len(get_args(largerCls)) == 0:
+            return True
+        return False
+    else:
+        if smallerTypeOrigin in (Union, Optional):
+            if largerTypeOrigin not in (Union, Optional):
+                return False
+            smallerTypes = get_args(smallerCls)
+            largerTypes = get_args(largerCls)
+            return _checkTypes(smallerTypes, largerTypes)
+        else:
+            if not issubclass(smallerTypeOrigin, largerTypeOrigin):
+                return False
+            if issubclass(smallerTypeOrigin,Sequence) or issubclass(smallerTypeOrigin, Iterable):
+                smallerArgType = get_args(smallerCls)[0]
+                largerArgType = get_args(largerCls)[0]
+                return _oldSimpleSubClassCheck(smallerArgType, largerArgType)
+            elif issubclass(smallerTypeOrigin, Mapping):
+                smallerKeyType, smallerValueType = get_args(smallerCls)
+                largerKeyType, largerValueType = get_args(largerCls)
+                return _oldSimpleSubClassCheck(smallerKeyType, largerKeyType) and _oldSimpleSubClassCheck(smallerValueType, largerValueType)
+            elif issubclass(smallerTypeOrigin, Callable):
+                smallerClsArgs = get_args(smallerCls)
+                largerClsArgs = get_args(largerCls)
+                smallerAgrTypes, smallerReturnType = smallerClsArgs[0], smallerClsArgs[-1]
+                largerArgTypes, largerReturnType = largerClsArgs[0], largerClsArgs[-1]
+                if len(smallerAgrTypes) != len(largerArgTypes):
+                    return False
+                return _checkTypes(smallerAgrTypes, largerArgTypes) and _oldSimpleSubClassCheck(smallerReturnType, largerReturnType)
+            else:
+                raise Exception('unsupported types--- smaller:', smallerTypeOrigin, ' larger:',largerTypeOrigin)
+
+def _oldSimpleTypeCheck(value, targetType):
+    '''改動前的simpleTypeCheck'''
+    if get_origin(targetType) is None:
+        return isinstance(value, targetType)
+    else:
+        argTypes = get_args(targetType)
+        origin = get_origin(targetType)
+        if origin == Union or origin == Optional:
+            for argType in argTypes:
+                if _oldSimpleTypeCheck(value, argType):
+                    return True
+            return False
+        else:
+            if not isinstance(value, origin):
+                return False
+            if issubclass(origin, Sequence):
+                for i, argType in enumerate(argTypes):
+                    if not _oldSimpleTypeCheck(value[i], argType):
+                        return False
+                return True
+            elif issubclass(origin, Mapping):
+                keyType, valueType = argTypes
+                for key, val in value.items():
+                    if not _oldSimpleTypeCheck(key, keyType) or not _oldSimpleTypeCheck(val, valueType):
+                        return False
+                return True
+            elif issubclass(origin, Callable):
+                callArgTypes, returnType = *argTypes[:-1], argTypes[-1]
+                valueArgTypes = get_type_hints(value)
+                varNames = value.__code__.co_varnames
+                for varName in varNames:
+                    if varName not in valueArgTypes:
+                        continue # ignore unlabeled arguments
+                    if not _oldSimpleSubClassCheck(valueArgTypes[varName], callArgTypes[varNames.index(varName)]):
+                        return False
+                if 'return' in valueArgTypes:
+                    if not _oldSimpleSubClassCheck(valueArgTypes['return'], returnType):
+                        return False
+                return True
+            else:
+                raise Exception('not supported checking type: ' + str(origin))
+
+def _handler(message: Dict[str, Any], retries: int) -> bool:
+    return True
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=20_000)
+    args = parser.parse_args()
+
+    TypeUtils = importPackage().utils.TypeUtils
+    shapes = [
+        ('int', 12345, int),
+        ('Optional[int]', None, Optional[int]),
+        ('Union[int, str, List[int]]', [1], Union[int, str, List[int]]),
+        ('Tuple[int, str, float]', (1, 'a', 1.5), Tuple[int, str, float]),
+        ('Dict[str, int] (10 items)', {str(i): i for i in range(10)}, Dict[str, int]),
+        ('Mapping[str, Sequence[Mapping[str, int]]]', {'a': [{'x': 1}], 'b': [{'y': 2}]}, Mapping[str, Sequence[Mapping[str, int]]]),
+        ('Callable[[Dict[str, Any], int], bool]', _handler, Callable[[Dict[str, Any], int], bool]),
+    ]
+    n = args.number
+    rows = []
+    for label, value, targetType in shapes:
+        assert _oldSimpleTypeCheck(value, targetType) == TypeUtils.simpleTypeCheck(value, targetType) == True
+        checker = TypeUtils.compile_checker(targetType)
+        old = bench(lambda: [_oldSimpleTypeCheck(value, targetType) for _ in range(n)], repeat=3) / n * 1e9
+        new = bench(lambda: [TypeUtils.simpleTypeCheck(value, targetType) for _ in range(n)], repeat=3) / n * 1e9
+        compiled = bench(lambda: [checker(value) for _ in range(n)], repeat=3) / n * 1e9
+        rows.append((label, f'{old:,.0f}', f'{new:,.0f}', f'{compiled:,.0f}', f'{old / compiled:.1f}x'))
+    printTable(('simpleTypeCheck ns/call', 'old', 'simpleTypeCheck', 'compile_checker', 'speedup'), rows)
+    print()
+
+    pairs = [
+        ('List[bool] <= Sequence[int]', List[bool], Sequence[int]),
+        ('Dict[str, List[int]] <= Mapping[str, Sequence[int]]', Dict[str, List[int]], Mapping[str, Sequence[int]]),
+        ('Callable[[int], bool] <= Callable[[int], int]', Callable[[int], bool], Callable[[int], int]),
+    ]
+    rows = []
+    for label, smaller, larger in pairs:
+        old = bench(lambda: [_oldSimpleSubClassCheck(smaller, larger) for _ in range(n)], repeat=3) / n * 1e9
+        new = bench(lambda: [TypeUtils.simpleSubClassCheck(smaller, larger) for _ in range(n)], repeat=3) / n * 1e9
+        rows.append((label, f'{old:,.0f}', f'{new:,.0f}', f'{old / new:.1f}x'))
+    printTable(('simpleSubClassCheck ns/call', 'old', 'memoized', 'speedup'), rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+'''
+大容器的類型檢查策略: 對1M項的Dict[str, int]、Dict[str, List[int]]與List[Dict[str, int]]，
+比較改動前的逐項檢查(只有Dict[str, int]可比較: 改動前Sequence只檢查第一個元素) 對比 CheckStrategy.full() / sample(k) / first(k) / depth(n) 每次檢查的耗時(ms)。
+用法: python benchmarks/type_check_strategies.py [--number 1000000] [--k 100]
+'''
+
+import argparse
+from typing import *
+from common import importPackage, printTable, bench
+
+def _oldCheckMapping(value, keyType, valueType) -> bool:
+    '''改動前simpleTypeCheck的Mapping分支(元素為普通類時)'''
+    if not isinstance(value, Mapping):
+        return False
+    for key, val in value.items():
+        if not isinstance(key, keyType) or not isinstance(val, valueType):
+            return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=1_000_000)
+    parser.add_argument('--k', type=int, default=100)
+    args = parser.parse_args()
+
+    TypeUtils = importPackage().utils.TypeUtils
+    S, n, k = TypeUtils.CheckStrategy, args.number, args.k
+    flat = {f'key{i}': i for i in range(n)}
+    nested = {f'key{i}': [i, i] for i in range(n // 2)}
+    records = [{'a': i} for i in range(n)]
+    cases = (
+        ('Dict[str, int]', flat, Dict[str, int]),
+        ('Dict[str, List[int]]', nested, Dict[str, List[int]]),
+        ('List[Dict[str, int]]', records, List[Dict[str, int]]),
+    )
+    strategies = (('full', None), (f'sample({k})', S.sample(k)), (f'first({k})', S.first(k)), ('depth(1)', S.depth(1)))
+    rows = []
+    for label, value, targetType in cases:
+        row = [label, f'{bench(lambda: _oldCheckMapping(flat, str, int), repeat=3) * 1e3:.1f}' if value is flat else '']
+        for _, strategy in strategies:
+            checker = TypeUtils.compile_checker(targetType, strategy)
+            assert checker(value)
+            seconds = bench(lambda: checker(value), repeat=3, number=1 if strategy is None or strategy.mode == 'full' else 100)
+            row.append(f'{seconds * 1e3:.3f}')
+        rows.append(row)
+    printTable([f'{n:,} items (ms/check)', 'before'] + [name for name, _ in strategies], rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+'''
+typechecked裝飾器每次調用的耗時(ns): 未裝飾 對比 關閉時(set_typecheck_enabled(False)，返回原函數) 對比 開啟時，
+以及typecheck_stats記錄的每次調用的檢查耗時。
+用法: python benchmarks/typechecked.py [--number 200000]
+'''
+
+import argparse
+from typing import *
+from common import importPackage, printTable, bench
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=200_000)
+    args = parser.parse_args()
+
+    utils = importPackage().utils
+    def scalar(a:int, b:str, c:float=0.0) -> int:
+        return a
+    def container(ids:List[int], meta:Dict[str, str]) -> Optional[int]:
+        return None
+    cases = (
+        ('scalar(int, str, float) -> int', scalar, (1, 'x', 2.0)),
+        ('container(List[int] x10, Dict[str, str] x5)', container, (list(range(10)), {str(i): 'v' for i in range(5)})),
+    )
+    rows = []
+    for label, func, callArgs in cases:
+        utils.set_typecheck_enabled(False)
+        disabled = utils.typechecked(func)
+        utils.set_typecheck_enabled(True)
+        enabled = utils.typechecked(func)
+        utils.reset_typecheck_stats()
+        timings = [bench(lambda: [f(*callArgs) for _ in range(args.number)], repeat=3) / args.number * 1e9 for f in (func, disabled, enabled)]
+        stat = next(stat for stat in utils.typecheck_stats() if stat['function'].endswith(func.__name__))
+        rows.append([label] + [f'{t:,.0f}' for t in timings] + [f'{stat["mean_check_ns"]:,.0f}'])
+    printTable(('ns/call', 'undecorated', 'disabled', 'enabled', 'check (stats)'), rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+'''
+異步的Event: 監聽者可以是coroutine function，也可以在線程池中執行，慢的監聽者不會阻塞觸發事件的一方。
+觸發方式:
+    - invoke(*args): 在當前線程依次調用(coroutine監聽者用asyncio.run執行，所以當前線程有運行中的event loop時不可用)
+    - submit(*args) / fire(*args): 交給線程池，返回Future(等待全部完成) / 不等待(fire-and-forget)
+    - await invoke_async(*args) / fire_async(*args): 在當前event loop中並發執行(gather)，普通監聽者在線程池中執行
+任何一個監聽者拋出的錯誤都不會影響其他監聽者: 錯誤按監聽者收集為ListenerError列表返回，並傳給onError。
+'''
+
+import asyncio, queue, threading, traceback
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, Executor
+from typing import Callable, Iterable, List, Optional, Sequence
+from .Event import Event
+
+ListenerError = namedtuple("ListenerError", ("listener", "error"))
+'''監聽者與其拋出的錯誤'''
+
+class AsyncEvent(Event):
+    def __init__(self, *args, typeCheck:str='always', maxWorkers:Optional[int]=None, maxPending:int=1024,
+                 executor:Optional[Executor]=None, onError:Optional[Callable[[Callable, Exception], None]]=None):
+        '''
+        :param args: 參數類型，見Event
+        :param typeCheck: 見Event
+        :param maxWorkers: 線程池的線程數(None即ThreadPoolExecutor的預設值)。線程池在第一次使用時才創建
+        :param maxPending: submit / fire / fire_async最多有多少個未完成的監聽者調用。已滿時submit / fire阻塞(或拋出queue.Full)，fire_async拋出queue.Full
+        :param executor: 使用外部的線程池(close時不會關閉它)，此時忽略maxWorkers
+        :param onError: onError(listener, error)，每個監聽者出錯時調用。為None時fire / fire_async的錯誤會打印出來，其他方式只返回錯誤
+        '''
+        super().__init__(*args, typeCheck=typeCheck)
+        if maxPending < 1:
+            raise ValueError("maxPending must be at least 1")
+        self.onError = onError
+        self.maxPending = maxPending
+        self._maxWorkers = maxWorkers
+        self._executor = executor
+        self._ownExecutor = executor is None
+        self._executorLock = threading.Lock()
+        self._pending = 0 # listener calls submitted to the pool and not finished yet
+        self._pendingChanged = threading.Condition()
+        self._tasks = set() # fire_async tasks, kept referenced until done
+
+    def __repr__(self):
+        return f"<AsyncEvent{self.args}>"
+
+    #region helpers
+    def _validateArgs(self, args:tuple):
+        if self._validate:
+            if tuple(map(type, args)) != self.args:
+                self._checkArgs(args)
+            self._validate = self._keepValidating
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            with self._executorLock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self._maxWorkers, thread_name_prefix='AsyncEvent')
+        return self._executor
+
+    def _error(self, listener, error:Exception) -> ListenerError:
+        if self.onError is not None:
+            try:
+                self.onError(listener, error)
+            except Exception:
+                traceback.print_exc()
+        return ListenerError(listener, error)
+
+    def _call(self, listener, args:tuple) -> Optional[ListenerError]:
+        '''call a listener on the current thread, run it to completion if it is a coroutine function'''
+        try:
+            result = listener(*args)
+            if asyncio.iscoroutine(result):
+                try:
+                    asyncio.run(result)
+                except RuntimeError:
+                    result.close() # not started if a loop is running in this thread, avoid "never awaited"
+                    raise
+        except Exception as e:
+            return self._error(listener, e)
+        return None
+
+    async def _callAsync(self, listener, args:tuple) -> Optional[ListenerError]:
+        try:
+            await listener(*args)
+        except Exception as e:
+            return self._error(listener, e)
+        return None
+
+    def _reserve(self, count:int, block:bool, timeout:Optional[float]):
+        '''reserve count pending slots at once (so concurrent producers never hold part of what they need)'''
+        with self._pendingChanged:
+            if not self._pendingChanged.wait_for(lambda: self._pending + count <= self.maxPending, timeout if block else 0):
+                raise queue.Full(f"{self.maxPending} listener calls of {self} are pending")
+            self._pending += count
+
+    def _releaseSlots(self, count:int):
+        with self._pendingChanged:
+            self._pending -= count
+            self._pendingChanged.notify_all()
+
+    def _checkNoRunningLoop(self, listeners:tuple):
+        '''coroutine listeners cannot be run by invoke() inside a running event loop (asyncio.run would fail)'''
+        if any(asyncio.iscoroutinefunction(listener) for listener in listeners):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            raise RuntimeError(f"{self} has coroutine listeners and cannot be invoked synchronously inside a running event loop, "
+                               f"use 'await invoke_async()' or fire_async() instead")
+
+    def _printErrors(self, errors:List[ListenerError]):
+        if self.onError is None:
+            for _, error in errors:
+                traceback.print_exception(type(error), error, error.__traceback__)
+    #endregion
+
+    def invoke(self, *args) -> List[ListenerError]:
+        '''
+        invoke all listeners on the current thread in order, return the errors they raised.
+        Raises RuntimeError if there are coroutine listeners and an event loop is running in this thread
+        '''
+        self._validateArgs(args)
+        listeners = self._listeners
+        self._checkNoRunningLoop(listeners)
+        errors = [self._call(listener, args) for listener in listeners]
+        return [error for error in errors if error is not None]
+
+    def invoke_many(self, batch:Iterable[Sequence]) -> List[ListenerError]:
+        '''invoke(*args) for each args in batch, return all the errors. When type checking is on, all args are checked first'''
+        batch = [tuple(args) for args in batch]
+        for args in batch:
+            self._validateArgs(args)
+        listeners = self._listeners
+        self._checkNoRunningLoop(listeners)
+        errors = [self._call(listener, args) for args in batch for listener in listeners]
+        return [error for error in errors if error is not None]
+
+    def submit(self, *args, block:bool=True, timeout:Optional[float]=None) -> Future:
+        '''
+        run every listener in the thread pool, return a Future of the errors (List[ListenerError]) when all of them finished.
+        Wait for the future (or asyncio.wrap_future it) to await all. Blocks while maxPending listener calls are pending;
+        raises queue.Full if block is False or timeout expired.
+        '''
+        self._validateArgs(args)
+        listeners = self._listeners
+        if len(listeners) > self.maxPending:
+            raise ValueError(f"{len(listeners)} listeners exceed maxPending={self.maxPending}")
+        result = Future()
+        if not listeners:
+            result.set_result([])
+            return result
+        self._reserve(len(listeners), block, timeout)
+        errors = [None] * len(listeners)
+        remaining = [len(listeners)]
+        lock = threading.Lock()
+        def done(i, future):
+            self._releaseSlots(1)
+            errors[i] = future.result()
+            with lock:
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished:
+                result.set_result([error for error in errors if error is not None])
+        submitted = 0
+        try:
+            pool = self._pool()
+            for i, listener in enumerate(listeners):
+                pool.submit(self._call, listener, args).add_done_callback(lambda future, i=i: done(i, future))
+                submitted += 1
+        except BaseException as e: # e.g. the pool is shut down. The listeners already submitted never complete the result
+            self._releaseSlots(len(listeners) - submitted)
+            result.set_exception(e)
+        return result
+
+    def fire(self, *args, block:bool=True, timeout:Optional[float]=None):
+        '''run every listener in the thread pool without waiting for them (fire-and-forget). See submit'''
+        self.submit(*args, block=block, timeout=timeout).add_done_callback(lambda future: self._printErrors(future.result()))
+
+    async def invoke_async(self, *args) -> List[ListenerError]:
+        '''
+        run all listeners concurrently and wait for them, return the errors they raised.
+        Coroutine listeners are gathered on the running loop; other listeners run in the thread pool.
+        '''
+        self._validateArgs(args)
+        loop = asyncio.get_running_loop()
+        awaitables = []
+        for listener in self._listeners:
+            if asyncio.iscoroutinefunction(listener):
+                awaitables.append(self._callAsync(listener, args))
+            else:
+                awaitables.append(loop.run_in_executor(self._pool(), self._call, listener, args))
+        errors = await asyncio.gather(*awaitables)
+        return [error for error in errors if error is not None]
+
+    def fire_async(self, *args) -> asyncio.Task:
+        '''
+        schedule invoke_async on the running loop without waiting for it (fire-and-forget), return the task.
+        Raises queue.Full if maxPending fired dispatches are still running.
+        '''
+        if len(self._tasks) >= self.maxPending:
+            raise queue.Full(f"{self.maxPending} dispatches of {self} are pending")
+        self._validateArgs(args)
+        task = asyncio.get_running_loop().create_task(self.invoke_async(*args))
+        self._tasks.add(task)
+        def done(task):
+            self._tasks.discard(task)
+            if not task.cancelled():
+                self._printErrors(task.result())
+        task.add_done_callback(done)
+        return task
+
+    def close(self, wait:bool=True):
+        '''shut down the thread pool (if it is created by this event)'''
+        if self._ownExecutor and self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+__all__ = ["AsyncEvent", "ListenerError"]
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+'''
+用作緩存的MultiKeyDict: 可選的容量上限(maxSize，按LRU或LFU淘汰)與每個對象的存活時間(ttl)。
+淘汰時對象從所有keyName的索引中一併刪除。過期的對象在下一次訪問時(惰性)刪除，也可以開啟後台線程定期清理。
+'''
+
+import functools, heapq, threading, time, traceback, weakref
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Literal, Optional, Sequence, Tuple, Any, Union
+from .MultiKeyDict import MultiKeyDict, _EMPTY
+
+EvictReason = Literal['size', 'expired']
+
+class _LRU:
+    '''最久未訪問的先淘汰'''
+
+    __slots__ = ('_order',)
+
+    def __init__(self):
+        self._order = OrderedDict() #slot, None. least recently used first
+    def __len__(self):
+        return len(self._order)
+    def track(self, slot:int):
+        self._order[slot] = None
+    def touch(self, slot:int):
+        self._order.move_to_end(slot)
+    def untrack(self, slot:int):
+        self._order.pop(slot, None)
+    def victim(self) -> int:
+        return next(iter(self._order))
+    def copy(self) -> '_LRU':
+        other = _LRU()
+        other._order = self._order.copy()
+        return other
+    def clear(self):
+        self._order.clear()
+
+class _LFU:
+    '''訪問次數最少的先淘汰，次數相同時最久未訪問的先淘汰。各操作O(1)'''
+
+    __slots__ = ('_counts', '_buckets', '_minCount')
+
+    def __init__(self):
+        self._counts = {} #slot, access count
+        self._buckets = {} #count, OrderedDict(slot, None)
+        self._minCount = 0
+    def __len__(self):
+        return len(self._counts)
+    def track(self, slot:int):
+        self._counts[slot] = 1
+        bucket = self._buckets.get(1, None)
+        if bucket is None:
+            bucket = self._buckets[1] = OrderedDict()
+        bucket[slot] = None
+        self._minCount = 1
+    def _leave(self, slot:int, count:int):
+        bucket = self._buckets[count]
+        del bucket[slot]
+        if not bucket:
+            del self._buckets[count]
+    def touch(self, slot:int):
+        count = self._counts[slot]
+        self._leave(slot, count)
+        if self._minCount == count and count not in self._buckets:
+            self._minCount = count + 1
+        self._counts[slot] = count + 1
+        bucket = self._buckets.get(count + 1, None)
+        if bucket is None:
+            bucket = self._buckets[count + 1] = OrderedDict()
+        bucket[slot] = None
+    def untrack(self, slot:int):
+        count = self._counts.pop(slot, None)
+        if count is not None:
+            self._leave(slot, count)
+    def victim(self) -> int:
+        if self._minCount not in self._buckets:
+            self._minCount = min(self._buckets)
+        return next(iter(self._buckets[self._minCount]))
+    def copy(self) -> '_LFU':
+        other = _LFU()
+        other._counts = self._counts.copy()
+        other._buckets = {count: bucket.copy() for count, bucket in self._buckets.items()}
+        other._minCount = self._minCount
+        return other
+    def clear(self):
+        self._counts.clear()
+        self._buckets.clear()
+        self._minCount = 0
+
+def _sweep(ref:weakref.ref, interval:float, stopped:threading.Event):
+    '''background sweeper, stop when the cache is closed or garbage collected'''
+    while not stopped.wait(interval):
+        cache = ref()
+        if cache is None:
+            return
+        try:
+            cache.expire()
+        except Exception:
+            traceback.print_exc()
+        del cache
+
+class CacheMultiKeyDict(MultiKeyDict):
+
+    __slots__ = ('maxSize', 'ttl', 'onEvict', 'hits', 'misses', 'evictions', 'expirations',
+                 '_policy', '_expires', '_heap', '_lock', '_stopped', '_sweepInterval', '__weakref__')
+
+    def __init__(self, keyNames:Sequence, *args, maxSize:Optional[int]=None, policy:Literal['lru', 'lfu']='lru',
+                 ttl:Optional[float]=None, onEvict:Optional[Callable[[Dict[str, Any], Any, EvictReason], Any]]=None,
+                 sweepInterval:Optional[float]=None, ordered:Sequence[str]=()):
+        '''
+        must provide keynames by a sequence or multiple arguments
+        :param maxSize: 對象數量上限，超出時按policy淘汰。None為不限
+        :param policy: 'lru'(最久未訪問) / 'lfu'(訪問次數最少)。get / [] / set 算作訪問
+        :param ttl: 默認存活時間(秒)，None為永不過期。add時可逐個指定
+        :param onEvict: onEvict({keyName: key}, value, reason)，因容量('size')或過期('expired')刪除對象後調用。pop不會調用
+        :param sweepInterval: 每隔多少秒在後台線程清理過期對象。開啟後所有操作都會加鎖，可在多線程間共享。None為只惰性清理(不加鎖)
+        :param ordered: 見MultiKeyDict
+        '''
+        super().__init__(keyNames, *args, ordered=ordered)
+        if maxSize is not None and maxSize < 1:
+            raise ValueError("maxSize must be at least 1")
+        if policy not in ('lru', 'lfu'):
+            raise ValueError(f"Unknown policy: {policy}")
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self.onEvict = onEvict
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self._policy = (_LRU() if policy == 'lru' else _LFU()) if maxSize is not None else None
+        self._expires = {} #slot, expire time (time.monotonic)
+        self._heap = [] #(expire time, slot), may contain stale entries
+        self._stopped = threading.Event()
+        self._sweepInterval = sweepInterval
+        self._lock = None
+        if sweepInterval is not None:
+            self._lock = threading.RLock()
+            threading.Thread(target=_sweep, args=(weakref.ref(self), sweepInterval, self._stopped),
+                             name='CacheMultiKeyDict sweeper', daemon=True).start()
+    def __new__(cls, *args, sweepInterval:Optional[float]=None, **kwargs):
+        '''with a background sweeper, create a _LockedCacheMultiKeyDict whose methods hold a lock. Otherwise no lock is used'''
+        if sweepInterval is not None and cls is CacheMultiKeyDict:
+            cls = _LockedCacheMultiKeyDict
+        return super().__new__(cls)
+
+    def __repr__(self):
+        return f"<CacheMultiKeyDict{self._keyNames}>"
+    def __str__(self):
+        return f"<CacheMultiKeyDict{self._keyNames}>"
+
+    #region eviction
+    def _remove(self, slot:int):
+        if self._policy is not None:
+            self._policy.untrack(slot)
+        self._expires.pop(slot, None)
+        return super()._remove(slot)
+    def _evict(self, slot:int, reason:EvictReason):
+        keys = {keyName: column[slot] for keyName, column in self._columns.items() if column[slot] is not _EMPTY}
+        value = self._remove(slot)
+        if reason == 'size':
+            self.evictions += 1
+        else:
+            self.expirations += 1
+        if self.onEvict is not None:
+            self.onEvict(keys, value, reason)
+    def _expireDue(self):
+        if self._expires:
+            self.expire()
+    def _admit(self, slots:List[int], ttl:Optional[float]):
+        '''track newly added slots, evict beyond maxSize and record expire time'''
+        if ttl is None:
+            ttl = self.ttl
+        if ttl is not None:
+            expireAt = time.monotonic() + ttl
+            for slot in slots:
+                self._expires[slot] = expireAt
+                heapq.heappush(self._heap, (expireAt, slot))
+        policy = self._policy
+        if policy is None:
+            return
+        overflow = super().__len__() - self.maxSize
+        while overflow > 0 and len(policy):
+            self._evict(policy.victim(), 'size')
+            overflow -= 1
+        for slot in slots:
+            policy.track(slot)
+        for _ in range(overflow):  # added more than maxSize at once
+            self._evict(policy.victim(), 'size')
+    def _touch(self, slot:int):
+        if self._policy is not None:
+            self._policy.touch(slot)
+    def expire(self) -> int:
+        """remove all expired objects now, return the number removed"""
+        heap, expires = self._heap, self._expires
+        now = time.monotonic()
+        count = 0
+        while heap and heap[0][0] <= now:
+            expireAt, slot = heapq.heappop(heap)
+            if expires.get(slot, None) == expireAt:
+                self._evict(slot, 'expired')
+                count += 1
+        if len(heap) > 2 * len(expires) + 64:  # drop stale entries left by pop / re-added slots
+            self._heap = [(expireAt, slot) for slot, expireAt in expires.items()]
+            heapq.heapify(self._heap)
+        return count
+    def stats(self) -> Dict[str, Union[int, float]]:
+        '''{"hits", "misses", "hit_rate", "evictions", "expirations", "entries"}'''
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions, 'expirations': self.expirations, 'entries': super().__len__()}
+    def close(self):
+        """stop the background sweeper"""
+        self._stopped.set()
+    #endregion
+
+    def __getitem__(self, keyNameAndKey):
+        """if only 1 argument, return getDict(keyName), else return get(keyName, key)"""
+        if type(keyNameAndKey) is tuple and len(keyNameAndKey) == 2:
+            keyName, key = keyNameAndKey
+        else:
+            keyName, key = self._unpackKey(keyNameAndKey)
+        if key is None:
+            return self.getDict(keyName)
+        self._expireDue()
+        slot = self._index(keyName).get(key, None)
+        if slot is None:
+            self.misses += 1
+            raise KeyError(f"{keyName} with key {key} does not exist")
+        self.hits += 1
+        self._touch(slot)
+        return self._values[slot]
+    def __contains__(self, keyNameAndKey):
+        self._expireDue()
+        return super().__contains__(keyNameAndKey)
+    def __iter__(self):
+        self._expireDue()
+        return super().__iter__()
+    def __len__(self):
+        self._expireDue()
+        return super().__len__()
+
+    def hasKey(self, keyName, key):
+        self._expireDue()
+        return super().hasKey(keyName, key)
+    def keys(self, keyName):
+        self._expireDue()
+        return super().keys(keyName)
+    def values(self, keyName=None):
+        self._expireDue()
+        return super().values(keyName)
+    def items(self, keyName):
+        self._expireDue()
+        return super().items(keyName)
+    def get(self, keyName, key, default=None):
+        """if key is None, return a copy dict of {key: value},
+           else return value (counted as a hit or miss)"""
+        if key is None:
+            return self.getDict(keyName)
+        self._expireDue()
+        slot = self._index(keyName).get(key, None)
+        if slot is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._touch(slot)
+        return self._values[slot]
+    def getID(self, keyName, key) -> int:
+        self._expireDue()
+        return super().getID(keyName, key)
+    def getDict(self, keyName):
+        self._expireDue()
+        return super().getDict(keyName)
+    def rangeItems(self, keyName, minKey=None, maxKey=None, inclusive:Tuple[bool, bool]=(True, False),
+                   reverse:bool=False) -> List[Tuple[Any, Any]]:
+        self._expireDue()
+        return super().rangeItems(keyName, minKey, maxKey, inclusive, reverse)
+    def set(self, keyName, key, value):
+        self._expireDue()
+        super().set(keyName, key, value)
+        self._touch(self._dicts[keyName][key])
+    def add(self, KeyNamesAndKeys:Dict[str, any], value, ttl:Optional[float]=None) -> int:
+        """add value with {keyName: key}, return its id. ttl: seconds to live, None for the default ttl"""
+        self._expireDue()
+        slot = super().add(KeyNamesAndKeys, value)
+        self._admit([slot], ttl)
+        return slot
+    def add_many(self, items:Iterable[Tuple[Dict[str, Any], Any]], ttl:Optional[float]=None) -> List[int]:
+        """add many (KeyNamesAndKeys, value) pairs, return their ids. If more than maxSize are added, the first ones are evicted"""
+        self._expireDue()
+        slots = super().add_many(items)
+        self._admit(slots, ttl)
+        return slots
+    def setKey(self, id, keyName, key):
+        self._expireDue()
+        super().setKey(id, keyName, key)
+    def pop(self, keyName, key):
+        self._expireDue()
+        return super().pop(keyName, key)
+    def pop_many(self, keyName, keys:Iterable) -> list:
+        self._expireDue()
+        return super().pop_many(keyName, keys)
+    def copy(self) -> 'CacheMultiKeyDict':
+        """return a shallow copy (values are not copied) with the same settings, access order, expire times and stats.
+           A copy of a cache with a background sweeper has its own sweeper and lock"""
+        other = type(self)(self._keyNames, maxSize=self.maxSize, policy='lfu' if isinstance(self._policy, _LFU) else 'lru',
+                           ttl=self.ttl, onEvict=self.onEvict, sweepInterval=self._sweepInterval, ordered=tuple(self._ordered))
+        if other._lock is not None:
+            other._lock.acquire() # its sweeper must not expire it half copied
+        try:
+            self._copyTo(other)
+            if self._policy is not None:
+                other._policy = self._policy.copy()
+            other._expires = self._expires.copy()
+            other._heap = self._heap.copy()
+            other.hits, other.misses, other.evictions, other.expirations = self.hits, self.misses, self.evictions, self.expirations
+        finally:
+            if other._lock is not None:
+                other._lock.release()
+        return other
+    def clear(self):
+        super().clear()
+        if self._policy is not None:
+            self._policy.clear()
+        self._expires.clear()
+        self._heap.clear()
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class _LockedCacheMultiKeyDict(CacheMultiKeyDict):
+    '''
+    CacheMultiKeyDict with a background sweeper: every method holds the lock, so it can also be shared between threads.
+    keys / values / items / iter return snapshots copied under the lock instead of live views (the sweeper may delete entries
+    at any time), like ConcurrentMultiKeyDict
+    '''
+
+    __slots__ = ()
+
+    def __iter__(self):
+        """iter a snapshot of all objects"""
+        return iter(tuple(CacheMultiKeyDict.__iter__(self)))
+    def keys(self, keyName):
+        """return a snapshot tuple of keys of the target dict"""
+        return tuple(CacheMultiKeyDict.keys(self, keyName))
+    def values(self, keyName=None):
+        """return a snapshot tuple of values of the target dict, or all values if keyName is None"""
+        self._expireDue()
+        values = self._values
+        if keyName is None:
+            return tuple(value for value in values if value is not _EMPTY)
+        return tuple(values[slot] for slot in self._index(keyName).values())
+    def items(self, keyName):
+        """return a snapshot tuple of (key, value) of the target dict"""
+        self._expireDue()
+        values = self._values
+        return tuple((key, values[slot]) for key, slot in self._index(keyName).items())
+
+for _name in ('__getitem__', '__setitem__', '__contains__', '__iter__', '__len__', 'hasKey', 'keys', 'values', 'items', 'get',
+              'getID', 'getDict', 'rangeItems', 'prefixItems', 'sortedItems', 'set', 'add', 'add_many', 'setKey', 'pop', 'pop_many',
+              'clear', 'copy', 'expire', 'stats'):
+    setattr(_LockedCacheMultiKeyDict, _name, _locked(getattr(_LockedCacheMultiKeyDict, _name)))
+del _name
+
+__all__ = ["CacheMultiKeyDict"]
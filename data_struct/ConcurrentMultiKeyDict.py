@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+'''
+線程安全的MultiKeyDict，用於在多個工作線程間共享(如以user id / token / connection id索引的session表)。
+鎖分段(lock striping):
+    - 每個keyName有stripes個鍵鎖，按hash(key)分段。add / setKey 持有涉及的所有鍵鎖，"檢查鍵是否被佔用+寫入"是原子的
+    - stripes個對象鎖，按slot分段。pop / setKey / set 持有對象所在slot的鎖，同一對象的修改互斥
+    - 一個分配鎖，只在分配/回收slot時持有
+    - 每個ordered keyName的有序鍵只在持有有序鍵鎖時修改/查詢
+所有鎖按固定順序(鍵鎖 < 對象鎖 < 分配鎖 / 有序鍵鎖)獲取，不會死鎖。
+讀取(get / []/ hasKey)不加鎖，讀到被並發pop/重用的slot時會重試，重試多次仍失敗時改為持有對象鎖讀取。
+迭代(values / items / keys / getDict / iter)先在持有全部鎖時複製所需的數據，再在副本上迭代。
+複製是O(n)的，期間所有寫入都要等待，所以頻繁調用時應改用get / rangeItems，或偶爾取一次snapshot後重複使用。
+'''
+
+import threading
+from typing import Dict, Iterable, List, Tuple, Any, Sequence
+from .MultiKeyDict import MultiKeyDict, _EMPTY
+
+_READ_RETRIES = 8
+'''lock-free read attempts before _read takes the slot lock'''
+
+class ConcurrentMultiKeyDict(MultiKeyDict):
+
+    __slots__ = ('_stripes', '_locks', '_slotLockStart', '_allocLock', '_orderedLock', '_positions')
+
+    def __init__(self, keyNames:Sequence, *args, stripes:int=16, ordered:Sequence[str]=()):
+        '''
+        must provide keynames by a sequence or multiple arguments
+        :param stripes: 每個keyName的鍵鎖數量，以及對象鎖數量。1即每個keyName一把鎖
+        :param ordered: 見MultiKeyDict
+        '''
+        super().__init__(keyNames, *args, ordered=ordered)
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+        self._stripes = stripes
+        self._positions = {keyName: i for i, keyName in enumerate(self._keyNames)}
+        self._slotLockStart = len(self._keyNames) * stripes
+        self._locks = [threading.Lock() for _ in range(self._slotLockStart + stripes)] #key locks of each keyName, then slot locks
+        self._allocLock = threading.Lock()
+        self._orderedLock = threading.Lock()
+
+    def __repr__(self):
+        return f"<ConcurrentMultiKeyDict{self._keyNames}>"
+    def __str__(self):
+        return f"<ConcurrentMultiKeyDict{self._keyNames}>"
+
+    #region locks
+    def _keyLock(self, keyName, key) -> int:
+        try:
+            return self._positions[keyName] * self._stripes + hash(key) % self._stripes
+        except KeyError:
+            raise KeyError(f"{keyName} is not a valid key name") from None
+    def _slotLock(self, slot:int) -> int:
+        return self._slotLockStart + slot % self._stripes
+    def _acquire(self, lockIndexes:Iterable[int]) -> List[threading.Lock]:
+        '''acquire locks in the global order, return them for _release'''
+        allLocks = self._locks
+        locks = [allLocks[i] for i in sorted(set(lockIndexes))]
+        for lock in locks:
+            lock.acquire()
+        return locks
+    @staticmethod
+    def _release(locks:List[threading.Lock]):
+        for lock in reversed(locks):
+            lock.release()
+    def _allocate(self) -> int:
+        with self._allocLock:
+            return super()._allocate()
+    def _extend(self, values:list, columnKeys:Dict[str, list]) -> range:
+        with self._allocLock:
+            return super()._extend(values, columnKeys)
+    def _orderedAdd(self, keys:Dict[str, list]):
+        with self._orderedLock:
+            super()._orderedAdd(keys)
+    def _orderedRemove(self, keyName, key):
+        with self._orderedLock:
+            super()._orderedRemove(keyName, key)
+    def _withAllLocks(self, func):
+        '''return func() called while holding every lock (nothing can change meanwhile)'''
+        locks = self._acquire(range(len(self._locks)))
+        try:
+            with self._allocLock:
+                return func()
+        finally:
+            self._release(locks)
+    #endregion
+
+    def __getitem__(self, keyNameAndKey):
+        """if only 1 argument, return a snapshot dict of {key: value}, else return get(keyName, key)"""
+        if type(keyNameAndKey) is tuple and len(keyNameAndKey) == 2:
+            keyName, key = keyNameAndKey
+        else:
+            keyName, key = self._unpackKey(keyNameAndKey)
+        if key is None:
+            return self.getDict(keyName)
+        value = self._read(keyName, key)
+        if value is _EMPTY:
+            raise KeyError(f"{keyName} with key {key} does not exist")
+        return value
+    def __iter__(self):
+        """iter a snapshot of all objects"""
+        return iter(self.snapshot())
+    def __len__(self):
+        with self._allocLock:
+            return super().__len__()
+
+    def _read(self, keyName, key):
+        '''
+        lock-free get, _EMPTY if not exist. Retry if the slot is popped / reused during reading,
+        after _READ_RETRIES attempts read under the slot lock (pop / setKey / set of that object hold it)
+        '''
+        try:
+            index, column, values = self._dicts[keyName], self._columns[keyName], self._values
+        except KeyError:
+            raise KeyError(f"{keyName} is not a valid key name") from None
+        for _ in range(_READ_RETRIES):
+            slot = index.get(key, None)
+            if slot is None:
+                return _EMPTY
+            value = values[slot]
+            current = column[slot]
+            if value is not _EMPTY and (current is key or current == key):
+                return value
+        while True:
+            slot = index.get(key, None)
+            if slot is None:
+                return _EMPTY
+            with self._locks[self._slotLockStart + slot % self._stripes]:
+                if index.get(key, None) == slot:
+                    return values[slot]
+    def snapshot(self) -> MultiKeyDict:
+        """a consistent copy (a normal MultiKeyDict) taken while holding all locks. O(n), writers wait for it"""
+        return self._withAllLocks(lambda: MultiKeyDict.copy(self))
+    copy = snapshot
+    def keys(self, keyName):
+        """return a snapshot tuple of keys of the target dict. O(n) copy while holding all locks, writers wait for it"""
+        index = self._index(keyName)
+        return self._withAllLocks(lambda: tuple(index))
+    def values(self, keyName=None):
+        """return a snapshot tuple of values of the target dict, or all values if keyName is None.
+           O(n) copy while holding all locks, writers wait for it"""
+        values = self._values
+        if keyName is None:
+            return self._withAllLocks(lambda: tuple(value for value in values if value is not _EMPTY))
+        index = self._index(keyName)
+        return self._withAllLocks(lambda: tuple(values[slot] for slot in index.values()))
+    def items(self, keyName):
+        """return a snapshot tuple of (key, value) of the target dict. O(n) copy while holding all locks, writers wait for it"""
+        index, values = self._index(keyName), self._values
+        return self._withAllLocks(lambda: tuple((key, values[slot]) for key, slot in index.items()))
+    def get(self, keyName, key, default=None):
+        """if key is None, return a snapshot dict of {key: value},
+           else return value"""
+        if key is None:
+            return self.getDict(keyName)
+        value = self._read(keyName, key)
+        return default if value is _EMPTY else value
+    def getDict(self, keyName):
+        """return a snapshot dict of {key: value}. O(n) copy while holding all locks, writers wait for it"""
+        self._index(keyName)
+        return self._withAllLocks(lambda: MultiKeyDict.getDict(self, keyName))
+    def rangeItems(self, keyName, minKey=None, maxKey=None, inclusive:Tuple[bool, bool]=(True, False),
+                   reverse:bool=False) -> List[Tuple[Any, Any]]:
+        """see MultiKeyDict.rangeItems. Objects added / popped during the query may or may not be included"""
+        sortedKeys = self._orderedKeys(keyName)
+        with self._orderedLock:
+            keys = sortedKeys.irange(minKey, maxKey, inclusive)
+        if reverse:
+            keys.reverse()
+        items = []
+        for key in keys:
+            value = self._read(keyName, key)
+            if value is not _EMPTY:
+                items.append((key, value))
+        return items
+
+    def set(self, keyName, key, value):
+        """set value by keyName and key. Key must be existed in the target dict"""
+        index = self._index(keyName)
+        while True:
+            slot = index.get(key, None)
+            if slot is None:
+                raise KeyError(f"{key} is not a valid key")
+            with self._locks[self._slotLockStart + slot % self._stripes]:
+                if index.get(key, None) == slot:
+                    self._values[slot] = value
+                    return
+    def add(self, KeyNamesAndKeys:Dict[str, any], value) -> int:
+        """add value with {keyName: key} atomically, return its id"""
+        positions, stripes = self._positions, self._stripes
+        try:
+            lockIndexes = [positions[keyName] * stripes + hash(key) % stripes for keyName, key in KeyNamesAndKeys.items()]
+        except KeyError:
+            lockIndexes = [self._keyLock(keyName, key) for keyName, key in KeyNamesAndKeys.items()]
+        locks = self._acquire(lockIndexes)
+        try:
+            return super().add(KeyNamesAndKeys, value)
+        finally:
+            self._release(locks)
+    def add_many(self, items:Iterable[Tuple[Dict[str, Any], Any]]) -> List[int]:
+        """add many (KeyNamesAndKeys, value) pairs atomically, return their ids"""
+        items = list(items)
+        locks = self._acquire([self._keyLock(keyName, key) for keyNamesAndKeys, _ in items for keyName, key in keyNamesAndKeys.items()])
+        try:
+            return super().add_many(items)
+        finally:
+            self._release(locks)
+    def setKey(self, id, keyName, key):
+        """set a key to the target obj with the id. The old key of that keyName is removed"""
+        self._index(keyName)
+        if not (type(id) is int and 0 <= id < len(self._values)):
+            raise KeyError(f"{id} is not a valid id")
+        column = self._columns[keyName]
+        while True:
+            old = column[id]
+            lockIndexes = [self._keyLock(keyName, key), self._slotLock(id)]
+            if old is not _EMPTY:
+                lockIndexes.append(self._keyLock(keyName, old))
+            locks = self._acquire(lockIndexes)
+            try:
+                if column[id] is old:
+                    return super().setKey(id, keyName, key)
+            finally:
+                self._release(locks)
+    def pop(self, keyName, key):
+        """remove the object from all dicts atomically, return it"""
+        index = self._index(keyName)
+        while True:
+            slot = index.get(key, None)
+            if slot is None:
+                raise KeyError(f"{keyName}:{key} is not exist")
+            with self._locks[self._slotLockStart + slot % self._stripes]:
+                if index.get(key, None) == slot:
+                    return self._remove(slot)
+    def pop_many(self, keyName, keys:Iterable) -> list:
+        """pop many objects by keys of keyName atomically, return their values in order"""
+        index = self._index(keyName)
+        keys = list(keys)
+        while True:
+            slots = [index.get(key, None) for key in keys]
+            if None in slots:
+                raise KeyError(f"{keyName}:{keys[slots.index(None)]} is not exist")
+            locks = self._acquire([self._slotLock(slot) for slot in slots])
+            try:
+                if [index.get(key, None) for key in keys] == slots:
+                    return super().pop_many(keyName, keys)
+            finally:
+                self._release(locks)
+    def clear(self):
+        self._withAllLocks(super().clear)
+
+__all__ = ["ConcurrentMultiKeyDict"]
@@ -1,16 +1,32 @@
 # -*- coding: utf-8 -*-
 '''事件类，用于实现事件机制。比PYQT原生Signal輕量，不需要QObject'''
 
+from collections import deque
+from itertools import starmap
 from types import FunctionType, MethodType
-from typing import Callable, Iterable
+from typing import Callable, Iterable, Sequence
+
+TYPE_CHECK_MODES = ('always', 'first', 'debug')
+'''
+Event的參數類型檢查模式:
+    - always: 每次invoke都檢查參數個數與類型(預設)
+    - first: 只檢查第一次invoke(/invoke_many)
+    - debug: 只在__debug__為True時檢查，即python -O運行時不檢查
+'''
 
 class Event:
-    def __init__(self, *args):
+    def __init__(self, *args, typeCheck:str='always'):
         for arg in args:
             if not isinstance(arg, type):
                 raise Exception("Event's arg must be type")
+        if typeCheck not in TYPE_CHECK_MODES:
+            raise ValueError(f"typeCheck must be one of {TYPE_CHECK_MODES}, got {typeCheck!r}")
         self.args = tuple(args)
-        self._events = []
+        self.typeCheck = typeCheck
+        self._validate = __debug__ if typeCheck == 'debug' else True
+        self._keepValidating = typeCheck != 'first'
+        self._events = {} #listener, None. An ordered set
+        self._listeners = () #immutable snapshot of _events, rebuilt only when listeners change
 
     def __iadd__(self, other):
         self.addListener(other)
@@ -23,12 +39,12 @@ class Event:
     @property
     def events(self)->tuple:
         '''return a tuple of events'''
-        return tuple(self._events)
+        return self._listeners
 
     @property
     def events_iter(self)->Iterable:
         '''return a iterator of events'''
-        return iter(self._events)
+        return iter(self._listeners)
 
     def addListener(self, listener:Callable):
         '''add a listener to event'''
@@ -40,35 +56,66 @@ class Event:
             raise Exception("Listener must be function or method")
         if len(self.args) != argLength:
             raise Exception("Listener's arg length not match")
-        self._events.append(listener) if listener not in self.events else None
+        if listener not in self._events:
+            self._events[listener] = None
+            self._listeners = tuple(self._events)
 
     def removeListener(self, listener:Callable):
         '''remove a listener from event'''
-        self._events.remove(listener)
+        try:
+            del self._events[listener]
+        except KeyError:
+            raise ValueError(f"{listener} is not a listener of this event") from None
+        self._listeners = tuple(self._events)
 
-    def invoke(self, *args):
-        '''invoke all listeners'''
+    def _checkArgs(self, args:tuple):
+        '''raise the error for args whose types are not exactly self.args'''
         if len(args) < len(self.args):
             argNeeded = self.args[len(args):]
-            outputStr = ""
-            for arg in argNeeded:
-                outputStr += f"{arg.__qualname__}, "
-            outputStr = outputStr[:-2]
-            raise Exception(f"Parameter: {outputStr[:-2]} are not provided")
+            raise Exception(f"Parameter: {', '.join(arg.__qualname__ for arg in argNeeded)} are not provided")
         elif len(args) > len(self.args):
             raise Exception(f"Too many parameters")
-        for i,arg in enumerate(args):
-            if type(arg) is not self.args[i]:
-                raise Exception(f"Parameter: {arg} is not {self.args[i].__qualname__}")
-        for event in self.events:
-            event(*args)
+        for arg, argType in zip(args, self.args):
+            if type(arg) is not argType:
+                raise Exception(f"Parameter: {arg} is not {argType.__qualname__}")
+
+    def invoke(self, *args):
+        '''invoke all listeners'''
+        if self._validate:
+            if tuple(map(type, args)) != self.args:
+                self._checkArgs(args)
+            self._validate = self._keepValidating
+        for listener in self._listeners:
+            listener(*args)
+
+    def invoke_many(self, batch:Iterable[Sequence]):
+        '''
+        invoke all listeners once for each args in batch, in order. Same as calling invoke(*args) for each args,
+        but the listener snapshot is taken once, and when type checking is on, all args are checked before any listener is called.
+        '''
+        listeners = self._listeners
+        if self._validate:
+            batch = list(batch)
+            argTypes = self.args
+            for args in batch:
+                if tuple(map(type, args)) != argTypes:
+                    self._checkArgs(tuple(args))
+            if batch:
+                self._validate = self._keepValidating
+        if len(listeners) == 1:
+            deque(starmap(listeners[0], batch), maxlen=0) # dispatch loop in C
+            return
+        for args in batch:
+            for listener in listeners:
+                listener(*args)
 
     def eventsCount(self):
         '''return the count of events'''
-        return len(self._events)
+        return len(self._listeners)
 
     def clear(self):
         '''clear all events'''
         self._events.clear()
+        self._listeners = ()
 
-__all__ = ["Event"]
\ No newline at end of file
+__all__ = ["Event", "TYPE_CHECK_MODES"]
@@ -1,36 +1,208 @@
 # -*- coding: utf-8 -*-
-'''多鍵字典，可以用多個鍵值查找對應的值'''
+'''
+多鍵字典，可以用多個鍵值查找對應的值。
+內部以整數slot保存對象: 值與每個keyName的鍵各自存放在按slot索引的list中(列式存儲)，
+每個keyName一個 {key: slot} 的索引字典。pop後的slot放入空閒列表，下次add時重用。
+'''
 
-from typing import Tuple, Sequence, Dict
-from ..utils.CryptoUtils import generateUUID
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import ValuesView, ItemsView
+from itertools import chain
+from typing import Tuple, Sequence, Dict, Iterable, List, Any
+
+_EMPTY = object()
+'''空slot的值 / 對象沒有該keyName的鍵時的佔位'''
+
+class _MultiKeyValuesView(ValuesView):
+    '''MultiKeyDict.values()的結果，不複製數據，隨字典變化'''
+
+    __slots__ = ('_owner', '_index')
+
+    def __init__(self, owner:'MultiKeyDict', index:dict=None):
+        self._owner = owner
+        self._index = index
+    def __len__(self):
+        return len(self._owner) if self._index is None else len(self._index)
+    def __iter__(self):
+        values = self._owner._values
+        if self._index is None:
+            return (value for value in values if value is not _EMPTY)
+        return (values[slot] for slot in self._index.values())
+    def __contains__(self, value):
+        return any(v is value or v == value for v in self)
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)})"
+
+class _MultiKeyItemsView(ItemsView):
+    '''MultiKeyDict.items(keyName)的結果，不複製數據，隨字典變化'''
+
+    __slots__ = ('_owner', '_index')
+
+    def __init__(self, owner:'MultiKeyDict', index:dict):
+        self._owner = owner
+        self._index = index
+    def __len__(self):
+        return len(self._index)
+    def __iter__(self):
+        values = self._owner._values
+        return ((key, values[slot]) for key, slot in self._index.items())
+    def __contains__(self, item):
+        key, value = item
+        slot = self._index.get(key, None)
+        if slot is None:
+            return False
+        v = self._owner._values[slot]
+        return v is value or v == value
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)})"
+
+class _SortedKeys:
+    '''
+    有序的鍵(不重複)，用於ordered keyName的範圍查詢。分塊存放: 若干個各自有序、長度約LOAD的list，以及每塊的最大值。
+    插入/刪除O(log n + LOAD)，範圍查詢O(log n + k)
+    '''
+
+    __slots__ = ('_lists', '_maxes', '_len')
+    LOAD = 1000
+
+    def __init__(self, keys:Iterable=()):
+        self._lists, self._maxes, self._len = [], [], 0
+        self._build(sorted(keys))
+    def _build(self, keys:list):
+        load = self.LOAD
+        self._lists = [keys[i:i + load] for i in range(0, len(keys), load)]
+        self._maxes = [sub[-1] for sub in self._lists]
+        self._len = len(keys)
+    def __len__(self):
+        return self._len
+    def __iter__(self):
+        return chain.from_iterable(self._lists)
+    def add(self, key):
+        lists, maxes = self._lists, self._maxes
+        if not maxes:
+            lists.append([key])
+            maxes.append(key)
+        else:
+            i = bisect_right(maxes, key)
+            if i == len(maxes):
+                i -= 1
+                lists[i].append(key)
+                maxes[i] = key
+            else:
+                insort(lists[i], key)
+            if len(lists[i]) > 2 * self.LOAD:
+                sub = lists[i]
+                lists[i:i + 1] = [sub[:self.LOAD], sub[self.LOAD:]]
+                maxes[i:i + 1] = [sub[self.LOAD - 1], sub[-1]]
+        self._len += 1
+    def update(self, keys:list):
+        '''add many keys. TypeError (keys not comparable) leaves it unchanged'''
+        if len(keys) * 8 > self._len:
+            self._build(sorted(chain(self, keys)))
+            return
+        added = []
+        try:
+            for key in keys:
+                self.add(key)
+                added.append(key)
+        except TypeError:
+            for key in added:
+                self.remove(key)
+            raise
+    def remove(self, key):
+        lists, maxes = self._lists, self._maxes
+        i = bisect_left(maxes, key)
+        sub = lists[i]
+        del sub[bisect_left(sub, key)]
+        if sub:
+            maxes[i] = sub[-1]
+        else:
+            del lists[i], maxes[i]
+        self._len -= 1
+    def irange(self, minKey=None, maxKey=None, inclusive:Tuple[bool, bool]=(True, False)) -> list:
+        '''keys between minKey and maxKey in order, None for no bound'''
+        lists, maxes = self._lists, self._maxes
+        if not maxes:
+            return []
+        if minKey is None:
+            i, j = 0, 0
+        else:
+            search = bisect_left if inclusive[0] else bisect_right
+            i = search(maxes, minKey)
+            if i == len(maxes):
+                return []
+            j = search(lists[i], minKey)
+        if maxKey is None:
+            i2, j2 = len(lists) - 1, len(lists[-1])
+        else:
+            search = bisect_right if inclusive[1] else bisect_left
+            i2 = search(maxes, maxKey)
+            if i2 == len(maxes):
+                i2, j2 = len(lists) - 1, len(lists[-1])
+            else:
+                j2 = search(lists[i2], maxKey)
+        if i > i2:
+            return []
+        if i == i2:
+            return lists[i][j:j2]
+        return list(chain(lists[i][j:], chain.from_iterable(lists[i + 1:i2]), lists[i2][:j2]))
+    def copy(self) -> '_SortedKeys':
+        other = _SortedKeys()
+        other._lists = [sub.copy() for sub in self._lists]
+        other._maxes = self._maxes.copy()
+        other._len = self._len
+        return other
+    def clear(self):
+        self._lists.clear()
+        self._maxes.clear()
+        self._len = 0
+
+def _prefixEnd(prefix):
+    '''the smallest str / bytes greater than all strings starting with prefix, None if unbounded'''
+    if isinstance(prefix, str):
+        stripped = prefix.rstrip(chr(0x10FFFF))
+        return stripped[:-1] + chr(ord(stripped[-1]) + 1) if stripped else None
+    stripped = bytes(prefix).rstrip(b'\xff')
+    return stripped[:-1] + bytes((stripped[-1] + 1,)) if stripped else None
 
 class MultiKeyDict:
 
-    _objects = {} #id, object
-    _idDict = {} #id, {keyName: key}
-    _dicts = {} #keyName, {key: id}
-    _keyNames:Tuple = None
+    __slots__ = ('_keyNames', '_dicts', '_columns', '_values', '_free', '_ordered')
 
-    def __init__(self, keyNames:Sequence, *args):
-        '''must provide keynames by a sequence or multiple arguments'''
+    def __init__(self, keyNames:Sequence, *args, ordered:Sequence[str]=()):
+        '''
+        must provide keynames by a sequence or multiple arguments
+        :param ordered: 需要範圍/前綴查詢或有序迭代的keyName(見rangeItems / prefixItems / sortedItems)，這些keyName的鍵須可以互相比較大小
+        '''
         if isinstance(keyNames, str):
             self._keyNames = tuple([keyNames, *args])
         elif isinstance(keyNames, Sequence):
             self._keyNames = tuple(keyNames)
         else:
             raise ValueError(f"must provide keynames by a sequence or multiple arguments")
-        self._dicts = {}
-        self._objects = {}
-        for keyName in self._keyNames:
-            self._dicts[keyName] = {}
+        self._dicts = {keyName: {} for keyName in self._keyNames} #keyName, {key: slot}
+        self._columns = {keyName: [] for keyName in self._keyNames} #keyName, [key of each slot]
+        self._values = [] #slot, object
+        self._free = [] #reusable slots
+        if isinstance(ordered, str):
+            ordered = (ordered,)
+        for keyName in ordered:
+            self._index(keyName)
+        self._ordered = {keyName: _SortedKeys() for keyName in ordered} #keyName, sorted keys
     @property
     def keyNames(self) -> Tuple:
         return self._keyNames
 
     def _hasKeyName(self, keyName:str) -> bool:
-        return keyName in self._keyNames
+        return keyName in self._dicts
+    def _index(self, keyName) -> dict:
+        '''{key: slot} of the key name'''
+        try:
+            return self._dicts[keyName]
+        except KeyError:
+            raise KeyError(f"{keyName} is not a valid key name") from None
     def _unpackKey(self, keyNameAndKey):
-        if isinstance(keyNameAndKey, Sequence):
+        if isinstance(keyNameAndKey, Sequence) and not isinstance(keyNameAndKey, str):
             if len(keyNameAndKey) == 2:
                 keyName, key = keyNameAndKey
                 return keyName, key
@@ -43,145 +215,268 @@ class MultiKeyDict:
             return keyNameAndKey, None
         else:
             raise ValueError(f"keyNameAndKey should be a tuple or string, but got {type(keyNameAndKey)}")
+    def _allocate(self) -> int:
+        """a slot for a new object, reuse a free slot if any"""
+        if self._free:
+            return self._free.pop()
+        self._values.append(_EMPTY)
+        for column in self._columns.values():
+            column.append(_EMPTY)
+        return len(self._values) - 1
+    def _extend(self, values:list, columnKeys:Dict[str, list]) -> range:
+        """append new slots for values and their keys (in column order), return the new slots"""
+        start = len(self._values)
+        self._values.extend(values)
+        for keyName, keys in columnKeys.items():
+            self._columns[keyName].extend(keys)
+        return range(start, start + len(values))
+    def _orderedKeys(self, keyName) -> _SortedKeys:
+        try:
+            return self._ordered[keyName]
+        except KeyError:
+            self._index(keyName)
+            raise KeyError(f"{keyName} is not an ordered key name") from None
+    def _orderedAdd(self, keys:Dict[str, list]):
+        """add {keyName: [keys]} to the sorted keys of ordered key names. If keys are not comparable, nothing is added"""
+        added = []
+        try:
+            for keyName, sortedKeys in self._ordered.items():
+                if keys.get(keyName):
+                    sortedKeys.update(keys[keyName])
+                    added.append(keyName)
+        except TypeError:
+            for keyName in added:
+                for key in keys[keyName]:
+                    self._ordered[keyName].remove(key)
+            raise
+    def _orderedRemove(self, keyName, key):
+        self._ordered[keyName].remove(key)
+    def _insert(self, keyNamesAndKeys:Dict[str, Any], value) -> int:
+        """store value with the keys (already checked) and return its slot"""
+        if self._ordered:
+            self._orderedAdd({keyName: [key] for keyName, key in keyNamesAndKeys.items() if keyName in self._ordered})
+        return self._store(keyNamesAndKeys, value)
+    def _store(self, keyNamesAndKeys:Dict[str, Any], value) -> int:
+        slot = self._allocate()
+        self._values[slot] = value
+        dicts, columns = self._dicts, self._columns
+        for keyName, key in keyNamesAndKeys.items():
+            columns[keyName][slot] = key
+            dicts[keyName][key] = slot
+        return slot
+    def _remove(self, slot:int):
+        '''remove the object in slot from all dicts, return the object'''
+        for keyName in self._ordered:
+            key = self._columns[keyName][slot]
+            if key is not _EMPTY:
+                self._orderedRemove(keyName, key)
+        for column, index in zip(self._columns.values(), self._dicts.values()):
+            key = column[slot]
+            if key is not _EMPTY:
+                del index[key]
+                column[slot] = _EMPTY
+        value = self._values[slot]
+        self._values[slot] = _EMPTY
+        self._free.append(slot)
+        return value
+
     def __setitem__(self, keyNameAndkey, value):
         """return set(keyName, key, value)"""
         keyName, key = self._unpackKey(keyNameAndkey)
         self.set(keyName, key, value)
     def __getitem__(self, keyNameAndKey):
         """if only 1 argument, return getDict(keyName), else return get(keyName, key)"""
-        keyName, key = self._unpackKey(keyNameAndKey)
-        if not self._hasKeyName(keyName):
-            raise KeyError(f"{keyName} is not a valid key name")
+        if type(keyNameAndKey) is tuple and len(keyNameAndKey) == 2:
+            keyName, key = keyNameAndKey
+        else:
+            keyName, key = self._unpackKey(keyNameAndKey)
+        index = self._index(keyName)
         if key is not None:
             try:
-                return self._objects[self._dicts[keyName][key]]
+                return self._values[index[key]]
             except KeyError:
-                raise KeyError(f"{keyName} with key {key} does not exist")
+                raise KeyError(f"{keyName} with key {key} does not exist") from None
         else:
             return self.getDict(keyName)
     def __contains__(self, keyNameAndKey):
         """if 2 args, return hasKey(keyName, key).
             if 1 arg, return True if keyname in all keynames"""
         keyName, key = self._unpackKey(keyNameAndKey)
+        index = self._index(keyName)
         if key is None:
-            if not self._hasKeyName(keyName):
-                raise KeyError(f"{keyName} is not a valid key name")
-            return keyName in self.keyNames
+            return True
         else:
-            return key in self._dicts[keyName]
+            return key in index
     def __repr__(self):
         return f"<MultiKeyDict{self._keyNames}>"
     def __str__(self):
         return f"<MultiKeyDict{self._keyNames}>"
     def __iter__(self):
         """iter all objects, with no keys"""
-        return iter(self._objects.values())
+        return (value for value in self._values if value is not _EMPTY)
     def __len__(self):
         """return the number of objects, not keys"""
-        return len(self._objects)
+        return len(self._values) - len(self._free)
 
     def hasKey(self, keyName, key):
         """return True if key is existed in the target dict"""
-        if not self._hasKeyName(keyName):
-            raise KeyError(f"{keyName} is not a valid key name")
-        return key in self._dicts[keyName]
+        return key in self._index(keyName)
     def keys(self, keyName):
-        """return a tuple of keys of the target dict"""
-        if not self._hasKeyName(keyName):
-            raise KeyError(f"{keyName} is not a valid key name")
-        return self._dicts[keyName].keys()
+        """return a view of keys of the target dict"""
+        return self._index(keyName).keys()
     def values(self, keyName=None):
-        """if kayname is given, return a tuple of values of the target dict.
-           else return a tuple of all values of all dicts"""
-        if keyName is not None:
-            if not self._hasKeyName(keyName):
-                raise KeyError(f"{keyName} is not a valid key name")
-            ret = []
-            for key, value in self._dicts[keyName].items():
-                ret.append(self._objects[value])
-            return tuple(ret)
-        else:
-            return tuple(self._objects.values())
+        """if kayname is given, return a view of values of the target dict.
+           else return a view of all values. Views are not copied and reflect later changes"""
+        return _MultiKeyValuesView(self, None if keyName is None else self._index(keyName))
     def items(self, keyName):
-        """return a tuple of (key, value) of the target dict"""
-        if not self._hasKeyName(keyName):
-            raise KeyError(f"{keyName} is not a valid key name")
-        ret = {}
-        for key, value in self._dicts[keyName].items():
-            ret[key] = self._objects[value]
-        return ret.items()
+        """return a view of (key, value) of the target dict"""
+        return _MultiKeyItemsView(self, self._index(keyName))
     def get(self, keyName, key, default=None):
         """if key is None, return a copy dict of {key: value},
            else return value"""
-        if not self._hasKeyName(keyName):
-            raise KeyError(f"{keyName} is not a valid key name")
+        index = self._index(keyName)
         if key is not None:
-            try:
-                return self._objects[self._dicts[keyName][key]]
-            except KeyError:
-                return default
+            slot = index.get(key, None)
+            return default if slot is None else self._values[slot]
         else:
             return self.getDict(keyName)
-    def getID(self, keyName, key):
-        """return real id"""
-        if not self._hasKeyName(keyName):
-            raise KeyError(f"{keyName} is not a valid key name")
+    def getID(self, keyName, key) -> int:
+        """return real id (an int slot). The id of a popped object may be reused by later add"""
         try:
-            return self._dicts[keyName][key]
+            return self._index(keyName)[key]
         except KeyError:
-            raise KeyError(f"{keyName} with key {key} does not exist")
+            raise KeyError(f"{keyName} with key {key} does not exist") from None
     def getDict(self, keyName):
         """return a copy dict of {key: value}"""
-        if not self._hasKeyName(keyName):
-            raise KeyError(f"{keyName} is not a valid key name")
-        ret = {}
-        for _key, _id in self._dicts[keyName].items():
-            ret[_key] = self._objects[_id]
-        return ret
+        values = self._values
+        return {_key: values[_slot] for _key, _slot in self._index(keyName).items()}
     def set(self, keyName, key, value):
         """set value by keyName and key. Key must be existed in the target dict"""
-        if not self._hasKeyName(keyName):
-            raise KeyError(f"{keyName} is not a valid key name")
-        if key in self._dicts[keyName]:
-            self._objects[self._dicts[keyName][key]] = value
-        else:
-            raise KeyError(f"{key} is not a valid key")
-    def add(self, KeyNamesAndKeys:Dict[str, any], value):
-        for keyName, key in KeyNamesAndKeys.items():
+        try:
+            self._values[self._index(keyName)[key]] = value
+        except KeyError:
             if not self._hasKeyName(keyName):
-                raise KeyError(f"{keyName} is not a valid key name")
-            if key in self._dicts[keyName]:
-                raise KeyError(f"{keyName}:{key} is already occupied")
-        id = generateUUID()
-        self._objects[id] = value
-        self._idDict[id] = KeyNamesAndKeys
+                raise
+            raise KeyError(f"{key} is not a valid key") from None
+    def add(self, KeyNamesAndKeys:Dict[str, any], value) -> int:
+        """add value with {keyName: key}, return its id"""
+        dicts = self._dicts
         for keyName, key in KeyNamesAndKeys.items():
-            self._dicts[keyName][key] = id
+            try:
+                occupied = key in dicts[keyName]
+            except KeyError:
+                raise KeyError(f"{keyName} is not a valid key name") from None
+            if occupied:
+                raise KeyError(f"{keyName}:{key} is already occupied")
+        return self._insert(KeyNamesAndKeys, value)
+    def add_many(self, items:Iterable[Tuple[Dict[str, Any], Any]]) -> List[int]:
+        """add many (KeyNamesAndKeys, value) pairs, return their ids.
+           All keys are checked before adding, so nothing is added if any key is occupied"""
+        items = list(items)
+        keyCount = 0
+        columns = {}
+        for keyName, index in self._dicts.items():
+            keys = [keyNamesAndKeys.get(keyName, _EMPTY) for keyNamesAndKeys, _ in items]
+            present = [key for key in keys if key is not _EMPTY]
+            if len(set(present)) != len(present):
+                raise KeyError(f"{keyName}: duplicated keys in the added items")
+            if not index.keys().isdisjoint(present):
+                occupied = next(key for key in present if key in index)
+                raise KeyError(f"{keyName}:{occupied} is already occupied")
+            keyCount += len(present)
+            columns[keyName] = (keys, len(present) == len(keys))
+        if keyCount != sum(len(keyNamesAndKeys) for keyNamesAndKeys, _ in items):
+            for keyNamesAndKeys, _ in items:
+                for keyName in keyNamesAndKeys:
+                    self._index(keyName)
+        if self._ordered:
+            self._orderedAdd({keyName: [key for key in columns[keyName][0] if key is not _EMPTY] for keyName in self._ordered})
+        reused = min(len(self._free), len(items))
+        slots = [self._store(keyNamesAndKeys, value) for keyNamesAndKeys, value in items[:reused]]
+        tail = {keyName: keys[reused:] for keyName, (keys, _) in columns.items()}
+        newSlots = self._extend([value for _, value in items[reused:]], tail)
+        for keyName, keys in tail.items():
+            if columns[keyName][1]:
+                self._dicts[keyName].update(zip(keys, newSlots))
+            else:
+                self._dicts[keyName].update((key, slot) for key, slot in zip(keys, newSlots) if key is not _EMPTY)
+        slots.extend(newSlots)
+        return slots
     def setKey(self, id, keyName, key):
-        """set a key to the target obj with the id"""
-        if not self._hasKeyName(keyName):
-            raise KeyError(f"{keyName} is not a valid key name")
-        if id not in self._objects:
+        """set a key to the target obj with the id. The old key of that keyName is removed"""
+        index = self._index(keyName)
+        if not (type(id) is int and 0 <= id < len(self._values) and self._values[id] is not _EMPTY):
             raise KeyError(f"{id} is not a valid id")
-        if key in self._dicts[keyName] and self._dicts[keyName][key] != id:
-            raise KeyError(f"{keyName}:{key} is already occupied by {self._dicts[keyName][key]}")
-        self._idDict[id][keyName] = key
-        self._dicts[keyName][key] = id
+        if index.get(key, id) != id:
+            raise KeyError(f"{keyName}:{key} is already occupied by {index[key]}")
+        column = self._columns[keyName]
+        if column[id] is key or column[id] == key:
+            return
+        if keyName in self._ordered:
+            self._orderedAdd({keyName: [key]})
+            if column[id] is not _EMPTY:
+                self._orderedRemove(keyName, column[id])
+        if column[id] is not _EMPTY:
+            del index[column[id]]
+        column[id] = key
+        index[key] = id
     def pop(self, keyName, key):
         """will remove from all dicts having the same object"""
-        if not self._hasKeyName(keyName):
-            raise KeyError(f"{keyName} is not a valid key name")
-        if key in self._dicts[keyName]:
-            id = self._dicts[keyName].pop(key)
-            for _keyName, _key in self._idDict[id].items():
-                if _keyName != keyName and _key in self._dicts[_keyName]:
-                    self._dicts[_keyName].pop(_key)
-            return self._objects.pop(id)
-        else:
-            raise KeyError(f"{keyName}:{key} is not exist")
+        try:
+            slot = self._index(keyName)[key]
+        except KeyError:
+            if not self._hasKeyName(keyName):
+                raise
+            raise KeyError(f"{keyName}:{key} is not exist") from None
+        return self._remove(slot)
+    def pop_many(self, keyName, keys:Iterable) -> list:
+        """pop many objects by keys of keyName, return their values in order.
+           All keys are checked before removing, so nothing is removed if any key does not exist"""
+        index = self._index(keyName)
+        keys = list(keys)
+        try:
+            slots = [index[key] for key in keys]
+        except KeyError as e:
+            raise KeyError(f"{keyName}:{e.args[0]} is not exist") from None
+        if len(set(slots)) != len(slots):
+            raise KeyError(f"{keyName}: duplicated keys to pop")
+        return [self._remove(slot) for slot in slots]
+    def rangeItems(self, keyName, minKey=None, maxKey=None, inclusive:Tuple[bool, bool]=(True, False),
+                   reverse:bool=False) -> List[Tuple[Any, Any]]:
+        """[(key, value)] of an ordered key name with minKey <= key < maxKey (see inclusive) in key order.
+           None for no bound. O(log n + k)"""
+        keys = self._orderedKeys(keyName).irange(minKey, maxKey, inclusive)
+        values, index = self._values, self._dicts[keyName]
+        if reverse:
+            keys.reverse()
+        return [(key, values[index[key]]) for key in keys]
+    def prefixItems(self, keyName, prefix, reverse:bool=False) -> List[Tuple[Any, Any]]:
+        """[(key, value)] of an ordered key name whose str / bytes key starts with prefix, in key order. O(log n + k)"""
+        if not prefix:
+            return self.rangeItems(keyName, reverse=reverse)
+        return self.rangeItems(keyName, prefix, _prefixEnd(prefix), reverse=reverse)
+    def sortedItems(self, keyName, reverse:bool=False) -> List[Tuple[Any, Any]]:
+        """[(key, value)] of an ordered key name in key order"""
+        return self.rangeItems(keyName, reverse=reverse)
+    def copy(self) -> 'MultiKeyDict':
+        """return a shallow copy (values are not copied)"""
+        return self._copyTo(MultiKeyDict(self._keyNames))
+    def _copyTo(self, other:'MultiKeyDict') -> 'MultiKeyDict':
+        """copy the keys and values into an empty MultiKeyDict of the same key names, return other"""
+        other._dicts = {keyName: index.copy() for keyName, index in self._dicts.items()}
+        other._columns = {keyName: column.copy() for keyName, column in self._columns.items()}
+        other._values = self._values.copy()
+        other._free = self._free.copy()
+        other._ordered = {keyName: sortedKeys.copy() for keyName, sortedKeys in self._ordered.items()}
+        return other
     def clear(self):
-        self._dicts.clear()
-        for keyName in self._keyNames:
-            self._dicts[keyName] = {}
+        for index in self._dicts.values():
+            index.clear()
+        for column in self._columns.values():
+            column.clear()
+        self._values.clear()
+        self._free.clear()
+        for sortedKeys in self._ordered.values():
+            sortedKeys.clear()
 
-__all__ = ["MultiKeyDict"]
\ No newline at end of file
+__all__ = ["MultiKeyDict"]
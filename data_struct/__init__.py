@@ -2,4 +2,7 @@
 '''常用但不属于标准库的数据结构'''
 
 from .Event import *
-from .MultiKeyDict import *
\ No newline at end of file
+from .AsyncEvent import *
+from .MultiKeyDict import *
+from .ConcurrentMultiKeyDict import *
+from .CacheMultiKeyDict import *
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+'''AsyncDatabase: 並發的stream多於pooled reader時不會死鎖。此package以目錄名被import，這裡把上層目錄加入sys.path'''
+
+import asyncio, importlib, os, sys, tempfile, unittest
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if os.path.dirname(PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+AsyncDatabase = importlib.import_module(os.path.basename(PACKAGE_DIR) + ".utils.SQliteUtils").AsyncDatabase
+
+
+class TestAsyncDatabaseStreams(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    async def _streams(self, pool_size: int, streams: int):
+        path = os.path.join(self.directory, "streams{}.db".format(pool_size))
+        async with AsyncDatabase(path, pool_size=pool_size, chunk_size=2) as db:
+            await db["t"].insert_all(({"id": i} for i in range(10)), pk="id")
+            async def read():
+                rows = []
+                async for row in db["t"].rows_where(order_by="id"):
+                    rows.append(row["id"])
+                    await asyncio.sleep(0)
+                return rows
+            async def count():
+                return (await db.execute("select count(*) from t"))[0][0]
+            results = await asyncio.wait_for(
+                asyncio.gather(*[read() for _ in range(streams)], *[count() for _ in range(streams)]), 10
+            )
+        self.assertEqual(results[:streams], [list(range(10))] * streams)
+        self.assertEqual(results[streams:], [10] * streams)
+
+    def test_more_streams_than_readers(self):
+        asyncio.run(self._streams(pool_size=1, streams=3))
+        asyncio.run(self._streams(pool_size=2, streams=5))
+
+
+if __name__ == "__main__":
+    unittest.main()
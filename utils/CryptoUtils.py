@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 '''封裝了常用的加密、hash等'''
 
-import hashlib, argon2, uuid, os, sys
-from typing import Union, Literal
+import hashlib, argon2, os, sys, mmap, tempfile, threading, time, struct, functools, collections, itertools, asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Union, Literal, Iterable, Dict, List, Optional, BinaryIO, Tuple
+from .IDUtils import generateRandomID
 
 try:
     import crypto
@@ -31,35 +33,227 @@ except ImportError:
         return padded_data[:-padding_len]
 
 #region AES
-def encrypt_file(key, in_filePath:str, outPath=None, deleteOriginFile=False, chunksize=64*1024) -> str:
-    '''return encrypted file path'''
+# Chunked container (encrypt_stream / encrypt_file):
+#   header: magic(8) version(1) chunkSize(4) scrypt log2(N)(1) r(1) p(1) salt(16) noncePrefix(8)
+#   chunks: AES-GCM ciphertext + 16 bytes tag. Every chunk but the last holds chunkSize bytes of plaintext.
+#   Nonce of chunk i = noncePrefix + i (4 bytes, big endian); AAD = header + i + final flag, so chunks can't be
+#   reordered, dropped or truncated at a chunk boundary. The key is scrypt(passphrase, salt).
+# Files without the magic are the old format: 16 bytes IV + AES-CBC(PKCS7) with key = md5(passphrase).
+ENC_MAGIC = b'PPUAES\x00\x02'
+ENC_VERSION = 1
+ENC_CHUNK_SIZE = 1024 * 1024
+'''default plaintext bytes per chunk'''
+ENC_SCRYPT = (15, 8, 1)
+'''(log2 N, r, p) for new files'''
+_ENC_HEADER = struct.Struct('>8sBIBBB16s8s')
+_ENC_CHUNK_AAD = struct.Struct('>IB')
+_ENC_TAG_SIZE = 16
+
+class DecryptionError(ValueError):
+    '''wrong key, or the encrypted data was modified / truncated'''
+    pass
+
+def _deriveKey(key:bytes, salt:bytes, log2n:int, r:int, p:int) -> bytes:
+    '''not cached: passphrases / derived keys must not outlive the _Container that uses them'''
+    return hashlib.scrypt(key, salt=salt, n=1 << log2n, r=r, p=p, maxmem=256 * r * (1 << log2n), dklen=32)
+def _keyBytes(key:Union[str, bytes]) -> bytes:
+    return key.encode('utf-8') if isinstance(key, str) else bytes(key)
+
+class _Container:
+    '''header fields of a chunked file, and chunk encryption / decryption with them'''
+    def __init__(self, key:bytes, header:bytes):
+        magic, version, self.chunkSize, log2n, r, p, salt, self.noncePrefix = _ENC_HEADER.unpack(header)
+        if magic != ENC_MAGIC or version != ENC_VERSION:
+            raise DecryptionError('Not a supported encrypted file')
+        self.header = header
+        self.key = _deriveKey(key, salt, log2n, r, p)
+
+    @classmethod
+    def new(cls, key:bytes, chunkSize:int) -> '_Container':
+        return cls(key, _ENC_HEADER.pack(ENC_MAGIC, ENC_VERSION, chunkSize, *ENC_SCRYPT, os.urandom(16), os.urandom(8)))
+
+    def _cipher(self, index:int, final:bool):
+        cipher = AES.new(self.key, AES.MODE_GCM, nonce=self.noncePrefix + index.to_bytes(4, 'big'))
+        cipher.update(self.header + _ENC_CHUNK_AAD.pack(index, final))
+        return cipher
+    def encrypt(self, item) -> bytes:
+        index, final, data = item
+        ciphertext, tag = self._cipher(index, final).encrypt_and_digest(data)
+        return ciphertext + tag
+    def decrypt(self, item) -> bytes:
+        index, final, data = item
+        if len(data) < _ENC_TAG_SIZE:
+            raise DecryptionError('Encrypted file is truncated')
+        try:
+            return self._cipher(index, final).decrypt_and_verify(data[:-_ENC_TAG_SIZE], data[-_ENC_TAG_SIZE:])
+        except ValueError:
+            raise DecryptionError('Chunk {} failed authentication: wrong key, or the file was modified'.format(index)) from None
+    @property
+    def storedChunkSize(self) -> int:
+        return self.chunkSize + _ENC_TAG_SIZE
+
+def _readChunks(infile, size:int):
+    '''(index, final, data) of each `size` bytes block of infile. Looks one block ahead to flag the last one; an empty
+    input still gives one (empty) final block'''
+    index, current = 0, _readFull(infile, size)
+    while True:
+        following = _readFull(infile, size) if len(current) == size else b''
+        yield index, not following, current
+        if not following:
+            return
+        index, current = index + 1, following
+def _readFull(infile, size:int) -> bytes:
+    data = infile.read(size)
+    while data and len(data) < size:
+        more = infile.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+def _threadMap(func, items, workers:Optional[int]):
+    '''func(item) in order on a thread pool, with at most 2 * workers items read ahead'''
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(func, items)
+        return
+    pending = collections.deque()
+    with ThreadPoolExecutor(workers) as executor:
+        try:
+            for item in items:
+                pending.append(executor.submit(func, item))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+def encrypt_stream(key:Union[str, bytes], infile:BinaryIO, outfile:BinaryIO, chunkSize:int=ENC_CHUNK_SIZE,
+                   workers:Optional[int]=None) -> int:
+    '''
+    Encrypt a binary stream into the chunked container format. Chunks are encrypted on `workers` threads (AES in
+    pycryptodome runs without the GIL), at most 2 * workers chunks in memory. Return bytes written.
+    '''
+    container = _Container.new(_keyBytes(key), chunkSize)
+    outfile.write(container.header)
+    written = len(container.header)
+    for data in _threadMap(container.encrypt, _readChunks(infile, chunkSize), workers):
+        outfile.write(data)
+        written += len(data)
+    return written
+def decrypt_stream(key:Union[str, bytes], infile:BinaryIO, outfile:BinaryIO, workers:Optional[int]=None,
+                   chunksize:int=64*1024) -> int:
+    '''
+    Decrypt a stream written by encrypt_stream / encrypt_file, chunks in parallel like encrypt_stream. Streams in the
+    old AES-CBC format are decrypted serially, `chunksize` bytes at a time. Return bytes written.
+    Raise DecryptionError if the key is wrong or the data was modified. Chunks verified before the failing one have
+    already been written to outfile then: discard its content (decrypt_file does so).
+    '''
+    header = _readFull(infile, _ENC_HEADER.size)
+    if not header.startswith(ENC_MAGIC):
+        return _decryptLegacy(key, header, infile, outfile, chunksize)
+    container = _Container(_keyBytes(key), header)
+    written = 0
+    for data in _threadMap(container.decrypt, _readChunks(infile, container.storedChunkSize), workers):
+        outfile.write(data)
+        written += len(data)
+    return written
+def _decryptLegacy(key, head:bytes, infile:BinaryIO, outfile:BinaryIO, chunksize:int) -> int:
+    chunksize = max(AES.block_size, chunksize - chunksize % AES.block_size)
+    if len(head) < 16:
+        raise DecryptionError('Encrypted file is truncated')
+    decryptor = AES.new(getMD5Hash_fromString(key if isinstance(key, str) else key.decode('utf-8'), 'bytes'), AES.MODE_CBC, head[:16])
+    written, pending = 0, head[16:]
+    for _, final, data in _readChunks(infile, chunksize):
+        data = pending + data
+        usable = len(data) - len(data) % AES.block_size
+        chunk, pending = decryptor.decrypt(data[:usable]), data[usable:]
+        if final:
+            if pending:
+                raise DecryptionError('Encrypted file is truncated')
+            if not chunk:
+                if not written: # only the IV: older versions wrote empty inputs like this
+                    return 0
+                raise DecryptionError('Encrypted file is truncated')
+            try:
+                chunk = _unpad(chunk, AES.block_size)
+            except ValueError:
+                raise DecryptionError('Wrong key, or the file was modified') from None
+        outfile.write(chunk)
+        written += len(chunk)
+    return written
+
+def decrypt_range(key:Union[str, bytes], in_filePath:str, offset:int, length:int, workers:Optional[int]=None) -> bytes:
+    '''
+    Decrypt only plaintext bytes [offset, offset+length) of a chunked encrypted file: only the chunks covering that
+    range are read and authenticated. Old AES-CBC files are not seekable and raise DecryptionError.
+    '''
+    with open(in_filePath, 'rb') as infile:
+        header = _readFull(infile, _ENC_HEADER.size)
+        if not header.startswith(ENC_MAGIC):
+            raise DecryptionError('Random access needs the chunked format, re-encrypt old AES-CBC files with encrypt_file')
+        container = _Container(_keyBytes(key), header)
+        stored = container.storedChunkSize
+        body = os.fstat(infile.fileno()).st_size - len(header)
+        chunkCount = max(1, -(-body // stored))
+        size = body - chunkCount * _ENC_TAG_SIZE
+        if offset < 0 or length < 0:
+            raise ValueError('offset and length must be >= 0')
+        end = min(offset + length, size)
+        if offset >= end:
+            return b''
+        first, last = offset // container.chunkSize, (end - 1) // container.chunkSize
+
+        def read(index):
+            infile.seek(len(header) + index * stored)
+            return index, index == chunkCount - 1, infile.read(stored)
+        data = b''.join(_threadMap(container.decrypt, (read(i) for i in range(first, last + 1)), workers))
+    skip = offset - first * container.chunkSize
+    return data[skip:skip + end - offset]
+
+def encrypt_file(key, in_filePath:str, outPath=None, deleteOriginFile=False, chunksize=None, workers:Optional[int]=None,
+                 legacy:bool=False) -> str:
+    '''
+    return encrypted file path. Written in the chunked AES-GCM format (see encrypt_stream; chunksize default
+    ENC_CHUNK_SIZE), or the old AES-CBC format if legacy=True (chunksize default 64*1024).
+    '''
     in_filename = os.path.basename(in_filePath)
     out_filename = in_filename + '.enc'
     if outPath:
         out_filePath = os.path.join(outPath, out_filename)
     else:
         out_filePath = os.path.join(os.path.dirname(in_filePath), out_filename)
-    iv = os.urandom(16)
-    hashKey = getMD5Hash_fromString(key, 'bytes')
-    encryptor = AES.new(hashKey, AES.MODE_CBC, iv)
-    filesize = os.path.getsize(in_filename)
-    with open(in_filePath, 'rb') as infile:
-        with open(out_filePath, 'wb') as outfile:
-            outfile.write(iv)
-            pos = 0
-            while pos < filesize:
-                chunk = infile.read(chunksize)
-                pos += len(chunk)
-                if pos == filesize:
-                    chunk = _pad(chunk, AES.block_size)
-                outfile.write(encryptor.encrypt(chunk))
-            #print("Encrypted file: " + in_filename + " to " + out_filename)
+    if not legacy:
+        with open(in_filePath, 'rb') as infile, open(out_filePath, 'wb') as outfile:
+            encrypt_stream(key, infile, outfile, chunksize or ENC_CHUNK_SIZE, workers)
+    else:
+        chunksize = chunksize or 64 * 1024
+        iv = os.urandom(16)
+        hashKey = getMD5Hash_fromString(key, 'bytes')
+        encryptor = AES.new(hashKey, AES.MODE_CBC, iv)
+        filesize = os.path.getsize(in_filePath)
+        with open(in_filePath, 'rb') as infile:
+            with open(out_filePath, 'wb') as outfile:
+                outfile.write(iv)
+                if filesize == 0:
+                    outfile.write(encryptor.encrypt(_pad(b'', AES.block_size))) # PKCS7 always gives at least one block
+                pos = 0
+                while pos < filesize:
+                    chunk = infile.read(chunksize)
+                    pos += len(chunk)
+                    if pos == filesize:
+                        chunk = _pad(chunk, AES.block_size)
+                    outfile.write(encryptor.encrypt(chunk))
     if deleteOriginFile:
         os.remove(in_filePath)
         #print("Deleted origin file: " + in_filePath)
     return out_filePath
-def decrypt_file(key:str, in_filePath:str, out_filename=None, outPath=None, chunksize=64*1024) -> str:
-    '''Chunck size default=64*1024. Return decrypted file path'''
+def decrypt_file(key:str, in_filePath:str, out_filename=None, outPath=None, chunksize=64*1024, workers:Optional[int]=None) -> str:
+    '''
+    Return decrypted file path. Reads both the chunked format and old AES-CBC files (chunksize is their read size).
+    The output only appears once the whole file is decrypted and authenticated
+    '''
     in_filename = os.path.basename(in_filePath)
     if not out_filename:
         out_filename = in_filename + '.dec'
@@ -67,35 +261,264 @@ def decrypt_file(key:str, in_filePath:str, out_filename=None, outPath=None, chun
         out_filePath = os.path.join(outPath, out_filename)
     else:
         out_filePath = os.path.join(os.path.dirname(in_filePath), out_filename)
-    with open(in_filename, 'rb') as infile:
-        iv = infile.read(16)
-        hashKey = getMD5Hash_fromString(key,'bytes')
-        encryptor = AES.new(hashKey, AES.MODE_CBC, iv)
-        with open(out_filePath, 'wb') as outfile:
-            encrypted_filesize = os.path.getsize(in_filename)
-            pos = 16 # the IV.
-            while pos < encrypted_filesize:
-                chunk = infile.read(chunksize)
-                pos += len(chunk)
-                chunk = encryptor.decrypt(chunk)
-                if pos == encrypted_filesize:
-                    chunk = _unpad(chunk, AES.block_size)
-                outfile.write(chunk)
-            #print("Decrypted file: " + in_filename + " to " + out_filename)
+    # write to a temp file beside the output, so a failure never leaves partial, unauthenticated plaintext at out_filePath
+    fd, tempPath = tempfile.mkstemp(prefix='.' + os.path.basename(out_filePath) + '.', suffix='.tmp', dir=os.path.dirname(out_filePath) or '.')
+    try:
+        with open(in_filePath, 'rb') as infile, os.fdopen(fd, 'wb') as outfile:
+            decrypt_stream(key, infile, outfile, workers, chunksize)
+        os.replace(tempPath, out_filePath)
+    except BaseException:
+        try:
+            os.remove(tempPath)
+        except OSError:
+            pass
+        raise
     return out_filePath
 #endregion
 
+#region file hashing
+HASH_READ_SIZE = 1024 * 1024
+'''bytes per read when hashing a file'''
+HASH_MMAP_THRESHOLD = 64 * 1024 * 1024
+'''files of at least this size are hashed through mmap, without copying into a read buffer'''
+HASH_MMAP_SLICE = 64 * 1024 * 1024
+PARTIAL_HASH_SIZE = 64 * 1024
+'''bytes hashed by the partial-hash step of findDuplicateFiles'''
+
+def hash_file(filePath:str, algo:str='md5', mode:Literal['hex', 'bytes']='hex', limit:Optional[int]=None,
+              useMmap:Optional[bool]=None) -> Union[str, bytes]:
+    '''
+    Hash a file with any hashlib algorithm. Reads HASH_READ_SIZE bytes at a time into one reused buffer, or goes
+    through mmap for files of at least HASH_MMAP_THRESHOLD bytes (useMmap=True/False to force). hashlib releases the
+    GIL while hashing, so hash_many() can hash several files at once on threads.
+    :param limit: only hash the first `limit` bytes
+    '''
+    h = hashlib.new(algo)
+    with open(filePath, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if limit is not None:
+            size = min(size, limit)
+        if useMmap is None:
+            useMmap = size >= HASH_MMAP_THRESHOLD
+        if useMmap and size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                view = memoryview(m)
+                try:
+                    for start in range(0, size, HASH_MMAP_SLICE):
+                        h.update(view[start:min(start + HASH_MMAP_SLICE, size)])
+                finally:
+                    view.release()
+        else:
+            remaining = size if limit is not None else sys.maxsize  # without limit, read until EOF
+            view = memoryview(bytearray(max(1, min(HASH_READ_SIZE, remaining))))
+            while remaining > 0:
+                n = f.readinto(view if remaining >= len(view) else view[:remaining])
+                if not n:
+                    break
+                h.update(view[:n])
+                remaining -= n
+    return h.hexdigest() if mode == 'hex' else h.digest()
+def hash_many(filePaths:Iterable[str], algo:str='md5', mode:Literal['hex', 'bytes']='hex', limit:Optional[int]=None,
+              workers:Optional[int]=None) -> Dict[str, Union[str, bytes]]:
+    '''hash_file() for many files on a thread pool. Return {filePath: hash} in the order of filePaths'''
+    filePaths = list(dict.fromkeys(filePaths))
+    if len(filePaths) <= 1 or workers == 1:
+        return {path: hash_file(path, algo, mode, limit) for path in filePaths}
+    with ThreadPoolExecutor(workers or min(32, (os.cpu_count() or 1) + 4)) as executor:
+        return dict(zip(filePaths, executor.map(lambda path: hash_file(path, algo, mode, limit), filePaths)))
+def _groupBy(paths:Iterable[str], key) -> List[List[str]]:
+    groups = {}
+    for path, value in key(paths):
+        groups.setdefault(value, []).append(path)
+    return [group for group in groups.values() if len(group) > 1]
+def _listFiles(paths:Iterable[str], recursive:bool=True):
+    '''the given files, and the files under the given directories (symlinks skipped)'''
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, dirs, names in os.walk(path):
+            for name in names:
+                filePath = os.path.join(root, name)
+                if not os.path.islink(filePath):
+                    yield filePath
+            if not recursive:
+                break
+def findDuplicateFiles(*paths:str, algo:str='md5', recursive:bool=True, partialSize:int=PARTIAL_HASH_SIZE,
+                       workers:Optional[int]=None) -> List[List[str]]:
+    '''
+    Groups of files with the same content under the given files / directories. Only files of the same size are
+    hashed; of those, only the first partialSize bytes are hashed first, and only files whose partial hashes also
+    match are hashed fully. Symlinks are skipped.
+    '''
+    files = list(dict.fromkeys(_listFiles(paths, recursive)))
+    duplicates = []
+    for sameSize in _groupBy(files, lambda group: ((path, os.path.getsize(path)) for path in group)):
+        size = os.path.getsize(sameSize[0])
+        candidates = [sameSize]
+        if size > partialSize:
+            candidates = _groupBy(sameSize, lambda group: hash_many(group, algo, 'bytes', partialSize, workers).items())
+        for group in candidates:
+            duplicates.extend(_groupBy(group, lambda group: hash_many(group, algo, 'bytes', None, workers).items()))
+    return duplicates
+#endregion
+
+#region file hash cache
+class FileHashCache:
+    '''
+    File hashes kept in a SQLite file (through SQliteUtils.Database). A cached hash is reused as long as the file's
+    (size, mtime_ns, inode) is unchanged, otherwise the file is hashed again.
+    The least recently used entries are evicted beyond maxEntries entries, or beyond maxBytes bytes of stored rows
+    (path + digest + ROW_OVERHEAD each). Thread safe.
+    Give it to setFileHashCache() to make getMD5Hash_fromFile / getSHA256Hash_fromFile / checkFileSame_by... use it.
+    '''
+    TABLE = 'file_hash'
+    ROW_OVERHEAD = 48
+    '''approximate bytes of a row besides its path and digest, for maxBytes'''
+    RACY_SECONDS = 2.0
+    '''files modified less than this many seconds before being hashed are not cached: they may still be written within the same mtime'''
+    TOUCH_FLUSH = 1000
+    '''hits are remembered in memory and their last_used written in one go after this many'''
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, dbPath:str, maxEntries:Optional[int]=None, maxBytes:Optional[int]=None):
+        from .SQliteUtils import Database
+        from .SQliteUtils.utils import sqlite3
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.hits = self.misses = self.evictions = 0
+        self._touched = {}
+        self._lock = threading.RLock()
+        self.db = Database(sqlite3.connect(dbPath, check_same_thread=False))
+        self.table = self.db[self.TABLE]
+        if not self.table.exists():
+            self.table.create({'path': str, 'algo': str, 'size': int, 'mtime_ns': int, 'inode': int, 'digest': bytes,
+                               'last_used': float}, pk=('path', 'algo'))
+            self.table.create_index(['last_used'])
+
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get(self, filePath:str, algo:str='sha256', mode:Literal['hex', 'bytes']='hex') -> Union[str, bytes]:
+        '''hash of one file, from the cache if the file is unchanged'''
+        return self.get_many((filePath,), algo, mode, workers=1)[filePath]
+    def get_many(self, filePaths:Iterable[str], algo:str='sha256', mode:Literal['hex', 'bytes']='hex',
+                 workers:Optional[int]=None) -> Dict[str, Union[str, bytes]]:
+        '''{filePath: hash}. Cached hashes are looked up in bulk, the other files are hashed by hash_many()'''
+        filePaths = list(dict.fromkeys(filePaths))
+        keys = {path: os.path.abspath(path) for path in filePaths}
+        stats = {path: os.stat(path) for path in filePaths}
+        cached = self._lookup(list(keys.values()), algo)
+        now = time.time()
+        digests, missing = {}, []
+        for path in filePaths:
+            stat, row = stats[path], cached.get(keys[path])
+            if row is not None and row[:3] == (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+                digests[path] = row[3]
+            else:
+                missing.append(path)
+        if missing:
+            digests.update(hash_many(missing, algo, 'bytes', workers=workers))
+        with self._lock:
+            self.hits += len(filePaths) - len(missing)
+            self.misses += len(missing)
+            missingSet = set(missing)
+            for path in filePaths:
+                if path not in missingSet:
+                    self._touched[(keys[path], algo)] = now
+            rows = [{'path': keys[path], 'algo': algo, 'size': stats[path].st_size, 'mtime_ns': stats[path].st_mtime_ns,
+                     'inode': stats[path].st_ino, 'digest': digests[path], 'last_used': now}
+                    for path in missing if now - stats[path].st_mtime >= self.RACY_SECONDS]
+            if rows:
+                self.table.upsert_all(rows, pk=('path', 'algo'))
+                self.evict()
+            elif len(self._touched) >= self.TOUCH_FLUSH:
+                self.flush()
+        return {path: digests[path].hex() if mode == 'hex' else digests[path] for path in filePaths}
+    def _lookup(self, keys:List[str], algo:str) -> Dict[str, tuple]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), self.LOOKUP_CHUNK):
+                chunk = keys[start:start + self.LOOKUP_CHUNK]
+                sql = 'select path, size, mtime_ns, inode, digest from [{}] where algo = ? and path in ({})'.format(
+                    self.TABLE, ', '.join('?' * len(chunk)))
+                for row in self.db.query(sql, [algo, *chunk], row_format='tuple'):
+                    found[row[0]] = row[1:]
+        return found
+
+    def warm(self, *paths:str, algo:str='sha256', recursive:bool=True, workers:Optional[int]=None, batchSize:int=1000) -> int:
+        '''hash every file under the given files / directories that isn't cached yet. Return how many files were hashed'''
+        misses = self.misses
+        batch = []
+        for filePath in _listFiles(paths, recursive):
+            batch.append(filePath)
+            if len(batch) >= batchSize:
+                self.get_many(batch, algo, 'bytes', workers)
+                batch.clear()
+        if batch:
+            self.get_many(batch, algo, 'bytes', workers)
+        return self.misses - misses
+
+    def flush(self):
+        '''write the last_used of the hits since the last flush'''
+        with self._lock:
+            if not self._touched:
+                return
+            with self.db.conn:
+                self.db.conn.executemany('update [{}] set last_used = ? where path = ? and algo = ?'.format(self.TABLE),
+                                         [(used, path, algo) for (path, algo), used in self._touched.items()])
+            self._touched.clear()
+    def evict(self) -> int:
+        '''drop the least recently used entries beyond maxEntries / maxBytes. Return how many were dropped'''
+        if self.maxEntries is None and self.maxBytes is None:
+            return 0
+        with self._lock:
+            self.flush()
+            before = self.db.conn.total_changes
+            with self.db.conn:
+                if self.maxEntries is not None:
+                    self.db.conn.execute('delete from [{0}] where rowid in (select rowid from [{0}] order by last_used desc '
+                                         'limit -1 offset ?)'.format(self.TABLE), (self.maxEntries,))
+                if self.maxBytes is not None:
+                    self.db.conn.execute('delete from [{0}] where rowid in (select rowid from (select rowid, sum(length(path) + '
+                                         'length(digest) + ?) over (order by last_used desc, rowid desc) as kept from [{0}]) '
+                                         'where kept > ?)'.format(self.TABLE), (self.ROW_OVERHEAD, self.maxBytes))
+            evicted = self.db.conn.total_changes - before
+            self.evictions += evicted
+            return evicted
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            with self.db.conn:
+                self.db.conn.execute('delete from [{}]'.format(self.TABLE))
+    def stats(self) -> Dict[str, Union[int, float]]:
+        '''{"hits", "misses", "hit_rate", "evictions", "entries"}'''
+        with self._lock:
+            total = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0,
+                    'evictions': self.evictions, 'entries': self.table.count}
+    def close(self):
+        with self._lock:
+            self.flush()
+            self.db.close()
+
+_fileHashCache: Optional[FileHashCache] = None
+def setFileHashCache(cache:Optional[FileHashCache]):
+    '''make getMD5Hash_fromFile / getSHA256Hash_fromFile / checkFileSame_by... go through this cache. None to stop'''
+    global _fileHashCache
+    _fileHashCache = cache
+def getFileHashCache() -> Optional[FileHashCache]:
+    return _fileHashCache
+#endregion
+
 #region MD5
 def getMD5Hash_fromFile(filePath, mode:Literal['hex', 'bytes']='hex'):
     '''return 32 hex string or 16 bytes'''
-    h = hashlib.md5()
-    with open(filePath, 'rb') as f:
-        while True:
-            data = f.read(1024)
-            if not data:
-                break
-            h.update(data)
-    return h.hexdigest() if mode == 'hex' else h.digest()
+    if _fileHashCache is not None:
+        return _fileHashCache.get(filePath, 'md5', mode)
+    return hash_file(filePath, 'md5', mode)
 def getMD5Hash_fromString(string, mode:Literal['hex', 'bytes']='hex'):
     '''return 32 hex string or 16 bytes'''
     return hashlib.md5(string.encode('utf-8')).hexdigest() if mode == 'hex' else hashlib.md5(string.encode('utf-8')).digest()
@@ -109,23 +532,20 @@ def checkFileSame_byMD5Hash(file1:Union[str, 'FileInfo'], file2:Union[str, 'File
     '''check if two files are same by md5 hash'''
     filePath1 = file1 if isinstance(file1, str) else file1.filePath
     filePath2 = file2 if isinstance(file2, str) else file2.filePath
+    if os.path.getsize(filePath1) != os.path.getsize(filePath2):
+        return False
     return getMD5Hash_fromFile(filePath1) == getMD5Hash_fromFile(filePath2)
 #endregion
 
 #region SHA256
 def getSHA256Hash_fromFile(filePath, mode:Literal['hex', 'bytes']='hex'):
     '''return 64 hex string or 32 bytes'''
-    h = hashlib.sha256()
-    with open(filePath, 'rb') as f:
-        while True:
-            data = f.read(1024)
-            if not data:
-                break
-            h.update(data)
-    return h.hexdigest() if mode == 'hex' else h.digest()
+    if _fileHashCache is not None:
+        return _fileHashCache.get(filePath, 'sha256', mode)
+    return hash_file(filePath, 'sha256', mode)
 def getSHA256Hash_fromString(string, mode:Literal['hex', 'bytes']='hex'):
     '''return 64 hex string or 32 bytes'''
-    hashlib.sha256(string.encode('utf-8')).hexdigest() if mode == 'hex' else hashlib.sha256(string.encode('utf-8')).digest()
+    return hashlib.sha256(string.encode('utf-8')).hexdigest() if mode == 'hex' else hashlib.sha256(string.encode('utf-8')).digest()
 def checkSHA256Hash_fromFile(filePath, hash):
     '''return 64 hex string or 32 bytes'''
     return hash == getSHA256Hash_fromFile(filePath)
@@ -136,24 +556,159 @@ def checkFileSame_bySHA256Hash(file1:Union[str, 'FileInfo'], file2:Union[str, 'F
     '''check file equality with hash'''
     filePath1 = file1 if isinstance(file1, str) else file1.filePath
     filePath2 = file2 if isinstance(file2, str) else file2.filePath
+    if os.path.getsize(filePath1) != os.path.getsize(filePath2):
+        return False
     return getSHA256Hash_fromFile(filePath1) == getSHA256Hash_fromFile(filePath2)
 #endregion
 
 #region argon2
+ARGON2_PARAMS = ('time_cost', 'memory_cost', 'parallelism', 'hash_len', 'salt_len', 'type')
+
+@functools.lru_cache(maxsize=8)
+def _passwordHasher(params:tuple) -> argon2.PasswordHasher:
+    '''one PasswordHasher per parameter set and process'''
+    return argon2.PasswordHasher(**dict(zip(ARGON2_PARAMS, params)))
+def _argon2HashMany(params:tuple, passwords:List[Union[str, bytes]]) -> List[str]:
+    hasher = _passwordHasher(params)
+    return [hasher.hash(password) for password in passwords]
+def _argon2VerifyMany(params:tuple, pairs:List[tuple]) -> List[bool]:
+    hasher = _passwordHasher(params)
+    results = []
+    for hash, password in pairs:
+        try:
+            results.append(hasher.verify(hash, password))
+        except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHash):
+            results.append(False)
+    return results
+
+class Argon2Hasher:
+    '''
+    Reusable argon2 password hasher (one argon2.PasswordHasher, built once).
+    hash / verify run in the calling thread. hash_batch / verify_batch split a batch over a pool of `workers`
+    processes (or threads with pool="thread": argon2-cffi releases the GIL too), and the a* methods await them from
+    asyncio without blocking the event loop. The pool is started on first use, close() it when done.
+    '''
+    def __init__(self, time_cost:int=3, memory_cost:int=65536, parallelism:int=4, hash_len:int=32, salt_len:int=16,
+                 type:argon2.Type=argon2.Type.ID, workers:Optional[int]=None, pool:Literal['process', 'thread']='process'):
+        self.params = (time_cost, memory_cost, parallelism, hash_len, salt_len, type)
+        self.hasher = _passwordHasher(self.params)
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = pool
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    def __repr__(self):
+        return 'Argon2Hasher({})'.format(', '.join('{}={!r}'.format(k, v) for k, v in zip(ARGON2_PARAMS, self.params)))
+
+    def hash(self, password:Union[str, bytes]) -> str:
+        return self.hasher.hash(password)
+    def verify(self, hash:str, password:Union[str, bytes]) -> bool:
+        '''False instead of argon2's VerifyMismatchError / InvalidHashError'''
+        return _argon2VerifyMany(self.params, [(hash, password)])[0]
+    def needs_rehash(self, hash:str) -> bool:
+        '''the hash was made with other parameters than this hasher's'''
+        return self.hasher.check_needs_rehash(hash)
+    def verify_and_update(self, hash:str, password:Union[str, bytes]) -> Tuple[bool, Optional[str]]:
+        '''
+        Migration helper for logins: (verified, new hash). The new hash is only made when the password is right and
+        the stored hash needs_rehash(), otherwise it's None.
+        '''
+        if not self.verify(hash, password):
+            return False, None
+        return True, (self.hash(password) if self.needs_rehash(hash) else None)
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = (ProcessPoolExecutor if self.pool == 'process' else ThreadPoolExecutor)(self.workers)
+            return self._executor
+    def _chunks(self, items:list) -> List[list]:
+        size = max(1, -(-len(items) // self.workers))
+        return [items[i:i + size] for i in range(0, len(items), size)]
+    def hash_batch(self, passwords:Iterable[Union[str, bytes]]) -> List[str]:
+        '''hash every password, the batch split evenly over the pool'''
+        passwords = list(passwords)
+        if len(passwords) <= 1:
+            return [self.hash(p) for p in passwords]
+        executor = self.executor()
+        return list(itertools.chain.from_iterable(executor.map(functools.partial(_argon2HashMany, self.params), self._chunks(passwords))))
+    def verify_batch(self, pairs:Iterable[Tuple[str, Union[str, bytes]]]) -> List[bool]:
+        '''verify (hash, password) pairs on the pool. Return a bool for each pair'''
+        pairs = list(pairs)
+        if len(pairs) <= 1:
+            return [self.verify(h, p) for h, p in pairs]
+        executor = self.executor()
+        return list(itertools.chain.from_iterable(executor.map(functools.partial(_argon2VerifyMany, self.params), self._chunks(pairs))))
+
+    async def _run(self, func, items:list) -> list:
+        loop = asyncio.get_running_loop()
+        executor = self.executor()
+        results = await asyncio.gather(*(loop.run_in_executor(executor, func, self.params, chunk) for chunk in self._chunks(items)))
+        return list(itertools.chain.from_iterable(results))
+    async def ahash(self, password:Union[str, bytes]) -> str:
+        return (await self._run(_argon2HashMany, [password]))[0]
+    async def averify(self, hash:str, password:Union[str, bytes]) -> bool:
+        return (await self._run(_argon2VerifyMany, [(hash, password)]))[0]
+    async def ahash_batch(self, passwords:Iterable[Union[str, bytes]]) -> List[str]:
+        return await self._run(_argon2HashMany, list(passwords))
+    async def averify_batch(self, pairs:Iterable[Tuple[str, Union[str, bytes]]]) -> List[bool]:
+        return await self._run(_argon2VerifyMany, list(pairs))
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    @classmethod
+    def calibrate(cls, targetSeconds:float=0.05, memory_cost:int=65536, parallelism:int=4, minMemoryCost:int=8192,
+                  maxTimeCost:int=16, repeat:int=3, **kwargs) -> 'Argon2Hasher':
+        '''
+        A hasher whose hash() takes about targetSeconds on this machine: time_cost is raised from 1 while a hash (median
+        of `repeat`) stays under the target. If time_cost=1 is already too slow, memory_cost is halved down to minMemoryCost.
+        kwargs go to the new hasher (workers, pool, hash_len...).
+        '''
+        def measure(time_cost, memory_cost):
+            hasher = argon2.PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                hasher.hash('calibration')
+                times.append(time.perf_counter() - start)
+            return sorted(times)[len(times) // 2]
+        while memory_cost > minMemoryCost and measure(1, memory_cost) > targetSeconds:
+            memory_cost //= 2
+        memory_cost = max(memory_cost, minMemoryCost)
+        time_cost = 1
+        while time_cost < maxTimeCost and measure(time_cost + 1, memory_cost) <= targetSeconds:
+            time_cost += 1
+        return cls(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism, **kwargs)
+
+_defaultArgon2Hasher: Optional[Argon2Hasher] = None
+def getArgon2Hasher() -> Argon2Hasher:
+    '''the hasher used by getArgon2Hash_fromString / checkArgon2Hash_fromString (argon2 default parameters)'''
+    global _defaultArgon2Hasher
+    if _defaultArgon2Hasher is None:
+        _defaultArgon2Hasher = Argon2Hasher()
+    return _defaultArgon2Hasher
 def getArgon2Hash_fromString(string):
     '''password encryption'''
-    ph = argon2.PasswordHasher()
-    return ph.hash(string)
+    return getArgon2Hasher().hash(string)
 def checkArgon2Hash_fromString(string, hash):
     '''password decryption'''
-    ph = argon2.PasswordHasher()
-    return ph.verify(hash, string)
+    return getArgon2Hasher().hasher.verify(hash, string)
 #endregion
 
 def generateUUID():
-    '''return len 32 random ID'''
-    return str((uuid.uuid5(uuid.NAMESPACE_DNS, str(uuid.uuid1()) + str(os.urandom(16))))).replace('-', '')
+    '''return len 32 random ID (same as IDUtils.generateRandomID)'''
+    return generateRandomID()
 
 __all__ = ['getMD5Hash_fromFile', 'getMD5Hash_fromString', 'checkMD5Hash_fromFile', 'checkMD5Hash_fromString', 'checkFileSame_byMD5Hash', 'getSHA256Hash_fromFile',
            'getSHA256Hash_fromString', 'checkSHA256Hash_fromFile', 'checkSHA256Hash_fromString', 'checkFileSame_bySHA256Hash', 'getArgon2Hash_fromString',
-           'checkArgon2Hash_fromString', 'generateUUID', 'encrypt_file', 'decrypt_file']
+           'checkArgon2Hash_fromString', 'generateUUID', 'encrypt_file', 'decrypt_file', 'hash_file', 'hash_many', 'findDuplicateFiles',
+           'FileHashCache', 'setFileHashCache', 'getFileHashCache',
+           'encrypt_stream', 'decrypt_stream', 'decrypt_range', 'DecryptionError', 'Argon2Hasher', 'getArgon2Hasher']
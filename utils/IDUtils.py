@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+'''
+ID生成工具。只依賴標準庫，熱路徑可直接使用。
+    - generateRandomID: 128位隨機數的32位hex字符串
+    - generateSortableID: UUIDv7格式(48位毫秒時間戳 + 74位單調遞增計數)，按生成順序排序，適合作SQLite主鍵
+    - generate_ids: 一次生成n個
+'''
+
+import os, time, threading, random
+from typing import List, Literal, Union
+
+IDFormat = Literal['hex', 'uuid', 'ulid', 'bytes', 'int']
+_CROCKFORD = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_CROCKFORD_PAIRS = [a + b for a in _CROCKFORD for b in _CROCKFORD]
+'''每10位一次查表，ULID編碼的查表次數減半'''
+_COUNTER_BITS = 74
+_COUNTER_SEED_BITS = _COUNTER_BITS - 1
+'''新的毫秒從一個最高位為0的隨機數開始計數，保證同一毫秒內有足夠空間遞增'''
+_RAND_B_BITS = 62
+_RAND_B_MASK = (1 << _RAND_B_BITS) - 1
+_VERSION_VARIANT = (7 << 76) | (0b10 << 62)
+
+_lock = threading.Lock()
+_lastMs = 0
+_lastCounter = 0
+
+def generateRandomID() -> str:
+    '''32位hex字符串(128位來自os.urandom的隨機數)'''
+    return os.urandom(16).hex()
+
+def _reserve(n: int):
+    '''保留n個連續的(毫秒, 計數)，返回第一個。時鐘回撥時沿用上一個毫秒，保持單調'''
+    global _lastMs, _lastCounter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _lastMs:
+            _lastMs, counter = ms, random.getrandbits(_COUNTER_SEED_BITS)
+        else:
+            counter = _lastCounter + 1
+        if counter + n > 1 << _COUNTER_BITS:  # 計數用完時借用下一毫秒
+            _lastMs, counter = _lastMs + 1, random.getrandbits(_COUNTER_SEED_BITS)
+        _lastCounter = counter + n - 1
+        return _lastMs, counter
+
+def _compose(ms: int, counter: int) -> int:
+    return (ms << 80) | _VERSION_VARIANT | ((counter >> _RAND_B_BITS) << 64) | (counter & _RAND_B_MASK)
+
+def _ulid(value: int) -> str:
+    '''128位 = 3位 + 12 * 10位 + 5位'''
+    return (_CROCKFORD[value >> 125] + ''.join([_CROCKFORD_PAIRS[(value >> shift) & 1023] for shift in range(115, 4, -10)])
+            + _CROCKFORD[value & 31])
+
+def _format(value: int, format: IDFormat) -> Union[str, bytes, int]:
+    if format == 'hex':
+        return '%032x' % value
+    if format == 'uuid':
+        h = '%032x' % value
+        return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+    if format == 'ulid':
+        return _ulid(value)
+    if format == 'bytes':
+        return value.to_bytes(16, 'big')
+    if format == 'int':
+        return value
+    raise ValueError(f'Unknown ID format: {format}')
+
+def generateSortableID(format: IDFormat = 'hex') -> Union[str, bytes, int]:
+    '''
+    UUIDv7格式的ID，同一進程內嚴格遞增(同一毫秒內計數+1)，所以按字符串/bytes排序即按生成順序排序。
+    作為SQLite主鍵時新行總是插入在B樹末尾。注意：同一毫秒內的ID可被推算，不要作為保密token。
+    :param format: 'hex'(32位，默認) / 'uuid'(帶"-") / 'ulid'(26位Crockford base32) / 'bytes'(16字節) / 'int'
+    '''
+    value = _compose(*_reserve(1))
+    return '%032x' % value if format == 'hex' else _format(value, format)
+
+def getSortableIDTime(id: Union[str, bytes, int]) -> float:
+    '''generateSortableID生成的ID(任何格式)中的時間戳(秒)'''
+    if isinstance(id, bytes):
+        value = int.from_bytes(id, 'big')
+    elif isinstance(id, int):
+        value = id
+    elif len(id) == 26:
+        value = 0
+        for char in id.upper():
+            value = (value << 5) | _CROCKFORD.index(char)
+    else:
+        value = int(id.replace('-', ''), 16)
+    return (value >> 80) / 1000
+
+def generate_ids(n: int, sortable: bool = False, format: IDFormat = 'hex') -> List[Union[str, bytes, int]]:
+    '''
+    一次生成n個ID。隨機ID只讀取一次os.urandom，可排序ID只加鎖一次並使用連續的計數。
+    :param sortable: False為generateRandomID的ID，True為generateSortableID的ID
+    :param format: 見generateSortableID。隨機ID的'hex'格式最快
+    '''
+    if n <= 0:
+        return []
+    if not sortable:
+        if format == 'hex':
+            h = os.urandom(16 * n).hex()
+            return [h[i:i + 32] for i in range(0, 32 * n, 32)]
+        if format == 'bytes':
+            data = os.urandom(16 * n)
+            return [data[i:i + 16] for i in range(0, 16 * n, 16)]
+        data = os.urandom(16 * n)
+        return [_format(int.from_bytes(data[i:i + 16], 'big'), format) for i in range(0, 16 * n, 16)]
+    ms, counter = _reserve(n)
+    if (counter >> _RAND_B_BITS) == ((counter + n - 1) >> _RAND_B_BITS):
+        # 計數的高位(rand_a)不變: 只有低62位遞增
+        base = _compose(ms, counter)
+        if format == 'hex':
+            return ['%032x' % value for value in range(base, base + n)]
+        return [_format(value, format) for value in range(base, base + n)]
+    return [_format(_compose(ms, c), format) for c in range(counter, counter + n)]
+
+__all__ = ['generateRandomID', 'generateSortableID', 'getSortableIDTime', 'generate_ids']
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+'''延遲導入(lazy import)工具。package的__init__只登記名稱，直到第一次訪問該名稱時才import對應的子模組(以及其第三方依賴)'''
+
+import os, importlib
+from typing import Dict, Sequence
+
+EAGER_IMPORT_ENV = 'PYPROJECTUTILS_EAGER_IMPORT'
+'''設置此環境變量為1/true/yes時，關閉延遲導入，在import package時立即載入所有子模組(方便排查import錯誤)'''
+
+def isEagerImport() -> bool:
+    '''是否關閉了延遲導入'''
+    return os.environ.get(EAGER_IMPORT_ENV, '').strip().lower() in ('1', 'true', 'yes')
+
+def setupLazyImport(moduleGlobals: dict, submodules: Dict[str, Sequence[str]]):
+    '''
+    在package的__init__中調用，代替"from .xxx import *"：
+        setupLazyImport(globals(), {'CryptoUtils': ['generateUUID', ...], ...})
+    會在moduleGlobals中設置__all__、__getattr__(PEP 562)和__dir__。
+    第一次訪問某名稱時才import對應的子模組，取值後緩存到moduleGlobals，之後的訪問不再經過__getattr__。
+    子模組名稱本身(如"CryptoUtils")也可以直接訪問。
+    注意：子模組名稱不可與導出的名稱相同，否則import子模組時會遮蓋導出的名稱。
+
+    :param moduleGlobals: package的globals()
+    :param submodules: {相對子模組名: 該子模組導出的名稱}
+    '''
+    packageName = moduleGlobals['__name__']
+    nameToModule = {}
+    for submodule, names in submodules.items():
+        if submodule in names:
+            raise ValueError(f"submodule '{submodule}' has the same name as one of its exported names")
+        for name in names:
+            nameToModule[name] = submodule
+    allNames = list(nameToModule.keys()) + [submodule for submodule in submodules if submodule not in nameToModule]
+
+    def __getattr__(name):
+        if name in nameToModule:
+            module = importlib.import_module('.' + nameToModule[name], packageName)
+            value = getattr(module, name)
+            moduleGlobals[name] = value
+            return value
+        elif name in submodules:
+            return importlib.import_module('.' + name, packageName)
+        raise AttributeError(f"module '{packageName}' has no attribute '{name}'")
+
+    def __dir__():
+        return sorted(set(moduleGlobals.keys()) | set(allNames))
+
+    moduleGlobals['__all__'] = allNames
+    moduleGlobals['__getattr__'] = __getattr__
+    moduleGlobals['__dir__'] = __dir__
+    if isEagerImport():
+        for name in allNames:
+            __getattr__(name)
+
+__all__ = ['EAGER_IMPORT_ENV', 'isEagerImport', 'setupLazyImport']
@@ -36,7 +36,7 @@ def checkIpInSameSubnet(ip1, ip2, submask):
     return True
 
 import stun
-from source.PyProjectUtils.base_class.CrossModuleEnum import CrossModuleEnum
+from ..base_class.CrossModuleEnum import CrossModuleEnum
 class NATtype(CrossModuleEnum):
     Unknown = 0
     Blocked = 1
@@ -207,9 +207,13 @@
 
 
 
-from .beforeInit import Database, Table, View, EditableView
+from .beforeInit import Database, Table, View, EditableView, PoolTimeout, Page, InvalidPageToken, IngestStats
 '''the above line has replaced the origin import to the special "beforeInit". Thus customized features are applied.'''
 
-from .utils import suggest_column_types
+from .aio import AsyncDatabase, AsyncTable
+from .typeinfer import suggest_column_types, TypeTracker
+from .ingest import rows_from_file, iter_file_rows
+from .utils import Format
 
-__all__ = ["Database", "Table", "View", "EditableView", "suggest_column_types"]
+__all__ = ["Database", "Table", "View", "EditableView", "PoolTimeout", "Page", "InvalidPageToken", "AsyncDatabase", "AsyncTable", "suggest_column_types", "TypeTracker",
+           "IngestStats", "rows_from_file", "iter_file_rows", "Format"]
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+'''
+asyncio front-end for Database/Table. Every call runs on the database's own executor so the event loop never blocks.
+Writes awaited at the same time are grouped into one shared transaction, large results are streamed in chunks.
+'''
+
+import asyncio
+import contextlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple, Union
+
+from .beforeInit import Database
+from .db import Table as dbTable
+
+
+class AsyncDatabase:
+    """
+    Wrap a Database for use from asyncio.
+
+    A non-pooled sqlite3 connection can only be used by the thread that opened it, so by default the Database is
+    opened inside a dedicated single-thread executor that runs every call. With ``pool_size`` the pooled Database
+    is used and the executor gets one thread per connection. Reads (``run`` calls and streams) then wait on the event
+    loop for a free reader before taking an executor thread, so streams that keep a reader between chunks can't fill
+    the executor with threads blocked on the pool. A stream keeps its reader until it is exhausted or closed: with
+    ``pool_size=1`` don't await other reads inside ``async for``.
+
+    The Database is opened on the executor by ``async with``, ``await open()`` or the first awaited call, so creating
+    an AsyncDatabase never blocks the event loop. ``await AsyncDatabase.create(...)`` returns an opened one.
+
+    Usage::
+
+        async with AsyncDatabase("data.db", pool_size=4) as db:
+            await db["items"].insert_all(records, pk="id")
+            async for row in db["items"].rows_where("value > ?", [10]):
+                ...
+
+    :param filename_or_conn: path or ``sqlite3.Connection``, or an already opened Database. An existing non-pooled
+        Database must have been opened with ``check_same_thread=False``.
+    :param executor: executor to run the calls on. Only pass a multi-thread executor for a pooled Database.
+    :param chunk_size: number of rows fetched per executor call when streaming results. At most one more chunk is
+        read ahead of the consumer.
+    :param batch_writes: group writes awaited at the same time into one transaction (each write still fails alone)
+    :param kwargs: passed to Database(), e.g. memory=True, pool_size=4, tracer=print
+    """
+
+    def __init__(
+        self,
+        filename_or_conn: Any = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        chunk_size: int = 256,
+        batch_writes: bool = True,
+        **kwargs,
+    ):
+        self.chunk_size = chunk_size
+        self.batch_writes = batch_writes
+        self._own_executor = executor is None
+        self._db: Optional[Database] = None
+        self._opening: Optional[asyncio.Future] = None
+        if isinstance(filename_or_conn, Database):
+            self._db = filename_or_conn
+            pool_size = len(self.db._pool.readers) if self.db.pooled else 0
+            self._executor = executor or ThreadPoolExecutor(pool_size + 1 if pool_size else 1, thread_name_prefix="AsyncDatabase")
+        else:
+            pool_size = kwargs.get("pool_size", 0)
+            self._executor = executor or ThreadPoolExecutor(pool_size + 1 if pool_size else 1, thread_name_prefix="AsyncDatabase")
+        self._open_args = (filename_or_conn, kwargs)
+        self._pending_writes: List[Tuple[Callable, asyncio.Future]] = []
+        self._flushing = False
+        self._idle = asyncio.Event() # set while no write batch is queued or running
+        self._idle.set()
+        self._readers = asyncio.Semaphore(pool_size) if pool_size else None # free pooled readers
+
+    def __repr__(self) -> str:
+        return "<AsyncDatabase {}>".format(self._db if self._db is not None else "(not opened)")
+
+    @classmethod
+    async def create(cls, filename_or_conn: Any = None, **kwargs) -> "AsyncDatabase":
+        '''Create an AsyncDatabase and open it. Same parameters as AsyncDatabase().'''
+        return await cls(filename_or_conn, **kwargs).open()
+
+    @property
+    def db(self) -> Database:
+        '''The wrapped Database. Only touch it on the executor, e.g. inside run().'''
+        if self._db is None:
+            raise RuntimeError("{} is not opened yet, await open() first".format(self))
+        return self._db
+
+    async def open(self) -> "AsyncDatabase":
+        '''Open the Database on the executor. Safe to await many times and concurrently; it is opened only once.'''
+        if self._db is None:
+            if self._opening is None:
+                filename_or_conn, kwargs = self._open_args
+                self._opening = asyncio.get_running_loop().run_in_executor(
+                    self._executor, functools.partial(Database, filename_or_conn, **kwargs)
+                )
+            opening = self._opening
+            try:
+                db = await asyncio.shield(opening)
+            except BaseException:
+                if opening.done() and (opening.cancelled() or opening.exception() is not None):
+                    self._opening = None # let the next call retry
+                raise
+            self._db = db
+        return self
+
+    async def __aenter__(self) -> "AsyncDatabase":
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _reader_slot(self):
+        '''async context holding one of the pooled readers (nothing if not pooled)'''
+        return self._readers if self._readers is not None else contextlib.nullcontext()
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        '''Run ``func(*args, **kwargs)`` on this database's executor. Use it for anything not wrapped here.'''
+        if self._db is None:
+            await self.open()
+        async with self._reader_slot():
+            return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def write(self, func: Callable, *args, **kwargs) -> Any:
+        '''
+        Run a write on the executor. Writes that arrive while another batch is running are committed together in one
+        transaction, each inside its own savepoint.
+        '''
+        if not self.batch_writes:
+            return await self.run(func, *args, **kwargs)
+        if self._db is None:
+            await self.open()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_writes.append((functools.partial(func, *args, **kwargs), future))
+        if not self._flushing:
+            self._flushing = True
+            self._idle.clear()
+            loop.call_soon(self._flush_writes)
+        return await future
+
+    def _flush_writes(self):
+        batch, self._pending_writes = self._pending_writes, []
+        if not batch:
+            self._flushing = False
+            self._idle.set()
+            return
+        done = asyncio.get_running_loop().run_in_executor(self._executor, self._run_batch, [func for func, _ in batch])
+        done.add_done_callback(functools.partial(self._on_batch_done, batch))
+
+    def _run_batch(self, funcs: List[Callable]) -> List[Tuple[Any, Optional[BaseException]]]:
+        results = []
+        if len(funcs) == 1:
+            try:
+                results.append((funcs[0](), None))
+            except Exception as e:
+                results.append((None, e))
+            return results
+        with self.db.shared_transaction():
+            for func in funcs:
+                try:
+                    with self.db.savepoint():
+                        results.append((func(), None))
+                except Exception as e:
+                    results.append((None, e))
+        return results
+
+    def _on_batch_done(self, batch, done: asyncio.Future):
+        error = done.exception() if not done.cancelled() else asyncio.CancelledError()
+        results = done.result() if error is None else [(None, error)] * len(batch)
+        for (_, future), (result, exc) in zip(batch, results):
+            if future.done():
+                continue
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+        self._flush_writes()
+
+    async def stream(self, make_generator: Callable, *args, **kwargs) -> AsyncGenerator[Any, None]:
+        '''
+        Iterate the generator returned by ``make_generator(*args, **kwargs)`` on the executor, ``chunk_size`` items per
+        call. Only one chunk is read ahead, so a slow consumer holds back the query instead of buffering everything.
+        In pooled mode the stream holds a reader until it is exhausted or closed.
+        '''
+        if self._db is None:
+            await self.open()
+        loop = asyncio.get_running_loop()
+        async with self._reader_slot():
+            generator = await loop.run_in_executor(self._executor, functools.partial(make_generator, *args, **kwargs))
+            next_chunk = loop.run_in_executor(self._executor, _take, generator, self.chunk_size)
+            try:
+                while True:
+                    chunk = await next_chunk
+                    next_chunk = None
+                    if len(chunk) == self.chunk_size:
+                        next_chunk = loop.run_in_executor(self._executor, _take, generator, self.chunk_size)
+                    for item in chunk:
+                        yield item
+                    if next_chunk is None:
+                        return
+            finally:
+                if next_chunk is not None:
+                    await asyncio.wait([next_chunk])
+                await loop.run_in_executor(self._executor, generator.close)
+
+    # database methods
+    def table(self, table_name: str, **kwargs) -> "AsyncTable":
+        return AsyncTable(self, table_name, **kwargs)
+
+    def __getitem__(self, table_name: str) -> "AsyncTable":
+        return self.table(table_name)
+
+    def query(self, sql: str, params=None) -> AsyncGenerator[dict, None]:
+        return self.stream(self.db.query, sql, params)
+
+    async def execute(self, sql: str, parameters=None) -> List[tuple]:
+        '''Run ``sql`` and return all rows fetched. The cursor itself can't leave the executor.'''
+        return await self.run(lambda: self.db.execute(sql, parameters).fetchall())
+
+    async def execute_write(self, sql: str, parameters=None) -> int:
+        '''Run a modifying statement through the write batch and return its rowcount.'''
+        return await self.write(lambda: self.db.execute(sql, parameters).rowcount)
+
+    async def executescript(self, sql: str):
+        await self.run(self.db.executescript, sql)
+
+    async def table_names(self, fts4: bool = False, fts5: bool = False) -> List[str]:
+        return await self.run(self.db.table_names, fts4, fts5)
+
+    async def view_names(self) -> List[str]:
+        return await self.run(self.db.view_names)
+
+    async def tables(self) -> List["AsyncTable"]:
+        return [self.table(name) for name in await self.table_names()]
+
+    async def hasTable(self, tableName: str) -> bool:
+        return await self.run(self.db.hasTable, tableName)
+
+    async def create_table(self, name: str, columns: Dict[str, Any], **kwargs) -> "AsyncTable":
+        await self.write(self.db.create_table, name, columns, **kwargs)
+        return self.table(name)
+
+    async def create_view(self, name: str, sql: str, **kwargs) -> "AsyncDatabase":
+        await self.write(self.db.create_view, name, sql, **kwargs)
+        return self
+
+    async def vacuum(self):
+        await self.run(self.db.vacuum)
+
+    async def close(self):
+        '''Wait for pending writes, close the database and shut down the executor if it was created here.'''
+        await self._idle.wait()
+        if self._opening is not None and self._db is None:
+            await asyncio.wait([self._opening])
+            if not self._opening.cancelled() and self._opening.exception() is None:
+                self._db = self._opening.result()
+        if self._db is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._db.close)
+        if self._own_executor:
+            self._executor.shutdown(wait=False)
+
+
+def _take(generator, n: int) -> list:
+    chunk = []
+    for item in generator:
+        chunk.append(item)
+        if len(chunk) >= n:
+            break
+    return chunk
+
+
+def _read_method(name: str, is_property: bool = False):
+    async def method(self: "AsyncTable", *args, **kwargs):
+        def call():
+            value = getattr(self.sync_table, name)
+            return value if is_property else value(*args, **kwargs)
+        return await self.db.run(call)
+    method.__name__ = method.__qualname__ = name
+    method.__doc__ = "Awaitable ``Table.{}``".format(name)
+    return method
+
+
+def _stream_method(name: str):
+    def method(self: "AsyncTable", *args, **kwargs) -> AsyncGenerator[Any, None]:
+        return self.db.stream(lambda: getattr(self.sync_table, name)(*args, **kwargs))
+    method.__name__ = method.__qualname__ = name
+    method.__doc__ = "Async generator over ``Table.{}``".format(name)
+    return method
+
+
+_TABLE_RESULT = object()
+def _write_method(name: str):
+    async def method(self: "AsyncTable", *args, **kwargs):
+        def call():
+            result = getattr(self.sync_table, name)(*args, **kwargs)
+            if isinstance(result, dbTable):
+                return _TABLE_RESULT, result.last_pk, result.last_rowid
+            return result
+        result = await self.db.write(call)
+        if isinstance(result, tuple) and result and result[0] is _TABLE_RESULT:
+            _, self.last_pk, self.last_rowid = result
+            return self
+        return self if result is None else result
+    method.__name__ = method.__qualname__ = name
+    method.__doc__ = "Awaitable ``Table.{}``, batched with other concurrent writes".format(name)
+    return method
+
+
+class AsyncTable:
+    '''
+    Async facade of a Table/View. Reads are awaitable, ``rows_where``/``pks_and_rows_where``/``search``/``find`` are
+    async generators and writes go through AsyncDatabase.write(). Write methods return the AsyncTable itself, with
+    ``last_pk``/``last_rowid`` of the last insert/upsert/update like Table.
+    '''
+
+    def __init__(self, db: AsyncDatabase, name: str, **kwargs):
+        self.db = db
+        self.name = name
+        self._kwargs = kwargs
+        self.last_pk: Any = None
+        self.last_rowid: Optional[int] = None
+
+    def __repr__(self) -> str:
+        return "<AsyncTable {}>".format(self.name)
+
+    @property
+    def sync_table(self) -> Union[dbTable, Any]:
+        '''The underlying Table/View. Only touch it on the executor, e.g. inside AsyncDatabase.run().'''
+        return self.db.db.table(self.name, **self._kwargs)
+
+    @property
+    def rows(self) -> AsyncGenerator[dict, None]:
+        return self.rows_where()
+
+    async def find_first(self, *args, select: str = "*", order_by: str = None) -> Optional[Dict[str, Any]]:
+        return await self.db.run(lambda: self.sync_table.find_first(*args, select=select, order_by=order_by))
+
+    def find(self, *args, select: str = "*", order_by: str = None, limit: int = None, offset: int = None) -> AsyncGenerator[dict, None]:
+        return self.db.stream(lambda: self.sync_table.find(*args, select=select, order_by=order_by, limit=limit, offset=offset))
+
+
+for _name in ("exists", "get", "count_where", "find_sql", "search_sql", "detect_fts"):
+    setattr(AsyncTable, _name, _read_method(_name))
+for _name in ("count", "columns", "columns_dict", "pks", "use_rowid", "schema", "indexes", "foreign_keys", "triggers"):
+    setattr(AsyncTable, _name, _read_method(_name, is_property=True))
+for _name in ("rows_where", "pks_and_rows_where", "search"):
+    setattr(AsyncTable, _name, _stream_method(_name))
+for _name in ("create", "insert", "insert_all", "upsert", "upsert_all", "update", "delete", "delete_where", "lookup",
+              "transform", "extract", "convert", "add_column", "add_foreign_key", "create_index", "enable_fts", "drop",
+              "add_trigger", "remove_trigger"):
+    setattr(AsyncTable, _name, _write_method(_name))
+
+
+__all__ = ["AsyncDatabase", "AsyncTable"]
@@ -5,17 +5,237 @@ from .db import Database as dbDatabase
 from .db import Table as dbTable
 from .db import View as dbView
 from .db import (resolve_extracts, COLUMN_TYPE_MAPPING, ForeignKey, ForeignKeysType, AlterError, validate_column_names,
-                 NotFoundError, jsonify_if_needed)
-from typing import Union, Literal, Any, Optional, Dict, List, Iterable, cast, Sequence
+                 NotFoundError, jsonify_if_needed, DEFAULT, fix_square_braces, PrimaryKeyRequired)
+from .utils import chunks, hash_record, OperationalError
+from .typeinfer import suggest_column_types
+from .ingest import IngestStats, DEFAULT_PART_SIZE, ingest_file
+from .utils import Format
+from .db import Queryable as dbQueryable
+from .pool import ConnectionPool, PoolTimeout, BufferedCursor, is_read_only, pooled_reader, pooled_writer
+from .schema import SchemaCache, is_ddl
+from .rows import RowFormat, DEFAULT_CHUNK_SIZE, format_rows, format_fetched
+from .pagination import Page, InvalidPageToken, encode_token, decode_token, keyset_sql, keyset_params
+from .db import Column
+from . import db as dbModule
+from .utils import sqlite3
+from typing import Union, Literal, Any, Optional, Dict, List, Iterable, cast, Sequence, Tuple, Generator, Callable
+from functools import lru_cache
+import contextlib, functools, inspect, itertools, os, pathlib, re
+
+#find
+FIND_OPERATORS = ('=', '==', '!=', '<>', '<', '<=', '>', '>=', 'IS', 'IS NOT', 'LIKE', 'NOT LIKE', 'GLOB', 'NOT GLOB', 'IN', 'NOT IN')
+_FIND_OPERATOR_LOOKUP = {**{op: op for op in FIND_OPERATORS}, **{op.lower(): op for op in FIND_OPERATORS}}
+_PLAIN_VALUE_TYPES = (int, float, str, bytes, bool, type(None))
+_identifier_re = re.compile(r'^\w+$')
+def _normalize_find_conditions(args) -> tuple:
+    '''accept both find(column, operator, value) and find((column, operator, value), (column, operator, value), ...)'''
+    if len(args) == 3 and not isinstance(args[0], (tuple, list)):
+        return (tuple(args),)
+    return args
+@lru_cache(maxsize=512)
+def _find_sql_for_shape(name: str, shape: tuple, select: str, order_by: Optional[str], has_limit: bool, has_offset: bool) -> str:
+    '''
+    Build the SQL for a condition shape ((column, operator, value_count), ...), value_count is None for a single value,
+    or the length of the sequence for IN / NOT IN. The same shape always gives the same SQL text, so sqlite3's
+    per-connection statement cache can reuse the prepared statement.
+    '''
+    wheres = []
+    for column, operator, value_count in shape:
+        column_sql = "[{}]".format(column) if _identifier_re.match(column) else column
+        if value_count is None:
+            wheres.append("{} {} ?".format(column_sql, operator))
+        else:
+            wheres.append("{} {} ({})".format(column_sql, operator, ", ".join("?" * value_count)))
+    sql = "SELECT {} FROM [{}]".format(select, name)
+    if wheres:
+        sql += " WHERE " + " AND ".join(wheres)
+    if order_by is not None:
+        sql += " ORDER BY " + order_by
+    if has_limit or has_offset:
+        sql += " LIMIT ?"
+    if has_offset:
+        sql += " OFFSET ?"
+    return sql
+def compile_find(name: str, conditions: Iterable[Sequence], select: str = "*", order_by: Optional[str] = None,
+                 limit: Optional[int] = None, offset: Optional[int] = None) -> Tuple[str, list]:
+    '''
+    Compile (column, operator, value) conditions into a parameterized ``SELECT`` and its parameters.
+    Values are always bound as parameters, never pasted into the SQL.
+
+    :param name: table or view name
+    :param conditions: iterable of (column, operator, value). For ``IN`` / ``NOT IN``, value must be a sequence.
+    :param select: Comma-separated list of columns to select - defaults to ``*``
+    :param order_by: Column or fragment of SQL to order by
+    :param limit: Integer number of rows to limit to
+    :param offset: Integer for SQL offset
+    '''
+    shape = []
+    params = []
+    for column, operator, value in conditions:
+        normalized = _FIND_OPERATOR_LOOKUP.get(operator)
+        if normalized is None:
+            normalized = " ".join(operator.split()).upper()
+            if normalized not in FIND_OPERATORS:
+                raise ValueError(f"Unsupported operator: {operator}")
+        if normalized in ('IN', 'NOT IN'):
+            values = [jsonify_if_needed(v) for v in value]
+            shape.append((column, normalized, len(values)))
+            params.extend(values)
+        else:
+            shape.append((column, normalized, None))
+            params.append(value if type(value) in _PLAIN_VALUE_TYPES else jsonify_if_needed(value))
+    if limit is not None or offset is not None:
+        params.append(limit if limit is not None else -1)
+    if offset is not None:
+        params.append(offset)
+    sql = _find_sql_for_shape(name, tuple(shape), select, order_by, limit is not None, offset is not None)
+    return sql, params
+
+#insert
+INSERT_ENGINES = ("values", "executemany")
+EXECUTEMANY_BATCH_SIZE = 10000
+'''rows per transaction of the executemany engine when batch_size is not given. Not limited by SQLITE_MAX_VARS.'''
+SUPPORTS_NATIVE_UPSERT = sqlite3.sqlite_version_info >= (3, 24, 0)
+'''INSERT ... ON CONFLICT DO UPDATE needs SQLite 3.24+'''
+_origin_insert_all = dbTable.insert_all
+def _insert_sql(name: str, all_columns: List[str], or_what: str, conversions: dict, upsert_pks: Optional[List[str]]) -> str:
+    '''single-row INSERT. With upsert_pks: INSERT ... ON CONFLICT(pks) DO UPDATE SET col=excluded.col for the other columns'''
+    placeholders = ", ".join("?" if upsert_pks and c in upsert_pks else conversions.get(c, "?") for c in all_columns)
+    sql = "INSERT {}INTO [{}] ({}) VALUES ({})".format(or_what, name, ", ".join("[{}]".format(c) for c in all_columns), placeholders)
+    if upsert_pks:
+        set_cols = [c for c in all_columns if c not in upsert_pks]
+        sql += " ON CONFLICT({}) DO ".format(", ".join("[{}]".format(p) for p in upsert_pks))
+        sql += "UPDATE SET " + ", ".join("[{0}] = excluded.[{0}]".format(c) for c in set_cols) if set_cols else "NOTHING"
+    return sql + ";"
+def _insert_row_values(record: dict, all_columns: List[str], hash_id: Optional[str], hash_id_columns, extracts: dict, lookup) -> tuple:
+    values = []
+    for key in all_columns:
+        value = record.get(key) if key != hash_id else record.get(key, hash_record(record, hash_id_columns))
+        if type(value) not in _PLAIN_VALUE_TYPES:
+            value = jsonify_if_needed(value)
+        if key in extracts:
+            value = lookup(extracts[key], value)
+        values.append(value)
+    return tuple(values)
+def insert_all(self, records, pk=DEFAULT, foreign_keys=DEFAULT, column_order=DEFAULT, not_null=DEFAULT, defaults=DEFAULT,
+               batch_size=DEFAULT, hash_id=DEFAULT, hash_id_columns=DEFAULT, alter=DEFAULT, ignore=DEFAULT, replace=DEFAULT,
+               truncate=False, extracts=DEFAULT, conversions=DEFAULT, columns=DEFAULT, upsert=False, analyze=False,
+               engine: Optional[str] = None) -> dbTable:
+    engine = engine or getattr(self.db, "insert_engine", "values")
+    if engine not in INSERT_ENGINES:
+        raise ValueError(f"Unknown insert engine: {engine}. Choose from {INSERT_ENGINES}")
+    given_batch_size = batch_size
+    options = dict(pk=pk, foreign_keys=foreign_keys, column_order=column_order, not_null=not_null, defaults=defaults,
+                   hash_id=hash_id, hash_id_columns=hash_id_columns, alter=alter, ignore=ignore, replace=replace,
+                   extracts=extracts, conversions=conversions, columns=columns, analyze=analyze)
+    if upsert:
+        if not getattr(self.db, "native_upsert", False):
+            return _origin_insert_all(self, records, batch_size=batch_size, truncate=truncate, upsert=upsert, **options)
+    elif engine == "values":
+        return _origin_insert_all(self, records, batch_size=batch_size, truncate=truncate, **options)
+    records = iter(fix_square_braces(records))
+    head = list(itertools.islice(records, 2))
+    if not head:
+        return self
+    if len(head) < 2 and not upsert:
+        # a single record: the values engine also fills last_pk / last_rowid
+        return _origin_insert_all(self, head, batch_size=batch_size, truncate=truncate, **options)
+
+    pk = self.value_or_default("pk", pk)
+    hash_id = self.value_or_default("hash_id", hash_id)
+    hash_id_columns = self.value_or_default("hash_id_columns", hash_id_columns)
+    alter = self.value_or_default("alter", alter)
+    ignore = self.value_or_default("ignore", ignore)
+    replace = self.value_or_default("replace", replace)
+    extracts = resolve_extracts(self.value_or_default("extracts", extracts))
+    conversions = self.value_or_default("conversions", conversions) or {}
+    batch_size = EXECUTEMANY_BATCH_SIZE if batch_size is DEFAULT else max(1, batch_size)
+    if hash_id_columns and hash_id is None:
+        hash_id = "id"
+    if upsert and (not pk and not hash_id):
+        raise PrimaryKeyRequired("upsert() requires a pk")
+    assert not (hash_id and pk), "Use either pk= or hash_id="
+    if hash_id:
+        pk = hash_id
+    assert not (ignore and replace), "Use either ignore=True or replace=True, not both"
+    or_what = "OR REPLACE " if replace and not upsert else "OR IGNORE " if ignore and not upsert else ""
+    upsert_pks = ([pk] if isinstance(pk, str) else list(pk)) if upsert else None
+    lookup = lambda table, value: self.db[table].lookup({"value": value})
+
+    self.last_rowid = None
+    self.last_pk = None
+    if truncate and self.exists():
+        self.db.execute("DELETE FROM [{}];".format(self.name))
+    all_columns: Optional[List[str]] = None
+    for chunk in chunks(itertools.chain(head, records), batch_size):
+        chunk = list(chunk)
+        if all_columns is None:
+            if not self.exists():
+                column_types = suggest_column_types(chunk)
+                column_types.update(self.value_or_default("columns", columns) or {})
+                self.create(column_types, pk, self.value_or_default("foreign_keys", foreign_keys),
+                            column_order=self.value_or_default("column_order", column_order),
+                            not_null=self.value_or_default("not_null", not_null),
+                            defaults=self.value_or_default("defaults", defaults),
+                            hash_id=hash_id, hash_id_columns=hash_id_columns, extracts=extracts)
+            all_columns = sorted(set().union(*(record.keys() for record in chunk)))
+            if hash_id:
+                all_columns.insert(0, hash_id)
+        else:
+            known = set(all_columns)
+            for record in chunk:
+                for column in record:
+                    if column not in known:
+                        known.add(column)
+                        all_columns.append(column)
+        sql = _insert_sql(self.name, all_columns, or_what, conversions, upsert_pks)
+        rows = [_insert_row_values(record, all_columns, hash_id, hash_id_columns, extracts, lookup) for record in chunk]
+        try:
+            with self.db.conn:
+                if self.db._tracer:
+                    self.db._tracer(sql, {"executemany": len(rows)})
+                try:
+                    self.db.conn.executemany(sql, rows)
+                except OperationalError as e:
+                    if not (alter and " column" in e.args[0]):
+                        raise
+                    self.add_missing_columns(chunk)
+                    self.db.conn.executemany(sql, rows)
+        except OperationalError as e:
+            # pk= is not the table's primary key or a unique index, so it can't be an ON CONFLICT target. The statement fails when it is
+            # prepared, i.e. on the first chunk before any row is written: upsert everything with INSERT OR IGNORE + UPDATE instead
+            if not (upsert_pks and "ON CONFLICT clause does not match" in e.args[0]):
+                raise
+            return _origin_insert_all(self, itertools.chain(chunk, records), batch_size=given_batch_size, upsert=upsert, **options)
+    if upsert and len(head) == 1:
+        row = dict(zip(all_columns, rows[0]))
+        self.last_pk = row[upsert_pks[0]] if len(upsert_pks) == 1 else tuple(row[p] for p in upsert_pks)
+    if analyze:
+        self.analyze()
+    return self
 
 #table
 class Table(dbTable):
-    def find(self, *args, toTuple: bool = False):
-        '''condition pattern: (column, operator, value). condition1, condition2, condition3...'''
+    def find_sql(self, *args, select: str = "*", order_by: str = None, limit: int = None, offset: int = None) -> Tuple[str, list]:
+        '''return (sql, params) used by find(). condition pattern: (column, operator, value). condition1, condition2, condition3...'''
+        pass
+    def find(self, *args, toTuple: bool = False, select: str = "*", order_by: str = None, limit: int = None,
+             offset: int = None) -> Union[Generator[dict, None, None], Tuple[dict, ...]]:
+        '''condition pattern: (column, operator, value). condition1, condition2, condition3... Rows are streamed from the cursor unless toTuple=True'''
         pass
-    def find_first(self, *args):
+    def find_first(self, *args, select: str = "*", order_by: str = None) -> Union[None, Dict[str, Any]]:
         '''condition pattern: (column, operator, value). condition1, condition2, condition3...'''
         pass
+    def insert_all(self, records, *args, engine: Literal["values", "executemany"] = None, **kwargs) -> "Table":
+        '''
+        Same as sqlite-utils insert_all, plus:
+        :param engine: "values" (default, or Database.insert_engine) renders multi-row VALUES statements whose batch size is capped by
+            SQLITE_MAX_VARS. "executemany" prepares one single-row INSERT and feeds it through executemany, one transaction
+            per batch_size rows (default EXECUTEMANY_BATCH_SIZE).
+        upsert=True runs one INSERT ... ON CONFLICT(pk) DO UPDATE per record through executemany, whatever the engine, when the
+        SQLite build supports it (Database.native_upsert). Otherwise it falls back to INSERT OR IGNORE + UPDATE.
+        '''
+        pass
     def printTable(self):
         pass
     def add_trigger(self, name, event: Literal["INSERT", "DELETE", "UPDATE"], sql: str,
@@ -26,34 +246,41 @@ class Table(dbTable):
         pass
     def getTableSequence(self)->Union[None, int]:
         pass
-def find(self, *args, toTuple: bool = False):
-    if len(args) == 3 and not isinstance(args[0], tuple) and not isinstance(args[0], list):
-        return self.find(tuple(args), toTuple=toTuple)
-    else:
-        sql = f"SELECT * FROM {self.name} WHERE "
-        for i, pattern in enumerate(args):
-            if i > 0:
-                sql += " AND "
-            sql += f"{pattern[0]} {pattern[1]} '{pattern[2]}'"
-        if not toTuple:
-            return self.db.query(sql)
-        else:
-            output = []
-            for data in self.db.query(sql):
-                output.append(data)
-            return tuple(output)
-def find_first(self, *args)->Union[None, Dict[str, Any]]:
-    if len(args) == 3 and not isinstance(args[0], tuple) and not isinstance(args[0], list):
-        return self.find_first(tuple(args))
+    def paginate(self, page_size: int = 1000, after: Optional[str] = None, where: str = None, where_args: Optional[Union[Iterable, dict]] = None,
+                 select: str = "*", keys: Optional[Sequence[str]] = None, descending: bool = False, row_format: RowFormat = "dict") -> Page:
+        '''one page by primary key (keyset pagination), returns Page(rows, next_token). Pass next_token as after= for the next page'''
+        pass
+    def iter_pages(self, page_size: int = 1000, after: Optional[str] = None, where: str = None, where_args: Optional[Union[Iterable, dict]] = None,
+                   select: str = "*", keys: Optional[Sequence[str]] = None, descending: bool = False,
+                   row_format: RowFormat = "dict") -> Generator[Page, None, None]:
+        '''yield paginate() pages until the last one'''
+        pass
+    def ingest(self, path: Union[str, os.PathLike], format: Optional[Format] = None, dialect=None, encoding: Optional[str] = None,
+               ignore_extras: Optional[bool] = False, extras_key: Optional[str] = None, detect_types: Optional[bool] = None,
+               workers: Optional[int] = None, part_size: int = DEFAULT_PART_SIZE, max_pending: Optional[int] = None,
+               engine: Literal["values", "executemany"] = "executemany", **kwargs) -> IngestStats:
+        '''
+        Load a CSV / TSV / JSON / NDJSON file (format detected if not given) with bounded memory: byte ranges of part_size are
+        parsed by `workers` processes (0: in this process), at most max_pending ranges in flight, and the rows are inserted
+        here in file order through insert_all(engine=engine, **kwargs).
+        detect_types (default: True for CSV / TSV) checks the column types in the workers and transform()s a table that
+        this call created. Returns IngestStats(rows, bytes, seconds, format, types).
+        '''
+        pass
+def find_sql(self, *args, select: str = "*", order_by: str = None, limit: int = None, offset: int = None) -> Tuple[str, list]:
+    return compile_find(self.name, _normalize_find_conditions(args), select=select, order_by=order_by, limit=limit, offset=offset)
+def find(self, *args, toTuple: bool = False, select: str = "*", order_by: str = None, limit: int = None,
+         offset: int = None) -> Union[Generator[dict, None, None], Tuple[dict, ...]]:
+    sql, params = self.find_sql(*args, select=select, order_by=order_by, limit=limit, offset=offset)
+    if not toTuple:
+        return self.db.query(sql, params)
     else:
-        sql = f"SELECT * FROM {self.name} WHERE "
-        for i, pattern in enumerate(args):
-            if i > 0:
-                sql += " AND "
-            sql += f"{pattern[0]} {pattern[1]} '{pattern[2]}'"
-        for data in self.db.query(sql):
-            return data
-        return None
+        return tuple(self.db.query(sql, params))
+def find_first(self, *args, select: str = "*", order_by: str = None) -> Union[None, Dict[str, Any]]:
+    sql, params = self.find_sql(*args, select=select, order_by=order_by, limit=1)
+    for data in self.db.query(sql, params):
+        return data
+    return None
 def printTable(self):
     print("table:", self.name)
     for row in self.rows:
@@ -73,12 +300,15 @@ def getTableSequence(self)->Union[None, int]:
         return self.db['sqlite_sequence'].find_first('name','=',self.name)['seq']
     except:
         return None
+setattr(dbTable, "find_sql", find_sql)
 setattr(dbTable, "find", find)
 setattr(dbTable, "find_first", find_first)
+setattr(dbTable, "insert_all", insert_all)
 setattr(dbTable, "printTable", printTable)
 setattr(dbTable, "add_trigger", add_trigger_table)
 setattr(dbTable, "remove_trigger", remove_trigger)
 setattr(dbTable, "getTableSequence", getTableSequence)
+setattr(dbTable, "ingest", ingest_file)
 
 #view
 class View(dbView):
@@ -88,7 +318,8 @@ class View(dbView):
         pass
     def remove_trigger(self, name):
         pass
-    def find(self, *args, toTuple: bool = False):
+    def find(self, *args, toTuple: bool = False, select: str = "*", order_by: str = None, limit: int = None,
+             offset: int = None) -> Union[Generator[dict, None, None], Tuple[dict, ...]]:
         '''pattern: (column, operator, value)'''
         pass
     def printView(self):
@@ -105,6 +336,7 @@ def printView(self):
     print('-----------------')
 setattr(dbView, "add_trigger", add_trigger_view)
 setattr(dbView, "remove_trigger", remove_trigger)
+setattr(dbView, "find_sql", find_sql)
 setattr(dbView, "find", find)
 setattr(dbView, "find_first", find_first)
 setattr(dbView, "printView", printView)
@@ -218,12 +450,210 @@ class EditableView(View):
         super().drop(ignore)
 setattr(EditableView, "add_trigger", add_trigger_view)
 setattr(EditableView, "remove_trigger", remove_trigger)
+setattr(EditableView, "find_sql", find_sql)
 setattr(EditableView, "find", find)
 setattr(EditableView, "printView", printView)
 
 #database
+class _DeferredCommitConnection:
+    '''Stands in for the connection inside Database.shared_transaction(): commit() and "with conn:" are left to the outer block.'''
+    __slots__ = ("_conn",)
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+    def commit(self):
+        pass
+
 class Database(dbDatabase):
     _editableViews = {}
+    _pool: Optional[ConnectionPool] = None
+    _schema_cache: Optional[SchemaCache] = None
+    insert_engine: Literal["values", "executemany"] = "values"
+    '''default engine of Table.insert_all, see Table.insert_all'''
+    native_upsert: bool = SUPPORTS_NATIVE_UPSERT
+    '''upsert with one INSERT ... ON CONFLICT DO UPDATE per row (executemany) instead of INSERT OR IGNORE + UPDATE'''
+    def __init__(self, filename_or_conn: Union[str, pathlib.Path, sqlite3.Connection] = None, memory: bool = False, memory_name: str = None,
+                 recreate: bool = False, recursive_triggers: bool = True, tracer: Callable = None, use_counts_table: bool = False,
+                 pool_size: int = 0, pool_timeout: Optional[float] = None, schema_cache: bool = True, schema_check_interval: float = 0.0):
+        '''
+        :param schema_cache: cache table_names/view_names/PRAGMA table_info (so exists/columns/pks/use_rowid...) until PRAGMA schema_version changes.
+            DDL sent through this Database clears it at once, and nothing is cached inside a transaction. See schema_cache_stats.
+        :param schema_check_interval: 0 (default) reads schema_version on every lookup, so changes from other connections are seen at
+            once. Opt in to > 0 to trust the cache for that many seconds without reading it (DDL sent through this Database still
+            clears it at once, but tables created/dropped by other connections/processes are seen up to this late).
+        :param pool_size: > 0 to open the database in pooled mode: the file is switched to WAL, one writer connection is kept behind a lock
+            and pool_size read-only connections serve query/rows_where/search/find. Connections can be shared between threads.
+            Only works with a file path. Time spent waiting for a connection is reported to tracer as ("/* pool wait */", {"role", "wait"}).
+        :param pool_timeout: seconds to wait for a pooled connection before raising PoolTimeout. None means wait forever.
+        '''
+        if schema_cache:
+            self._schema_cache = SchemaCache(schema_check_interval)
+        if not pool_size:
+            super().__init__(filename_or_conn, memory, memory_name, recreate, recursive_triggers, tracer, use_counts_table)
+            return
+        if not isinstance(filename_or_conn, (str, pathlib.Path)) or memory or memory_name or str(filename_or_conn) == ":memory:":
+            raise ValueError("pool_size can only be used with a database file path")
+        if recreate and os.path.exists(filename_or_conn):
+            os.remove(filename_or_conn)
+        conn = sqlite3.connect(str(filename_or_conn), check_same_thread=False)
+        super().__init__(conn, recursive_triggers=recursive_triggers, tracer=tracer, use_counts_table=use_counts_table)
+        self.enable_wal()
+        self._pool = ConnectionPool(conn, str(filename_or_conn), pool_size, pool_timeout, self._trace_pool_wait, self._invalidate_schema)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        '''In pooled mode, the connection currently used by this thread (the writer if none is checked out).'''
+        return self._conn if self._pool is None else self._pool.current()
+    @conn.setter
+    def conn(self, value: sqlite3.Connection):
+        self._conn = value
+    @property
+    def pooled(self) -> bool:
+        return self._pool is not None
+    @property
+    def pool_stats(self) -> Dict[str, Dict[str, float]]:
+        '''{"reader"/"writer": {"checkouts", "wait_total", "wait_max"}}. Empty if not pooled.'''
+        return self._pool.stats() if self._pool is not None else {}
+    @property
+    def schema_cache_stats(self) -> Dict[str, int]:
+        '''{"hits", "misses", "version_checks", "invalidations", "queries_saved", "round_trips_saved"}. Empty if the cache is off.'''
+        return self._schema_cache.stats() if self._schema_cache is not None else {}
+    def _invalidate_schema(self):
+        if self._schema_cache is not None:
+            self._schema_cache.invalidate()
+    def _trace_pool_wait(self, role: str, wait: float):
+        if self._tracer:
+            self._tracer("/* pool wait */", {"role": role, "wait": wait})
+
+    @contextlib.contextmanager
+    def reader(self):
+        '''Run everything in the block on one reader connection. No-op if not pooled.'''
+        if self._pool is None:
+            yield self
+            return
+        with self._pool.reader():
+            yield self
+    @contextlib.contextmanager
+    def writer(self):
+        '''
+        Hold the writer for the whole block, e.g. to run several statements as one transaction. The transaction is committed when the
+        outermost block exits (rolled back on error). No-op if not pooled.
+        '''
+        if self._pool is None:
+            yield self
+            return
+        with self._pool.writer():
+            yield self
+
+    def query(self, sql: str, params: Optional[Union[Iterable, dict]] = None, row_format: RowFormat = "dict",
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> Generator[Any, None, None]:
+        '''
+        Execute sql and iterate the rows.
+        :param row_format: "dict" (default), "tuple", "record" (__slots__ class per result shape), or per chunk of chunk_size rows:
+            "columns" ({column: list}) / "numpy" ({column: ndarray}). See rows.format_rows.
+        '''
+        cursor = self.execute(sql, params or tuple())
+        yield from format_rows(cursor, row_format, chunk_size)
+    def execute(self, sql: str, parameters: Optional[Union[Iterable, dict]] = None) -> sqlite3.Cursor:
+        '''
+        In pooled mode outside reader()/writer(), queries (SELECT/VALUES/WITH without writes) run on a reader and everything else
+        holds the writer. The connection goes back to the pool on return, so the rows are fetched first (a BufferedCursor is returned).
+        '''
+        if self._pool is None or self._pool.in_use():
+            cursor = super().execute(sql, parameters)
+        else:
+            with self._pool.reader() if is_read_only(sql) else self._pool.writer():
+                cursor = BufferedCursor(super().execute(sql, parameters))
+        if self._schema_cache is not None and is_ddl(sql):
+            self._schema_cache.invalidate()
+        return cursor
+    def executescript(self, sql: str) -> sqlite3.Cursor:
+        try:
+            return super().executescript(sql)
+        finally:
+            self._invalidate_schema()
+    def table_names(self, fts4: bool = False, fts5: bool = False) -> List[str]:
+        if self._schema_cache is None:
+            return super().table_names(fts4, fts5)
+        return list(self._schema_cache.get(self, ("table_names", fts4, fts5), lambda: tuple(super(Database, self).table_names(fts4, fts5))))
+    def view_names(self) -> List[str]:
+        if self._schema_cache is None:
+            return super().view_names()
+        return list(self._schema_cache.get(self, ("view_names",), lambda: tuple(super(Database, self).view_names())))
+    def register_function(self, fn: Callable = None, deterministic: bool = False, replace: bool = False, name: Optional[str] = None):
+        if self._pool is None:
+            return super().register_function(fn, deterministic, replace, name)
+        def register(fn):
+            fn_name, arity = name or fn.__name__, len(inspect.signature(fn).parameters)
+            if not replace and (fn_name, arity) in self._registered_functions:
+                return fn
+            with self._pool.writer():
+                super(Database, self).register_function(fn, deterministic, replace, name)
+            for reader in self._pool.readers:
+                try:
+                    reader.create_function(fn_name, arity, fn, deterministic=deterministic)
+                except (sqlite3.NotSupportedError, TypeError):
+                    reader.create_function(fn_name, arity, fn)
+            return fn
+        if fn is None:
+            return register
+        register(fn)
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+        super().close()
+
+    @contextlib.contextmanager
+    def shared_transaction(self):
+        '''
+        Run the whole block as one transaction, although Table methods like insert_all/update normally commit on their own.
+        Committed when the block exits, rolled back if it raises. Combine with savepoint() to let a single step fail.
+        Don't call executescript inside, sqlite commits before running a script.
+        '''
+        with self.writer():
+            conn = self.conn
+            if isinstance(conn, _DeferredCommitConnection):
+                yield self
+                return
+            if self._pool is not None:
+                use = self._pool.using(_DeferredCommitConnection(conn))
+            else:
+                use = self._swap_conn(_DeferredCommitConnection(conn))
+            with use:
+                if not conn.in_transaction:
+                    conn.execute("BEGIN")
+                try:
+                    yield self
+                except BaseException:
+                    conn.rollback()
+                    self._invalidate_schema()
+                    raise
+                conn.commit()
+    @contextlib.contextmanager
+    def _swap_conn(self, conn):
+        origin, self._conn = self._conn, conn
+        try:
+            yield conn
+        finally:
+            self._conn = origin
+    @contextlib.contextmanager
+    def savepoint(self, name: str = "step"):
+        '''Roll back only the changes made inside the block if it raises.'''
+        self.execute(f"SAVEPOINT [{name}]")
+        try:
+            yield self
+        except BaseException:
+            self.execute(f"ROLLBACK TO [{name}]")
+            self.execute(f"RELEASE [{name}]")
+            self._invalidate_schema()
+            raise
+        self.execute(f"RELEASE [{name}]")
+
     def joinCreate_EditableView(self, name: str, leftTable:Table, rightTable:Table, columns:Sequence[str], conditionSQLs:Union[str,Sequence[str]], deleteSQL:str=None,
                                 insertSQL:str=None, updateSQL:str=None, method:Literal["LEFT","CROSS","INNER"]="INNER", defaults:Dict[str,Any]=None,
                                 primaryKeys:Union[str,Sequence[str]]=None) -> EditableView:
@@ -556,6 +986,118 @@ class Database(dbDatabase):
         )
         return sql
 
-__all__ = ["Table", "Database", "View", "EditableView"]
+#row format
+_origin_rows_where = dbQueryable.rows_where
+def rows_where(self, where: str = None, where_args: Optional[Union[Iterable, dict]] = None, order_by: str = None, select: str = "*",
+               limit: int = None, offset: int = None, row_format: RowFormat = "dict", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Generator[Any, None, None]:
+    if row_format == "dict":
+        yield from _origin_rows_where(self, where, where_args, order_by, select, limit, offset)
+        return
+    if not self.exists():
+        return
+    sql = "select {} from [{}]".format(select, self.name)
+    if where is not None:
+        sql += " where " + where
+    if order_by is not None:
+        sql += " order by " + order_by
+    if limit is not None:
+        sql += " limit {}".format(limit)
+    if offset is not None:
+        sql += " offset {}".format(offset)
+    yield from format_rows(self.db.execute(sql, where_args or []), row_format, chunk_size)
+rows_where.__doc__ = (_origin_rows_where.__doc__ or "") + '''
+        :param row_format: "dict" (default), "tuple", "record", "columns" or "numpy", see Database.query
+        :param chunk_size: rows per chunk of the "columns" / "numpy" formats
+        '''
+setattr(dbQueryable, "rows_where", rows_where)
+
+#keyset pagination
+def paginate(self, page_size: int = 1000, after: Optional[str] = None, where: str = None, where_args: Optional[Union[Iterable, dict]] = None,
+             select: str = "*", keys: Optional[Sequence[str]] = None, descending: bool = False, row_format: RowFormat = "dict") -> Page:
+    '''
+    Fetch one page ordered by primary key (rowid for rowid tables) with WHERE (pk) > (last pk) ... LIMIT page_size, so every
+    page costs the same however deep it is, unlike offset. Returns Page(rows, next_token); pass next_token as after= to
+    continue, also from another process. Compound primary keys are compared as a row value.
+
+    :param keys: columns to page by, defaults to the primary key. Required for views. Must be unique together.
+    :param descending: page from the largest key down
+    :param row_format: see Database.query. "columns" / "numpy" give one {column: values} dict per page.
+    '''
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    if keys is None:
+        keys = getattr(self, "pks", None)
+        if keys is None:
+            raise ValueError("keys= is required to paginate a view")
+    keys = (keys,) if isinstance(keys, str) else tuple(keys)
+    if not self.exists():
+        return Page(format_fetched((), [], row_format), None)
+    last = decode_token(after, keys, descending) if after is not None else None
+    sql, order = keyset_sql(self.name, keys, select, where, last is not None, descending, isinstance(where_args, dict))
+    cursor = self.db.execute(sql, keyset_params(where_args, last, order, page_size + 1))
+    fetched = cursor.fetchall()
+    n = len(keys)
+    columns = tuple(d[0] for d in cursor.description[n:])
+    next_token = None
+    if len(fetched) > page_size:
+        fetched = fetched[:page_size]
+        next_token = encode_token(keys, fetched[-1][:n], descending)
+    return Page(format_fetched(columns, [row[n:] for row in fetched], row_format), next_token)
+def iter_pages(self, page_size: int = 1000, after: Optional[str] = None, where: str = None, where_args: Optional[Union[Iterable, dict]] = None,
+               select: str = "*", keys: Optional[Sequence[str]] = None, descending: bool = False,
+               row_format: RowFormat = "dict") -> Generator[Page, None, None]:
+    '''Yield paginate() pages until the last one. Keep the last next_token to resume an interrupted export.'''
+    while True:
+        page = self.paginate(page_size, after, where, where_args, select, keys, descending, row_format)
+        yield page
+        if page.next_token is None:
+            return
+        after = page.next_token
+setattr(dbQueryable, "paginate", paginate)
+setattr(dbQueryable, "iter_pages", iter_pages)
+
+#type inference
+setattr(dbModule, "suggest_column_types", suggest_column_types)
+'''origin insert_all / add_missing_columns also use the chunked typeinfer.suggest_column_types'''
+
+#schema cache
+_origin_columns = dbQueryable.columns.fget
+def _columns(self) -> List[Column]:
+    cache = getattr(self.db, "_schema_cache", None)
+    if cache is None:
+        return _origin_columns(self)
+    return list(cache.get(self.db, ("table_info", self.name), lambda: tuple(_origin_columns(self))))
+_columns.__doc__ = _origin_columns.__doc__
+def _invalidates_schema(method):
+    '''for methods that change the schema without going through Database.execute'''
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        db = getattr(self, "db", self)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            if isinstance(db, Database):
+                db._invalidate_schema()
+    return wrapper
+setattr(dbTable, "enable_fts", _invalidates_schema(dbTable.enable_fts))
+setattr(Database, "add_foreign_keys", _invalidates_schema(dbDatabase.add_foreign_keys))
+
+#pooled mode: reads go to a reader connection, writes hold the writer
+setattr(dbQueryable, "columns", property(pooled_reader(_columns)))
+for _name in ("query", "table_names", "view_names"):
+    setattr(Database, _name, pooled_reader(getattr(Database, _name)))
+for _name in ("create_table", "create_view", "executescript", "vacuum", "add_foreign_keys", "joinCreate_EditableView"):
+    setattr(Database, _name, pooled_writer(getattr(Database, _name)))
+for _name in ("rows_where", "pks_and_rows_where", "count_where", "paginate", "iter_pages"):
+    setattr(dbQueryable, _name, pooled_reader(getattr(dbQueryable, _name)))
+setattr(dbTable, "search", pooled_reader(dbTable.search))
+for _name in ("create", "insert_all", "upsert_all", "update", "transform", "extract", "convert", "delete", "delete_where",
+              "add_column", "add_foreign_key", "create_index", "enable_fts", "lookup", "drop"):
+    setattr(dbTable, _name, pooled_writer(getattr(dbTable, _name)))
+setattr(dbView, "drop", pooled_writer(dbView.drop))
+for _name in ("insert_all", "update", "delete", "delete_where", "drop"):
+    setattr(EditableView, _name, pooled_writer(getattr(EditableView, _name)))
+
+__all__ = ["Table", "Database", "View", "EditableView", "PoolTimeout", "Page", "InvalidPageToken", "IngestStats"]
 
 
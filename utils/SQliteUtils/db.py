@@ -610,10 +610,11 @@ class Database:
         try:
             table_name = "t{}".format(secrets.token_hex(16))
             with self.conn:
-                self.conn.execute(
+                # through self.execute, so DDL also reaches subclass hooks (e.g. schema cache invalidation)
+                self.execute(
                     "create table {} (name text) strict".format(table_name)
                 )
-                self.conn.execute("drop table {}".format(table_name))
+                self.execute("drop table {}".format(table_name))
             return True
         except Exception:
             return False
@@ -2179,7 +2180,7 @@ class Table(Queryable):
             )
         )
         with self.db.conn:
-            self.db.conn.executescript(sql)
+            self.db.executescript(sql)
         self.db.use_counts_table = True
 
     @property
@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+'''
+Streaming, parallel file ingestion. A CSV / TSV / NDJSON file is cut into byte ranges that end on record boundaries,
+the ranges are parsed in a process pool and the rows come back in file order to a single writer (Table.insert_all).
+At most ``max_pending`` ranges are in flight, so memory stays bounded whatever the file size.
+JSON arrays can't be cut, they are parsed incrementally in the calling process instead of being json.load()ed whole.
+'''
+
+import codecs
+import csv
+import functools
+import io
+import json
+import os
+import re
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, Generator, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+from .typeinfer import TypeTracker
+from .utils import Format, RowsFromFileBadJSON, ValueTracker, _extra_key_strategy, maximize_csv_field_size_limit
+from .utils import rows_from_file as _origin_rows_from_file
+
+DEFAULT_PART_SIZE = 32 * 1024 * 1024
+'''bytes per range handed to a worker'''
+DETECT_SIZE = 64 * 1024
+'''bytes read to detect the format'''
+READ_SIZE = 1024 * 1024
+
+IngestStats = namedtuple("IngestStats", ("rows", "bytes", "seconds", "format", "types"))
+IngestStats.__doc__ = """
+Returned by Table.ingest().
+
+- ``rows``: rows inserted
+- ``bytes``: size of the file
+- ``seconds``: wall time of the whole load
+- ``format``: the utils.Format used
+- ``types``: {column: type} applied by detect_types, ``None`` if types were not detected
+"""
+
+_whitespace_re = re.compile(r"[ \t\n\r]*")
+
+
+def _looks_like_ndjson(head: bytes, complete: bool) -> bool:
+    lines = head.split(b"\n")
+    if not complete:
+        lines = lines[:-1]
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        return False
+    try:
+        return all(isinstance(json.loads(line), dict) for line in lines)
+    except ValueError:
+        return False
+
+
+def detect_format(head: bytes, encoding: Optional[str] = None, complete: bool = False) -> Tuple[Format, Optional[Type[csv.Dialect]]]:
+    '''
+    (format, sniffed csv dialect) of a file from its first bytes. A "{" file whose complete lines are each one JSON object
+    is newline-delimited JSON (Format.NL), other "[" / "{" files are JSON.
+
+    :param complete: ``head`` is the whole file, so its last line is complete too
+    '''
+    stripped = head.lstrip(codecs.BOM_UTF8).strip()
+    if stripped.startswith(b"["):
+        return Format.JSON, None
+    if stripped.startswith(b"{"):
+        return (Format.NL if _looks_like_ndjson(stripped, complete) else Format.JSON), None
+    dialect = csv.Sniffer().sniff(head[:2048].strip().decode(encoding or "utf-8-sig", "ignore"))
+    return (Format.TSV if dialect.delimiter == "\t" else Format.CSV), dialect
+
+
+def iter_json(fp: BinaryIO, read_size: int = READ_SIZE) -> Generator[Any, None, None]:
+    '''
+    Items of a JSON array (or the one JSON object) in a binary file, decoded ``read_size`` bytes at a time, so only the
+    current item is held in memory.
+    '''
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer, pos, eof = "", 0, False
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        data = fp.read(read_size)
+        eof = not data
+        buffer = buffer[pos:] + text_decoder.decode(data, final=eof)
+        pos = 0
+
+    def next_char() -> str:
+        nonlocal pos
+        while True:
+            pos = _whitespace_re.match(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                return buffer[pos:pos + 1]
+            read_more()
+
+    def next_value():
+        nonlocal pos
+        next_char()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise RowsFromFileBadJSON("Invalid JSON: {}".format(e)) from e
+                read_more()
+                continue
+            if end == len(buffer) and not eof:
+                read_more()  # a number at the end of the buffer may go on in the next read
+                continue
+            pos = end
+            return value
+
+    first = next_char()
+    if first == "{":
+        yield next_value()
+    elif first == "[":
+        pos += 1
+        if next_char() == "]":
+            pos += 1
+        else:
+            while True:
+                yield next_value()
+                char = next_char()
+                pos += 1
+                if char == "]":
+                    break
+                if char != ",":
+                    raise RowsFromFileBadJSON("Expected ',' or ']' in JSON array, got {!r}".format(char))
+    else:
+        raise RowsFromFileBadJSON("JSON must be a list or a dictionary")
+    if next_char():
+        raise RowsFromFileBadJSON("Extra data after JSON document")
+
+
+def rows_from_file(fp: BinaryIO, format: Optional[Format] = None, dialect: Optional[Type[csv.Dialect]] = None,
+                   encoding: Optional[str] = None, ignore_extras: Optional[bool] = False,
+                   extras_key: Optional[str] = None) -> Tuple[Iterable[dict], Format]:
+    '''
+    Same as utils.rows_from_file, plus: newline-delimited JSON is detected, and JSON is parsed incrementally with
+    iter_json() instead of json.load().
+    '''
+    if ignore_extras and extras_key:
+        raise ValueError("Cannot use ignore_extras= and extras_key= together")
+    if format == Format.JSON:
+        return iter_json(fp), Format.JSON
+    if format is not None:
+        return _origin_rows_from_file(fp, format, dialect, encoding, ignore_extras, extras_key)
+    buffered = io.BufferedReader(fp, buffer_size=DETECT_SIZE)
+    head = buffered.peek(DETECT_SIZE)
+    format, sniffed = detect_format(head, encoding, complete=len(head) < DETECT_SIZE)
+    if format in (Format.JSON, Format.NL):
+        return rows_from_file(buffered, format)
+    rows, _ = _origin_rows_from_file(buffered, Format.CSV, dialect or sniffed, encoding, ignore_extras, extras_key)
+    return rows, format
+
+
+def _dialect_params(dialect: Union[str, Type[csv.Dialect]]) -> Dict[str, Any]:
+    '''picklable csv.reader() keyword arguments of a dialect. Sniffed dialects are local classes that can't be pickled.'''
+    dialect = csv.reader(io.StringIO(), dialect).dialect
+    return {name: getattr(dialect, name) for name in ("delimiter", "quotechar", "escapechar", "doublequote",
+                                                      "skipinitialspace", "lineterminator", "quoting", "strict")}
+
+
+def _ascii_compatible(encoding: str) -> bool:
+    '''newlines and quotes can be found by byte search'''
+    try:
+        return b'\n"\t,'.decode(encoding) == '\n"\t,'
+    except (UnicodeDecodeError, LookupError):
+        return False
+
+
+def _boundary(f: BinaryIO, start: int, target: int, quote: Optional[bytes]) -> int:
+    '''
+    Offset just after the first newline at or after ``target`` that is outside quotes, or the end of the file.
+    ``start`` must be a record boundary: quotes are counted from there.
+    '''
+    if quote is None:
+        f.seek(target)
+        f.readline()
+        return f.tell()
+    f.seek(start)
+    pos, inside = start, 0
+    while True:
+        block = f.read(READ_SIZE)
+        if not block:
+            return pos
+        i = 0
+        if pos < target:
+            i = min(len(block), target - pos)
+            inside ^= block.count(quote, 0, i) & 1
+        while True:
+            newline = block.find(b"\n", i)
+            if newline < 0:
+                inside ^= block.count(quote, i) & 1
+                break
+            inside ^= block.count(quote, i, newline) & 1
+            if not inside:
+                return pos + newline + 1
+            i = newline + 1
+        pos += len(block)
+
+
+def split_ranges(path: Union[str, os.PathLike], start: int = 0, part_size: int = DEFAULT_PART_SIZE,
+                 quote: Optional[bytes] = None) -> Generator[Tuple[int, int], None, None]:
+    '''
+    Byte ranges [start, end) of about ``part_size`` bytes, each ending after a newline. With ``quote``, newlines inside
+    quoted fields (odd number of quotes since the range start) are skipped, which needs one sequential pass of
+    bytes.count(); without it the file is only seeked.
+    '''
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        while start < size:
+            end = size if start + part_size >= size else _boundary(f, start, start + part_size, quote)
+            yield start, end
+            start = end
+
+
+def _parse_part(path, format: Format, params: Optional[Dict[str, Any]], header: Optional[List[str]], encoding: str,
+                ignore_extras: bool, extras_key: Optional[str], detect_types: bool,
+                span: Tuple[int, int]) -> Tuple[List[dict], Optional[Dict[str, Tuple[str, ...]]]]:
+    '''worker: rows of one byte range, and the types each column could still be'''
+    start, end = span
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    if format == Format.NL:
+        rows = [json.loads(line) for line in data.split(b"\n") if line.strip()]
+    else:
+        maximize_csv_field_size_limit()
+        reader = csv.DictReader(io.TextIOWrapper(io.BytesIO(data), encoding=encoding), fieldnames=header, **params)
+        rows = list(_extra_key_strategy(reader, ignore_extras, extras_key))
+    if not detect_types:
+        return rows, None
+    tracker = TypeTracker()
+    tracker.evaluate_rows(rows)
+    return rows, {key: tuple(value.couldbe) for key, value in tracker.trackers.items()}
+
+
+def _merge_types(tracker: TypeTracker, types: Dict[str, Tuple[str, ...]]):
+    '''a column can only be what every range says it can be'''
+    for key, names in types.items():
+        value = tracker.trackers.get(key)
+        if value is None:
+            value = tracker.trackers[key] = ValueTracker()
+        for name in list(value.couldbe):
+            if name not in names:
+                del value.couldbe[name]
+
+
+def _ordered_map(func: Callable, items: Iterator, workers: Optional[int], max_pending: Optional[int]) -> Generator:
+    '''func(item) for each item, in order, with at most max_pending calls submitted and not yet consumed'''
+    if workers == 0:
+        yield from map(func, items)
+        return
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    pending = deque()
+    with ProcessPoolExecutor(workers) as executor:
+        try:
+            for item in items:
+                pending.append(executor.submit(func, item))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def iter_file_rows(path: Union[str, os.PathLike], format: Optional[Format] = None, dialect: Optional[Type[csv.Dialect]] = None,
+                   encoding: Optional[str] = None, ignore_extras: Optional[bool] = False, extras_key: Optional[str] = None,
+                   workers: Optional[int] = None, part_size: int = DEFAULT_PART_SIZE, max_pending: Optional[int] = None,
+                   tracker: Optional[TypeTracker] = None) -> Generator[dict, None, None]:
+    '''
+    Rows of a CSV / TSV / JSON / NDJSON file, in file order. CSV / TSV / NDJSON are split by split_ranges() and parsed
+    by ``workers`` processes (default: cpu count, 0: in this process). JSON arrays go through iter_json().
+    Encodings that are not ASCII compatible (utf-16...) and CSV with an escapechar can't be split and are read by
+    rows_from_file() instead.
+
+    :param tracker: a TypeTracker that gets the column types of all rows, checked in the workers
+    '''
+    if ignore_extras and extras_key:
+        raise ValueError("Cannot use ignore_extras= and extras_key= together")
+    encoding = encoding or "utf-8-sig"
+    if format is None:
+        with open(path, "rb") as f:
+            head = f.read(DETECT_SIZE)
+        format, sniffed = detect_format(head, encoding, complete=len(head) < DETECT_SIZE)
+        dialect = dialect or sniffed
+    params, quote = None, None
+    if format in (Format.CSV, Format.TSV):
+        params = _dialect_params(dialect or (csv.excel_tab if format == Format.TSV else csv.excel))
+        if params["quoting"] != csv.QUOTE_NONE and params["quotechar"]:
+            quote = params["quotechar"].encode("ascii")
+    splittable = format != Format.JSON and _ascii_compatible(encoding) and (params is None or params["escapechar"] is None)
+    if not splittable:
+        with open(path, "rb") as f:
+            rows, _ = rows_from_file(f, format, dialect, encoding, ignore_extras, extras_key)
+            yield from (rows if tracker is None else tracker.wrap(rows))
+        return
+
+    header, start = None, 0
+    if params is not None:
+        with open(path, "rb") as f:
+            start = _boundary(f, 0, 0, quote)
+            f.seek(0)
+            first = f.read(start)
+        header = next(csv.reader(io.TextIOWrapper(io.BytesIO(first), encoding=encoding), **params), None)
+        if header is None:
+            return
+    parse = functools.partial(_parse_part, os.fspath(path), format, params, header, encoding, bool(ignore_extras),
+                              extras_key, tracker is not None)
+    for rows, types in _ordered_map(parse, split_ranges(path, start, part_size, quote), workers, max_pending):
+        if tracker is not None:
+            _merge_types(tracker, types)
+        yield from rows
+
+
+def ingest_file(self, path: Union[str, os.PathLike], format: Optional[Format] = None, dialect: Optional[Type[csv.Dialect]] = None,
+                encoding: Optional[str] = None, ignore_extras: Optional[bool] = False, extras_key: Optional[str] = None,
+                detect_types: Optional[bool] = None, workers: Optional[int] = None, part_size: int = DEFAULT_PART_SIZE,
+                max_pending: Optional[int] = None, engine: str = "executemany", **kwargs) -> IngestStats:
+    '''Table.ingest(), see the Table stub in beforeInit'''
+    started = time.perf_counter()
+    if format is None:
+        with open(path, "rb") as f:
+            head = f.read(DETECT_SIZE)
+        format, sniffed = detect_format(head, encoding, complete=len(head) < DETECT_SIZE)
+        dialect = dialect or sniffed
+    if detect_types is None:
+        detect_types = format in (Format.CSV, Format.TSV)
+    tracker = TypeTracker() if detect_types else None
+    created = not self.exists()
+    count = [0]
+
+    def counted(rows):
+        for count[0], row in enumerate(rows, 1):
+            yield row
+
+    rows = iter_file_rows(path, format, dialect, encoding, ignore_extras, extras_key, workers, part_size, max_pending, tracker)
+    self.insert_all(counted(rows), engine=engine, **kwargs)
+    types = None
+    if tracker is not None:
+        types = tracker.types
+        if created and self.exists():
+            self.transform(types=types)
+    return IngestStats(count[0], os.path.getsize(path), time.perf_counter() - started, format, types)
+
+
+__all__ = ["IngestStats", "DEFAULT_PART_SIZE", "detect_format", "iter_json", "rows_from_file", "split_ranges",
+           "iter_file_rows", "ingest_file"]
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+''' Keyset (seek) pagination: WHERE (pk) > (last pk) ORDER BY pk LIMIT n, with a resumable token.'''
+
+import base64
+import json
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .utils import sqlite3
+
+SUPPORTS_ROW_VALUES = sqlite3.sqlite_version_info >= (3, 15, 0)
+'''(a, b) > (?, ?) needs SQLite 3.15+, older builds get the expanded OR form'''
+
+Page = namedtuple("Page", ("rows", "next_token"))
+Page.__doc__ = """
+One page from Queryable.paginate() / iter_pages().
+
+- ``rows``: the rows in the requested row_format (one {column: values} dict for "columns" / "numpy")
+- ``next_token``: pass as ``after=`` to get the next page, ``None`` on the last page
+"""
+
+
+class InvalidPageToken(ValueError):
+    "The page token is malformed or was made for other keys / direction"
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, bytes):
+        return {"$b": base64.b64encode(value).decode("ascii")}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return base64.b64decode(value["$b"])
+    return value
+
+
+def encode_token(keys: Sequence[str], values: Sequence[Any], descending: bool = False) -> str:
+    '''Opaque, url-safe token holding the last key values of a page.'''
+    data = {"k": list(keys), "v": [_encode_value(v) for v in values], "d": descending}
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def decode_token(token: str, keys: Sequence[str], descending: bool = False) -> Tuple[Any, ...]:
+    '''Key values stored in ``token``. Raises InvalidPageToken if it doesn't belong to this key order.'''
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        values = tuple(_decode_value(v) for v in data["v"])
+        token_keys, token_descending = data["k"], data["d"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidPageToken("Malformed page token") from e
+    if token_keys != list(keys) or token_descending != descending or len(values) != len(keys):
+        raise InvalidPageToken("Page token was made for keys {} (descending={}), not {} (descending={})".format(
+            token_keys, token_descending, list(keys), descending))
+    return values
+
+
+@lru_cache(maxsize=256)
+def keyset_sql(name: str, keys: Tuple[str, ...], select: str, where: Optional[str], has_after: bool, descending: bool,
+               named: bool) -> Tuple[str, Tuple[int, ...]]:
+    '''
+    SQL of one page and the order in which the last key values must be bound. The key columns are selected first so
+    that the next token can be taken from the last row. ``named`` uses :_after_N placeholders, for dict where_args.
+    '''
+    quoted = ["[{}]".format(k) for k in keys]
+    placeholder = (lambda i: ":_after_{}".format(i)) if named else (lambda i: "?")
+    op = "<" if descending else ">"
+    conditions = []
+    if where is not None:
+        conditions.append("({})".format(where))
+    order = ()
+    if has_after:
+        if len(keys) == 1:
+            conditions.append("{} {} {}".format(quoted[0], op, placeholder(0)))
+            order = (0,)
+        elif SUPPORTS_ROW_VALUES:
+            conditions.append("({}) {} ({})".format(", ".join(quoted), op, ", ".join(placeholder(i) for i in range(len(keys)))))
+            order = tuple(range(len(keys)))
+        else:
+            # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y)
+            ors, order_list = [], []
+            for i in range(len(keys)):
+                terms = []
+                for j in range(i):
+                    terms.append("{} = {}".format(quoted[j], placeholder(j)))
+                    order_list.append(j)
+                terms.append("{} {} {}".format(quoted[i], op, placeholder(i)))
+                order_list.append(i)
+                ors.append("({})".format(" AND ".join(terms)))
+            conditions.append("({})".format(" OR ".join(ors)))
+            order = tuple(order_list)
+    sql = "select {}, {} from [{}]".format(", ".join(quoted), select, name)
+    if conditions:
+        sql += " where " + " and ".join(conditions)
+    sql += " order by " + ", ".join(q + (" desc" if descending else "") for q in quoted)
+    sql += " limit {}".format(":_page_limit" if named else "?")
+    return sql, order
+
+
+def keyset_params(where_args, after: Optional[Tuple[Any, ...]], order: Tuple[int, ...], limit: int):
+    '''Bind where_args, the last key values and the limit in the order keyset_sql() expects.'''
+    if isinstance(where_args, dict):
+        params = dict(where_args)
+        if after is not None:
+            for i in set(order):
+                params["_after_{}".format(i)] = after[i]
+        params["_page_limit"] = limit
+        return params
+    params: List[Any] = list(where_args or [])
+    if after is not None:
+        params.extend(after[i] for i in order)
+    params.append(limit)
+    return params
+
+
+__all__ = ["Page", "InvalidPageToken", "SUPPORTS_ROW_VALUES", "encode_token", "decode_token", "keyset_sql", "keyset_params"]
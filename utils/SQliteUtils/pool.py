@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+''' Thread-safe connection pool used by the pooled mode of Database: N read-only WAL readers + one writer behind a lock.'''
+
+import contextlib
+import functools
+import inspect
+import pathlib
+import queue
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .utils import sqlite3
+
+
+class PoolTimeout(Exception):
+    "Timed out while waiting for a pooled connection"
+    pass
+
+
+class ConnectionPool:
+    """
+    Hold one writer connection (guarded by a re-entrant lock) and ``size`` read-only reader connections.
+
+    The connection used by the current thread is kept in a thread-local stack, so code that only knows
+    about ``db.conn`` / ``db.execute`` is routed to whichever connection the thread has checked out.
+    Threads that have not checked out anything use the writer.
+
+    :param writer: the writer connection, opened with ``check_same_thread=False``
+    :param path: path of the database file, used to open the readers
+    :param size: number of reader connections
+    :param timeout: seconds to wait for a connection before raising ``PoolTimeout``, ``None`` to wait forever
+    :param on_wait: called with ``(role, seconds)`` every time a connection is handed out
+    :param on_rollback: called after ``writer()`` rolled back a transaction
+    """
+
+    def __init__(
+        self,
+        writer: sqlite3.Connection,
+        path: str,
+        size: int,
+        timeout: Optional[float] = None,
+        on_wait: Optional[Callable[[str, float], None]] = None,
+        on_rollback: Optional[Callable[[], None]] = None,
+    ):
+        assert size >= 1, "pool size must be at least 1"
+        self.writer_conn = writer
+        self.timeout = timeout
+        self.on_wait = on_wait
+        self.on_rollback = on_rollback
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._stats = {
+            role: {"checkouts": 0, "wait_total": 0.0, "wait_max": 0.0}
+            for role in ("reader", "writer")
+        }
+        self._stats_lock = threading.Lock()
+        uri = "{}?mode=ro".format(pathlib.Path(path).resolve().as_uri())
+        self.readers: List[sqlite3.Connection] = [
+            sqlite3.connect(uri, uri=True, check_same_thread=False) for _ in range(size)
+        ]
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for conn in self.readers:
+            self._idle.put(conn)
+
+    @property
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self) -> sqlite3.Connection:
+        "The connection the current thread is using - the writer if nothing was checked out."
+        stack = self._stack
+        return stack[-1] if stack else self.writer_conn
+
+    def in_use(self) -> bool:
+        "Has the current thread checked out any connection?"
+        return bool(self._stack)
+
+    def in_writer(self) -> bool:
+        "Is the current thread inside ``writer()``?"
+        return self.writer_conn in self._stack
+
+    def _record(self, role: str, waited: float):
+        with self._stats_lock:
+            stats = self._stats[role]
+            stats["checkouts"] += 1
+            stats["wait_total"] += waited
+            stats["wait_max"] = max(stats["wait_max"], waited)
+        if self.on_wait is not None:
+            self.on_wait(role, waited)
+
+    @contextlib.contextmanager
+    def using(self, conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+        "Make ``conn`` the current connection of this thread within the block."
+        stack = self._stack
+        stack.append(conn)
+        try:
+            yield conn
+        finally:
+            stack.pop()
+
+    @contextlib.contextmanager
+    def checkout_reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a reader for the block without making it current. Inside ``writer()`` the writer is
+        returned instead, so uncommitted changes stay visible; a thread that is already reading
+        keeps its reader.
+        """
+        if self.in_use():
+            yield self.current()
+            return
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout("No reader connection available after {}s".format(self.timeout))
+        self._record("reader", time.perf_counter() - start)
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @contextlib.contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        "Borrow a reader and make it current for the block."
+        with self.checkout_reader() as conn:
+            with self.using(conn):
+                yield conn
+
+    @contextlib.contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """
+        Hold the write lock and make the writer current for the block. The outermost block commits
+        any transaction left open when it exits (or rolls back if it raised).
+        """
+        if self.in_writer():
+            with self.using(self.writer_conn):
+                yield self.writer_conn
+            return
+        start = time.perf_counter()
+        if not self._write_lock.acquire(timeout=-1 if self.timeout is None else self.timeout):
+            raise PoolTimeout("Writer connection not available after {}s".format(self.timeout))
+        try:
+            self._record("writer", time.perf_counter() - start)
+            with self.using(self.writer_conn):
+                try:
+                    yield self.writer_conn
+                except BaseException:
+                    if self.writer_conn.in_transaction:
+                        self.writer_conn.rollback()
+                        if self.on_rollback is not None:
+                            self.on_rollback()
+                    raise
+                if self.writer_conn.in_transaction:
+                    self.writer_conn.commit()
+        finally:
+            self._write_lock.release()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        "``{role: {checkouts, wait_total, wait_max}}`` for ``reader`` and ``writer``."
+        with self._stats_lock:
+            return {role: dict(stats) for role, stats in self._stats.items()}
+
+    def close(self):
+        "Close every reader connection. The writer is closed by the owning Database."
+        for conn in self.readers:
+            conn.close()
+
+
+_READ_RE = re.compile(r"\s*(SELECT|VALUES|WITH)\b", re.IGNORECASE)
+_WRITE_WORD_RE = re.compile(r"\b(INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+
+def is_read_only(sql: str) -> bool:
+    "Conservatively: is ``sql`` a plain query that a read-only reader connection can run?"
+    if _READ_RE.match(sql) is None:
+        return False
+    return not sql.lstrip()[:4].upper() == "WITH" or _WRITE_WORD_RE.search(sql) is None
+
+
+class BufferedCursor:
+    """
+    The result of a cursor fetched up front, so it can still be read after its pooled connection
+    went back to the pool (and may be in use by another thread).
+    """
+
+    __slots__ = ("description", "lastrowid", "rowcount", "arraysize", "_rows", "_position")
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._rows = cursor.fetchall()
+        self._position = 0
+        self.description = cursor.description
+        self.lastrowid = cursor.lastrowid
+        self.rowcount = cursor.rowcount
+        self.arraysize = cursor.arraysize
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        self._position += 1
+        return self._rows[self._position - 1]
+
+    def fetchmany(self, size: Optional[int] = None) -> list:
+        start = self._position
+        self._position = min(len(self._rows), start + (self.arraysize if size is None else size))
+        return self._rows[start:self._position]
+
+    def fetchall(self) -> list:
+        return self.fetchmany(len(self._rows))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._position >= len(self._rows):
+            raise StopIteration
+        self._position += 1
+        return self._rows[self._position - 1]
+
+    def close(self):
+        self._rows, self._position = [], 0
+
+
+def pooled_reader(method):
+    """
+    Wrap a method so that in pooled mode it runs on a reader. For generator methods (``query``,
+    ``rows_where``, ``search`` ...) the reader is borrowed for the generator's lifetime but only made
+    current around each step, so the caller can freely use other connections between rows.
+    """
+    is_generator = inspect.isgeneratorfunction(method)
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        pool = getattr(getattr(self, "db", self), "_pool", None)
+        if pool is None or pool.in_use():
+            return method(self, *args, **kwargs)
+        if is_generator:
+            return _iter_on_reader(pool, method(self, *args, **kwargs))
+        with pool.reader():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _iter_on_reader(pool: ConnectionPool, gen):
+    with pool.checkout_reader() as conn:
+        while True:
+            with pool.using(conn):
+                try:
+                    item = next(gen)
+                except StopIteration:
+                    return
+            yield item
+
+
+def pooled_writer(method):
+    "Wrap a method so that in pooled mode it runs inside ``writer()``."
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        pool = getattr(getattr(self, "db", self), "_pool", None)
+        if pool is None or pool.in_writer():
+            return method(self, *args, **kwargs)
+        with pool.writer():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+__all__ = ["ConnectionPool", "PoolTimeout", "BufferedCursor", "is_read_only", "pooled_reader", "pooled_writer"]
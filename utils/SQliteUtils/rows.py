@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+''' Row formats for Database.query / Queryable.rows_where: dicts (default), tuples, __slots__ records or columnar chunks.'''
+
+import keyword
+import re
+from functools import lru_cache
+from typing import Any, Dict, Generator, List, Literal, Tuple
+
+RowFormat = Literal["dict", "tuple", "record", "columns", "numpy"]
+ROW_FORMATS = ("dict", "tuple", "record", "columns", "numpy")
+DEFAULT_CHUNK_SIZE = 4096
+'''rows per chunk of the "columns" / "numpy" formats'''
+
+_non_identifier_re = re.compile(r"\W")
+
+
+class Record:
+    '''
+    Base of the record classes made by record_class(). Fields are stored in __slots__, so a record is about as small
+    as a tuple but fields can be read by attribute, by index or by column name.
+    '''
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _columns: Tuple[str, ...] = ()
+
+    def __iter__(self):
+        for field in self._fields:
+            yield getattr(self, field)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            return getattr(self, self._fields[self._columns.index(item)])
+        if isinstance(item, slice):
+            return tuple(self)[item]
+        return getattr(self, self._fields[item])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Record):
+            return self._columns == other._columns and tuple(self) == tuple(other)
+        if isinstance(other, tuple):
+            return tuple(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        return "{}({})".format(type(self).__name__, ", ".join("{}={!r}".format(f, v) for f, v in zip(self._fields, self)))
+
+    def _asdict(self) -> Dict[str, Any]:
+        '''the same dict the "dict" format would give'''
+        return dict(zip(self._columns, self))
+
+
+def _field_names(columns: Tuple[str, ...]) -> Tuple[str, ...]:
+    fields = []
+    for i, column in enumerate(columns):
+        field = _non_identifier_re.sub("_", column)
+        if not field or field[0].isdigit() or keyword.iskeyword(field) or field.startswith("_") or field in fields:
+            field = "f{}_{}".format(i, field.lstrip("_"))
+        fields.append(field)
+    return tuple(fields)
+
+
+@lru_cache(maxsize=256)
+def record_class(columns: Tuple[str, ...]) -> type:
+    '''
+    The Record subclass for one result shape. Cached per column tuple, so every query with the same columns shares
+    one class. Column names that aren't identifiers get a "f<index>_" field name; item access by column name still works.
+    '''
+    fields = _field_names(columns)
+    args = ", ".join(fields)
+    body = "".join("\n    self.{0} = {0}".format(f) for f in fields) or "\n    pass"
+    namespace: Dict[str, Any] = {}
+    exec("def __init__(self, {}):{}".format(args, body), namespace)
+    return type("Record", (Record,), {
+        "__slots__": fields,
+        "_fields": fields,
+        "_columns": columns,
+        "__init__": namespace["__init__"],
+    })
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('row_format="numpy" needs numpy, install it or use row_format="columns"')
+    return numpy
+
+
+def format_rows(cursor, row_format: RowFormat = "dict", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Generator[Any, None, None]:
+    '''
+    Turn the rows of an executed cursor into the wanted format:
+        - "dict": {column: value} per row
+        - "tuple": the plain sqlite3 row tuples, no extra objects at all
+        - "record": a __slots__ Record per row, see record_class()
+        - "columns": {column: [values]} per chunk of chunk_size rows
+        - "numpy": {column: numpy.ndarray} per chunk of chunk_size rows
+    '''
+    if row_format not in ROW_FORMATS:
+        raise ValueError("Unknown row_format: {}. Choose from {}".format(row_format, ROW_FORMATS))
+    columns = tuple(d[0] for d in cursor.description)
+    if row_format == "dict":
+        for row in cursor:
+            yield dict(zip(columns, row))
+    elif row_format == "tuple":
+        yield from cursor
+    elif row_format == "record":
+        cls = record_class(columns)
+        for row in cursor:
+            yield cls(*row)
+    else:
+        convert = _numpy().array if row_format == "numpy" else list
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                return
+            yield dict(zip(columns, (convert(values) for values in zip(*chunk))))
+
+
+def format_fetched(columns: Tuple[str, ...], rows: List[tuple], row_format: RowFormat = "dict") -> Any:
+    '''
+    Format rows that were already fetched. Row formats give a list, "columns"/"numpy" give one {column: values} dict.
+    '''
+    if row_format == "dict":
+        return [dict(zip(columns, row)) for row in rows]
+    if row_format == "tuple":
+        return rows
+    if row_format == "record":
+        cls = record_class(columns)
+        return [cls(*row) for row in rows]
+    if row_format in ("columns", "numpy"):
+        convert = _numpy().array if row_format == "numpy" else list
+        values = zip(*rows) if rows else ([] for _ in columns)
+        return dict(zip(columns, (convert(v) for v in values)))
+    raise ValueError("Unknown row_format: {}. Choose from {}".format(row_format, ROW_FORMATS))
+
+
+__all__ = ["RowFormat", "ROW_FORMATS", "DEFAULT_CHUNK_SIZE", "Record", "record_class", "format_rows", "format_fetched"]
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+''' Per-Database cache of schema lookups (sqlite_master, PRAGMA table_info), keyed on PRAGMA schema_version.'''
+
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable
+
+_DDL_RE = re.compile(r"\s*(CREATE|ALTER|DROP)\b", re.IGNORECASE)
+
+
+def is_ddl(sql: str) -> bool:
+    "Does ``sql`` start with CREATE / ALTER / DROP?"
+    return _DDL_RE.match(sql) is not None
+
+
+class SchemaCache:
+    """
+    Cache results of schema lookups until the schema changes.
+
+    Every lookup first reads ``PRAGMA schema_version`` (a single integer from the database header), which sqlite
+    bumps on any schema change from any connection, so by default nothing stale is ever returned. That check is much
+    cheaper than the lookups it replaces (sqlite_master scans, PRAGMA table_info), but still a round-trip: opt in to
+    ``check_interval`` > 0 to only re-read the version when the last check is older than that many seconds. DDL sent
+    through the owning Database still clears the cache at once, so then only changes from other connections are seen late.
+
+    Entries are kept per schema version. In pooled mode a reader may still see the version before the writer's
+    uncommitted DDL, so the latest two versions are kept. Nothing is stored or trusted while the connection is inside a
+    transaction: its schema may still be rolled back.
+    """
+
+    def __init__(self, check_interval: float = 0.0):
+        self.check_interval = check_interval
+        self._versions: Dict[int, Dict[Hashable, Any]] = {}
+        self._latest = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "version_checks": 0, "invalidations": 0}
+
+    def invalidate(self):
+        "Drop every cached entry."
+        with self._lock:
+            self._versions.clear()
+            self._latest = None
+            self._stats["invalidations"] += 1
+
+    def _version(self, db, in_transaction: bool) -> int:
+        now = time.monotonic()
+        latest = self._latest
+        if latest is not None and not in_transaction and self.check_interval > 0 and now - self._checked_at < self.check_interval:
+            return latest
+        version = db.execute("PRAGMA schema_version").fetchone()[0]
+        with self._lock:
+            self._stats["version_checks"] += 1
+            if in_transaction:
+                return version
+            if version not in self._versions:
+                self._versions[version] = {}
+                for old in sorted(self._versions)[:-2]:
+                    del self._versions[old]
+            self._latest = version
+            self._checked_at = now
+        return version
+
+    def get(self, db, key: Hashable, load: Callable[[], Any]) -> Any:
+        "Return the cached value for ``key``, calling ``load()`` to fill it on a miss."
+        in_transaction = db.conn.in_transaction
+        version = self._version(db, in_transaction)
+        entries = None if in_transaction else self._versions.get(version)
+        if entries is not None and key in entries:
+            with self._lock:
+                self._stats["hits"] += 1
+            return entries[key]
+        value = load()
+        with self._lock:
+            self._stats["misses"] += 1
+            entries = self._versions.get(version)
+            if entries is not None:
+                entries[key] = value
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """
+        ``hits``/``misses``/``version_checks``/``invalidations``, plus ``queries_saved`` (schema queries answered from
+        the cache) and ``round_trips_saved`` (the same minus the schema_version checks spent on it).
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queries_saved"] = stats["hits"]
+        stats["round_trips_saved"] = stats["hits"] - stats["version_checks"]
+        return stats
+
+
+__all__ = ["SchemaCache", "is_ddl"]
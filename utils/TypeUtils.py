@@ -1,10 +1,42 @@
 # -*- coding: utf-8 -*-
 '''常用的類型相關函數，例如類型檢查等'''
 
+import os, types, functools, weakref, random, reprlib, inspect
+from time import perf_counter_ns
+from itertools import islice
 from typing import *
 
+CHECKER_CACHE_SIZE = 1024
+'''compile_checker(及其內部的各層檢查節點) / simpleSubClassCheck 各自最多緩存多少個類型(組合)'''
+
+# 第一層緩存以id(類型)為鍵，省去typing泛型(如List[int])每次計算hash的開銷。typing會重用相同的泛型對象，所以大多能命中。
+# 值中保留類型本身: 既用於確認是同一對象，也保證id不會被重用
+_checkers: Dict[int, tuple] = {} #id(type), (type, checker)
+_subClassResults: Dict[Tuple[int, int], tuple] = {} #(id(smallerCls), id(largerCls)), (smallerCls, largerCls, result)
+
+#region subclass check
 def simpleSubClassCheck(smallerCls, largerCls):
-    '''檢查smallerCls是否是largerCls的子類，支持Union、Optional、Sequence、Iterable、Mapping、Callable等類型。'''
+    '''
+    檢查smallerCls是否是largerCls的子類，支持Union、Optional、Sequence、Iterable、Mapping、Callable等類型。
+    結果按(smallerCls, largerCls)緩存；之後才用ABC.register註冊的子類需先調用clear_checker_cache()
+    '''
+    entry = _subClassResults.get((id(smallerCls), id(largerCls)), None)
+    if entry is not None and entry[0] is smallerCls and entry[1] is largerCls:
+        return entry[2]
+    try:
+        result = _cachedSubClassCheck(smallerCls, largerCls)
+    except TypeError:
+        try:
+            hash((smallerCls, largerCls))
+        except TypeError:  # 不可hash的類型不緩存
+            return _simpleSubClassCheck(smallerCls, largerCls)
+        raise
+    if len(_subClassResults) >= CHECKER_CACHE_SIZE:
+        _subClassResults.clear()
+    _subClassResults[(id(smallerCls), id(largerCls))] = (smallerCls, largerCls, result)
+    return result
+
+def _simpleSubClassCheck(smallerCls, largerCls):
     def _checkTypes(smallerTypes, largerTypes):
         if Any in largerTypes:
             return True
@@ -62,46 +94,524 @@ def simpleSubClassCheck(smallerCls, largerCls):
             else:
                 raise Exception('unsupported types--- smaller:', smallerTypeOrigin, ' larger:',largerTypeOrigin)
 
-def simpleTypeCheck(value, targetType):
-    '''檢查value是否是targetType的實例，支持Union、Optional、Sequence、Iterable、Mapping、Callable等類型。'''
-    if get_origin(targetType) is None:
-        return isinstance(value, targetType)
-    else:
-        argTypes = get_args(targetType)
-        origin = get_origin(targetType)
-        if origin == Union or origin == Optional:
-            for argType in argTypes:
-                if simpleTypeCheck(value, argType):
-                    return True
-            return False
-        else:
+_cachedSubClassCheck = functools.lru_cache(maxsize=CHECKER_CACHE_SIZE)(_simpleSubClassCheck)
+#endregion
+
+#region type check
+class TypeCheckError(TypeError):
+    '''
+    類型檢查失敗(compile_checker / simpleTypeCheck的raiseError=True時拋出)。
+    name為被檢查的對象(預設'value'，typechecked中為參數或返回值)，path為從它到出錯位置的路徑片段(如["['a']", "[0]"])，expected為該位置期望的類型，value為該位置的實際值。
+    '''
+    def __init__(self, expected, value, path:Optional[List[str]]=None, name:str='value'):
+        super().__init__()
+        self.expected = expected
+        self.value = value
+        self.path = path if path is not None else []
+        self.name = name
+    def __str__(self):
+        return f"{self.name}{''.join(self.path)}: expected {_typeName(self.expected)}, got {type(self.value).__qualname__} {reprlib.repr(self.value)}"
+
+def _typeName(targetType) -> str:
+    if isinstance(targetType, type) and get_origin(targetType) is None:
+        return targetType.__qualname__
+    return repr(targetType).replace('typing.', '')
+
+class CheckStrategy(NamedTuple):
+    '''
+    容器的檢查策略，作為compile_checker / simpleTypeCheck的strategy參數:
+        - CheckStrategy.full(): 檢查所有元素(預設)
+        - CheckStrategy.sample(k): 每個容器隨機檢查k個元素(Sequence按下標抽取; Mapping / Set需迭代到被抽中的位置)
+        - CheckStrategy.first(k): 每個容器只檢查前k個元素
+        - CheckStrategy.depth(n): 只向內檢查n層容器，更深的容器只檢查容器本身的類型。sample / first也可指定depth
+    固定長度的Tuple(如Tuple[int, str])總是檢查所有位置。
+    '''
+    mode: str = 'full' # full / sample / first
+    k: Optional[int] = None
+    maxDepth: Optional[int] = None
+
+    @classmethod
+    def full(cls, depth:Optional[int]=None) -> 'CheckStrategy':
+        return cls('full', None, _checkDepth(depth))
+    @classmethod
+    def sample(cls, k:int, depth:Optional[int]=None) -> 'CheckStrategy':
+        return cls('sample', _checkK(k), _checkDepth(depth))
+    @classmethod
+    def first(cls, k:int, depth:Optional[int]=None) -> 'CheckStrategy':
+        return cls('first', _checkK(k), _checkDepth(depth))
+    @classmethod
+    def depth(cls, n:int) -> 'CheckStrategy':
+        return cls('full', None, _checkDepth(n))
+
+def _checkK(k):
+    if type(k) is not int or k < 1:
+        raise ValueError(f"k must be a positive int, got {k!r}")
+    return k
+def _checkDepth(depth):
+    if depth is not None and (type(depth) is not int or depth < 0):
+        raise ValueError(f"depth must be a non-negative int or None, got {depth!r}")
+    return depth
+
+_FULL = CheckStrategy()
+
+def _strategy(strategy) -> CheckStrategy:
+    if strategy is None or strategy == 'full':
+        return _FULL
+    if not isinstance(strategy, CheckStrategy) or strategy.mode not in ('full', 'sample', 'first'):
+        raise ValueError(f"invalid check strategy: {strategy!r}")
+    return strategy
+
+def compile_checker(targetType, strategy:Optional[CheckStrategy]=None, raiseError:bool=False) -> Callable[[Any], bool]:
+    '''
+    把targetType編譯成檢查函數checker(value) -> bool，結果與simpleTypeCheck(value, targetType, strategy)相同。
+    get_origin / get_args只在編譯時運行一次，編譯結果按(類型, strategy, raiseError)緩存(最多CHECKER_CACHE_SIZE個)。
+    需要反覆檢查同一類型時(如每條消息)，先取得checker再調用最快。
+    :param strategy: 容器的檢查策略，見CheckStrategy。None即檢查所有元素
+    :param raiseError: 為True時checker在不符合時拋出TypeCheckError(指出出錯的位置)，而不是返回False
+    '''
+    if strategy is None and not raiseError:
+        entry = _checkers.get(id(targetType), None)
+        if entry is not None and entry[0] is targetType:
+            return entry[1]
+    strategy = _strategy(strategy)
+    try:
+        checker = _cachedCompile(targetType, strategy, raiseError)
+    except TypeError:
+        try:
+            hash(targetType)
+        except TypeError:
+            return _compile(targetType, strategy, raiseError)
+        raise
+    if strategy is _FULL and not raiseError:
+        if len(_checkers) >= CHECKER_CACHE_SIZE:
+            _checkers.clear()
+        _checkers[id(targetType)] = (targetType, checker)
+    return checker
+
+def clear_checker_cache():
+    '''clear the caches of compile_checker and simpleSubClassCheck'''
+    _checkers.clear()
+    _subClassResults.clear()
+    _cachedCompile.cache_clear()
+    _cachedNode.cache_clear()
+    _cachedSubClassCheck.cache_clear()
+
+def _compile(targetType, strategy:CheckStrategy, raiseError:bool) -> Callable[[Any], bool]:
+    node = _nodeOf(targetType, strategy, strategy.maxDepth)
+    if raiseError:
+        def checkOrRaise(value):
+            error = node(value)
+            if error is not None:
+                raise error
+            return True
+        return checkOrRaise
+    if get_origin(targetType) is None and type(targetType) is type:  # 沒有自定義metaclass: 與isinstance相同，且不經過Python函數
+        return type.__instancecheck__.__get__(targetType)
+    return lambda value: node(value) is None
+
+_cachedCompile = functools.lru_cache(maxsize=CHECKER_CACHE_SIZE)(_compile)
+
+def _nodeOf(targetType, strategy:CheckStrategy, depth:Optional[int]) -> Callable[[Any], Optional[TypeCheckError]]:
+    try:
+        return _cachedNode(targetType, strategy, depth)
+    except TypeError:
+        try:
+            hash(targetType)
+        except TypeError:
+            return _node(targetType, strategy, depth)
+        raise
+
+def _plainChecker(targetType) -> Optional[Callable[[Any], bool]]:
+    '''沒有自定義metaclass的普通類: 返回C實現的isinstance檢查，可用於all(map(...))'''
+    if get_origin(targetType) is None and type(targetType) is type:
+        return type.__instancecheck__.__get__(targetType)
+    return None
+
+def _picked(iterable, positions):
+    '''按升序的positions從iterable中依次取出元素(用於不能按下標訪問的容器)'''
+    iterator, last = iter(iterable), -1
+    for position in positions:
+        yield next(islice(iterator, position - last - 1, None))
+        last = position
+
+def _selector(strategy:CheckStrategy, indexed:bool) -> Callable[[Any], Iterable]:
+    '''
+    按策略選出容器中要檢查的元素。
+    indexed為True時容器須可按下標訪問，產生(下標, 元素)；否則產生元素(Mapping傳入items())。
+    '''
+    k = strategy.k
+    if strategy.mode == 'full':
+        return enumerate if indexed else iter
+    if strategy.mode == 'first':
+        if indexed:
+            return lambda container: enumerate(islice(container, k))
+        return lambda container: islice(container, k)
+    def select(container):
+        n = len(container)
+        if n <= k:
+            return enumerate(container) if indexed else iter(container)
+        positions = sorted(random.sample(range(n), k))
+        if indexed:
+            return ((i, container[i]) for i in positions)
+        return _picked(container, positions)
+    return select
+
+_UNION_TYPES = (Union, types.UnionType) if hasattr(types, 'UnionType') else (Union,) # UnionType: int | None (3.10+)
+
+def _accept(value):
+    '''無法檢查的類型(如未綁定的TypeVar、forward reference字符串)一律視為符合'''
+    return None
+
+def _node(targetType, strategy:CheckStrategy, depth:Optional[int]) -> Callable[[Any], Optional[TypeCheckError]]:
+    '''編譯成檢查節點node(value)，符合時返回None，否則返回TypeCheckError。depth為還可向內檢查的容器層數(None即不限)'''
+    if targetType is Any:
+        return _accept
+    if targetType is None:
+        targetType = type(None)
+    origin = get_origin(targetType)
+    if origin is None:
+        if isinstance(targetType, TypeVar):
+            if targetType.__bound__ is not None:
+                return _nodeOf(targetType.__bound__, strategy, depth)
+            if targetType.__constraints__:
+                return _nodeOf(Union[targetType.__constraints__], strategy, depth)
+            return _accept
+        if hasattr(targetType, '__supertype__'): # NewType
+            return _nodeOf(targetType.__supertype__, strategy, depth)
+        if not isinstance(targetType, type):
+            return _accept
+        check = _plainChecker(targetType) or (lambda value: isinstance(value, targetType))
+        return lambda value: None if check(value) else TypeCheckError(targetType, value)
+    argTypes = get_args(targetType)
+    if origin is Literal:
+        def checkLiteral(value):
+            for literal in argTypes:
+                if value == literal and type(value) is type(literal): # Literal[1] does not accept True
+                    return None
+            return TypeCheckError(targetType, value)
+        return checkLiteral
+    if origin is Annotated or origin is ClassVar or origin is Final:
+        return _nodeOf(argTypes[0], strategy, depth) if argTypes else _accept
+    if origin in _UNION_TYPES:
+        if all(get_origin(argType) is None and isinstance(argType, type) for argType in argTypes):
+            return lambda value: None if isinstance(value, argTypes) else TypeCheckError(targetType, value)
+        nodes = tuple(_nodeOf(argType, strategy, depth) for argType in argTypes)
+        def checkUnion(value):
+            errors = []
+            for node in nodes:
+                error = node(value)
+                if error is None:
+                    return None
+                errors.append(error)
+            inner = [error for error in errors if error.path]
+            if len(inner) == 1: # only one member matched the container type: report where it failed inside
+                return inner[0]
+            return TypeCheckError(targetType, value)
+        return checkUnion
+    if not isinstance(origin, type):
+        return _accept # other special forms
+    if origin is type:
+        return _typeNode(targetType, argTypes[0] if argTypes else Any)
+    if issubclass(origin, Callable) and not issubclass(origin, Collection):
+        return _callableNode(targetType, origin, argTypes)
+    def checkShallow(value):
+        return None if isinstance(value, origin) else TypeCheckError(targetType, value)
+    if not argTypes or depth == 0 or (issubclass(origin, Iterable) and not issubclass(origin, Collection)):
+        return checkShallow # 不檢查元素: 未指定元素類型、已到達最大深度、或迭代器/生成器等迭代會消耗元素的類型
+    innerDepth = None if depth is None else depth - 1
+    if issubclass(origin, tuple) and not (len(argTypes) == 2 and argTypes[1] is Ellipsis):
+        positions = tuple(enumerate(_nodeOf(argType, strategy, innerDepth) for argType in argTypes))
+        length = len(positions)
+        def checkTuple(value):
+            if not isinstance(value, origin) or len(value) != length:
+                return TypeCheckError(targetType, value)
+            for i, node in positions:
+                error = node(value[i])
+                if error is not None:
+                    error.path.insert(0, f'[{i}]')
+                    return error
+            return None
+        return checkTuple
+    if issubclass(origin, Mapping):
+        if len(argTypes) > 2:
+            return checkShallow
+        keyType, valueType = argTypes if len(argTypes) == 2 else (argTypes[0], Any) # e.g. Counter[str]
+        keyNode, valueNode = _nodeOf(keyType, strategy, innerDepth), _nodeOf(valueType, strategy, innerDepth)
+        keyCheck, valueCheck = _plainChecker(keyType), _plainChecker(valueType)
+        select = _selector(strategy, indexed=False)
+        fast = None
+        if strategy.mode != 'sample' and (keyCheck or keyType is Any) and (valueCheck or valueType is Any):
+            fast = select # 元素都是普通類時先用all(map(...))在C中檢查，失敗時才逐個找出出錯的位置
+        def checkMapping(value):
             if not isinstance(value, origin):
-                return False
-            if issubclass(origin, Sequence):
-                for i, argType in enumerate(argTypes):
-                    if not simpleTypeCheck(value[i], argType):
-                        return False
-                return True
-            elif issubclass(origin, Mapping):
-                keyType, valueType = argTypes
-                for key, val in value.items():
-                    if not simpleTypeCheck(key, keyType) or not simpleTypeCheck(val, valueType):
-                        return False
-                return True
-            elif issubclass(origin, Callable):
-                callArgTypes, returnType = *argTypes[:-1], argTypes[-1]
-                valueArgTypes = get_type_hints(value)
-                varNames = value.__code__.co_varnames
-                for varName in varNames:
+                return TypeCheckError(targetType, value)
+            if fast is not None and (keyType is Any or all(map(keyCheck, fast(value.keys())))) and \
+                    (valueType is Any or all(map(valueCheck, fast(value.values())))):
+                return None
+            for key, val in select(value.items()):
+                error = keyNode(key)
+                if error is not None:
+                    error.path.insert(0, f'<key {reprlib.repr(key)}>')
+                    return error
+                error = valueNode(val)
+                if error is not None:
+                    error.path.insert(0, f'[{key!r}]')
+                    return error
+            return None
+        return checkMapping
+    if issubclass(origin, Collection):
+        itemType = argTypes[0]
+        itemNode, itemCheck = _nodeOf(itemType, strategy, innerDepth), _plainChecker(itemType)
+        indexed = issubclass(origin, Sequence)
+        select = _selector(strategy, indexed)
+        fast = _selector(strategy, indexed=False) if strategy.mode != 'sample' and itemCheck is not None else None
+        def checkCollection(value):
+            if not isinstance(value, origin):
+                return TypeCheckError(targetType, value)
+            if fast is not None and all(map(itemCheck, fast(value))):
+                return None
+            for entry in select(value):
+                if indexed:
+                    i, item = entry
+                else:
+                    item = entry
+                error = itemNode(item)
+                if error is not None:
+                    error.path.insert(0, f'[{i}]' if indexed else f'<item {reprlib.repr(item)}>')
+                    return error
+            return None
+        return checkCollection
+    return checkShallow # 其他泛型只檢查origin
+
+def _typeNode(targetType, classType) -> Callable[[Any], Optional[TypeCheckError]]:
+    '''Type[X]: value須是X的子類'''
+    if classType is Any or isinstance(classType, TypeVar):
+        classType = classType.__bound__ if isinstance(classType, TypeVar) and classType.__bound__ is not None else object
+    if get_origin(classType) in _UNION_TYPES:
+        classType = tuple(get_origin(member) or member for member in get_args(classType))
+    else:
+        classType = get_origin(classType) or classType
+    if not isinstance(classType, (type, tuple)):
+        classType = object
+    def checkType(value):
+        if isinstance(value, type) and issubclass(value, classType):
+            return None
+        return TypeCheckError(targetType, value)
+    return checkType
+
+_cachedNode = functools.lru_cache(maxsize=CHECKER_CACHE_SIZE)(_node)
+
+def _callableNode(targetType, origin, argTypes) -> Callable[[Any], Optional[TypeCheckError]]:
+    if not argTypes:
+        argTypes = (Ellipsis, Any)
+    callArgTypes, returnType = argTypes[0], argTypes[-1] # callArgTypes is Ellipsis for Callable[..., R]
+    results = weakref.WeakKeyDictionary() #function, result
+    def checkCallableHints(value):
+        function = getattr(value, '__func__', value)
+        code = getattr(function, '__code__', None)
+        if code is None:  # builtins, classes, callable objects: no hints to compare
+            return True
+        try:
+            valueArgTypes = get_type_hints(function)
+            varNames = code.co_varnames[:code.co_argcount]
+            if hasattr(value, '__self__') and not isinstance(value, types.BuiltinMethodType):
+                varNames = varNames[1:] # bound method: self / cls is not passed by the caller
+            if callArgTypes is not Ellipsis:
+                for i, varName in enumerate(varNames[:len(callArgTypes)]):
                     if varName not in valueArgTypes:
                         continue # ignore unlabeled arguments
-                    if not simpleSubClassCheck(valueArgTypes[varName], callArgTypes[varNames.index(varName)]):
+                    if not simpleSubClassCheck(valueArgTypes[varName], callArgTypes[i]):
                         return False
-                if 'return' in valueArgTypes:
-                    if not simpleSubClassCheck(valueArgTypes['return'], returnType):
-                        return False
-                return True
+            if 'return' in valueArgTypes:
+                if not simpleSubClassCheck(valueArgTypes['return'], returnType):
+                    return False
+        except Exception: # hints that cannot be resolved / compared (forward references, TypeVar...) are not checked
+            return True
+        return True
+    def checkCallable(value):
+        if not isinstance(value, origin):
+            return TypeCheckError(targetType, value)
+        function = getattr(value, '__func__', value) # hints of a bound method are those of its function
+        try:
+            result = results[function]
+        except (KeyError, TypeError):
+            result = checkCallableHints(value)
+            try:
+                results[function] = result
+            except TypeError:  # not weak referenceable
+                pass
+        return None if result else TypeCheckError(targetType, value)
+    return checkCallable
+
+def simpleTypeCheck(value, targetType, strategy:Optional[CheckStrategy]=None, raiseError:bool=False):
+    '''
+    檢查value是否是targetType的實例，支持Union、Optional、Sequence、Tuple、Set、Iterable、Mapping、Callable等類型，可任意嵌套。
+    大容器可用strategy只抽查部分元素或限制深度(見CheckStrategy)；raiseError為True時不符合則拋出TypeCheckError。
+    '''
+    if strategy is None and not raiseError:
+        entry = _checkers.get(id(targetType), None)
+        if entry is not None and entry[0] is targetType:
+            return entry[1](value)
+    return compile_checker(targetType, strategy, raiseError)(value)
+#endregion
+
+#region typechecked
+TYPECHECK_ENV = 'PYPROJECTUTILS_TYPECHECK'
+'''設置此環境變量為0/false/no時，全局關閉typechecked(如生產環境)'''
+
+_typecheckEnabled = os.environ.get(TYPECHECK_ENV, '').strip().lower() not in ('0', 'false', 'no')
+_moduleSwitches: Dict[str, bool] = {} #module name(prefix), enabled
+_typecheckCounters: List[Tuple[str, '_TypeCheckCounter']] = [] #function name, counter
+
+def set_typecheck_enabled(enabled:bool, module:Optional[str]=None):
+    '''
+    開啟/關閉typechecked。module為None時是全局開關，否則只對該模塊及其子模塊(如"app"包括"app.api")生效，優先於全局開關。
+    只影響之後才被裝飾的函數: 關閉時typechecked直接返回原函數，不會有任何額外開銷。
+    '''
+    global _typecheckEnabled
+    if module is None:
+        _typecheckEnabled = bool(enabled)
+    else:
+        _moduleSwitches[module] = bool(enabled)
+
+def is_typecheck_enabled(module:Optional[str]=None) -> bool:
+    '''typechecked對該模塊(None即全局)是否開啟'''
+    while module:
+        if module in _moduleSwitches:
+            return _moduleSwitches[module]
+        module = module.rpartition('.')[0]
+    return _typecheckEnabled
+
+class _TypeCheckCounter:
+    __slots__ = ('calls', 'checkNs', 'failures')
+    def __init__(self):
+        self.calls = 0
+        self.checkNs = 0
+        self.failures = 0
+
+def typecheck_stats(top:Optional[int]=None) -> List[Dict[str, Any]]:
+    '''
+    各個被typechecked裝飾的函數的檢查計數，按檢查總耗時從大到小排列，用於找出檢查太耗時的熱點函數。
+    每項為{"function", "calls", "check_time"(秒), "mean_check_ns", "failures"}
+    '''
+    stats = [{"function": name, "calls": counter.calls, "check_time": counter.checkNs / 1e9,
+              "mean_check_ns": counter.checkNs / counter.calls if counter.calls else 0.0, "failures": counter.failures}
+             for name, counter in _typecheckCounters]
+    stats.sort(key=lambda stat: stat["check_time"], reverse=True)
+    return stats if top is None else stats[:top]
+
+def reset_typecheck_stats():
+    '''reset the counters of all typechecked functions'''
+    for _, counter in _typecheckCounters:
+        counter.__init__()
+
+def typechecked(func:Optional[Callable]=None, *, strategy:Optional[CheckStrategy]=None, checkReturn:bool=True,
+                enabled:Optional[bool]=None):
+    '''
+    裝飾器，在調用時按函數的類型註解檢查傳入的參數(包括*args / **kwargs)和返回值，不符合時拋出TypeCheckError。
+    未註解的參數、以及使用預設值的參數不檢查。async函數檢查await得到的返回值。
+    註解在裝飾時解析並編譯成checker(引用了之後才定義的類型時，推遲到第一次調用)。
+    用法: @typechecked 或 @typechecked(strategy=CheckStrategy.sample(100), checkReturn=False)
+    :param strategy: 容器的檢查策略，見CheckStrategy
+    :param checkReturn: 是否檢查返回值
+    :param enabled: 為None時按set_typecheck_enabled / TYPECHECK_ENV決定。關閉時直接返回原函數
+    '''
+    if func is None:
+        return lambda function: typechecked(function, strategy=strategy, checkReturn=checkReturn, enabled=enabled)
+    if isinstance(func, (classmethod, staticmethod)):
+        return type(func)(typechecked(func.__func__, strategy=strategy, checkReturn=checkReturn, enabled=enabled))
+    if not (is_typecheck_enabled(getattr(func, '__module__', None)) if enabled is None else enabled):
+        return func
+    name = f"{func.__module__}.{func.__qualname__}"
+    counter = _TypeCheckCounter()
+    _typecheckCounters.append((name, counter))
+    checks = None # (positional, byName, varArgs, varKwargs, returns), compiled at decoration or the first call
+
+    def compileChecks():
+        nonlocal checks
+        hints = get_type_hints(func)
+        def entry(paramName, label):
+            hint = hints[paramName]
+            return (compile_checker(hint, strategy), hint, label)
+        positional, byName, varArgs, varKwargs = [], {}, None, None
+        for i, param in enumerate(inspect.signature(func).parameters.values()):
+            if param.name not in hints:
+                continue
+            label = f"{func.__qualname__}() argument '{param.name}'"
+            if param.kind is param.VAR_POSITIONAL:
+                varArgs = (i,) + entry(param.name, label) # *args start at the index of this parameter
+            elif param.kind is param.VAR_KEYWORD:
+                varKwargs = entry(param.name, label)
             else:
-                raise Exception('not supported checking type: ' + str(origin))
+                if param.kind is not param.KEYWORD_ONLY:
+                    positional.append((i,) + entry(param.name, label))
+                if param.kind is not param.POSITIONAL_ONLY:
+                    byName[param.name] = entry(param.name, label)
+        returns = entry('return', f"{func.__qualname__}() return value") if checkReturn and 'return' in hints else None
+        checks = (tuple(positional), byName, varArgs, varKwargs, returns)
+
+    def fail(hint, label, value, path=None):
+        counter.failures += 1
+        try:
+            compile_checker(hint, strategy, raiseError=True)(value)
+            error = TypeCheckError(hint, value) # sample() may pick other elements the second time
+        except TypeCheckError as e:
+            error = e
+        error.name = label
+        if path is not None:
+            error.path.insert(0, path)
+        raise error
+
+    def checkArgs(args, kwargs):
+        if checks is None:
+            compileChecks()
+        counter.calls += 1
+        start = perf_counter_ns()
+        positional, byName, varArgs, varKwargs, _ = checks
+        count = len(args)
+        for i, check, hint, label in positional:
+            if i < count and not check(args[i]):
+                fail(hint, label, args[i])
+        if varArgs is not None:
+            first, check, hint, label = varArgs
+            for i in range(first, count):
+                if not check(args[i]):
+                    fail(hint, label, args[i], f'[{i - first}]')
+        for key, value in kwargs.items():
+            checkEntry = byName.get(key, None)
+            if checkEntry is not None:
+                if not checkEntry[0](value):
+                    fail(checkEntry[1], checkEntry[2], value)
+            elif varKwargs is not None and not varKwargs[0](value):
+                fail(varKwargs[1], varKwargs[2], value, f'[{key!r}]')
+        counter.checkNs += perf_counter_ns() - start
+
+    def checkReturnValue(result):
+        returns = checks[4]
+        if returns is not None:
+            start = perf_counter_ns()
+            if not returns[0](result):
+                fail(returns[1], returns[2], result)
+            counter.checkNs += perf_counter_ns() - start
+        return result
+
+    try:
+        compileChecks()
+    except NameError:  # forward references: resolve at the first call
+        pass
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def asyncWrapper(*args, **kwargs):
+            checkArgs(args, kwargs)
+            return checkReturnValue(await func(*args, **kwargs))
+        return asyncWrapper
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        checkArgs(args, kwargs)
+        return checkReturnValue(func(*args, **kwargs))
+    return wrapper
+#endregion
 
-__all__ = ['simpleSubClassCheck', 'simpleTypeCheck']
+__all__ = ['simpleSubClassCheck', 'simpleTypeCheck', 'compile_checker', 'clear_checker_cache', 'CheckStrategy', 'TypeCheckError',
+           'typechecked', 'TYPECHECK_ENV', 'set_typecheck_enabled', 'is_typecheck_enabled', 'typecheck_stats', 'reset_typecheck_stats']
@@ -1,12 +1,41 @@
 # -*- coding: utf-8 -*-
-'''Project中常用的函數、工具等'''
+'''Project中常用的函數、工具等。子模組(及其第三方依賴，如selenium、openai、tiktoken等)在第一次訪問時才會被import'''
 
-from .GlobalValueUtils import *
-from .CryptoUtils import *
-from .TimeUtils import *
-from .NetworkUtils import *
-from .BS4Utils import *
-from .TypeUtils import *
-from .SeleniumUtils import *
-from .AI_Utils import *
-from .SQliteUtils import *
\ No newline at end of file
+from typing import TYPE_CHECKING
+from .LazyImportUtils import setupLazyImport
+
+setupLazyImport(globals(), {
+    'LazyImportUtils': ['EAGER_IMPORT_ENV', 'isEagerImport', 'setupLazyImport'],
+    'GlobalValueUtils': ['SetGlobalValue', 'GetGlobalValue', 'RemoveGlobalValue', 'ClearGlobalValue', 'GetGlobalValueKeys', 'GetGlobalValueValues',
+                         'GetGlobalValueItems', 'GetGlobalValueDict', 'HasGlobalValue', 'GetOrAddGlobalValue'],
+    'CryptoUtils': ['getMD5Hash_fromFile', 'getMD5Hash_fromString', 'checkMD5Hash_fromFile', 'checkMD5Hash_fromString', 'checkFileSame_byMD5Hash',
+                    'getSHA256Hash_fromFile', 'getSHA256Hash_fromString', 'checkSHA256Hash_fromFile', 'checkSHA256Hash_fromString',
+                    'checkFileSame_bySHA256Hash', 'getArgon2Hash_fromString', 'checkArgon2Hash_fromString', 'generateUUID', 'encrypt_file',
+                    'decrypt_file', 'hash_file', 'hash_many', 'findDuplicateFiles', 'FileHashCache',
+                    'setFileHashCache', 'getFileHashCache', 'encrypt_stream', 'decrypt_stream', 'decrypt_range', 'DecryptionError',
+                    'Argon2Hasher', 'getArgon2Hasher'],
+    'IDUtils': ['generateRandomID', 'generateSortableID', 'getSortableIDTime', 'generate_ids'],
+    'TimeUtils': ['GetTimeStamp', 'GetDateTimeFromTimeStamp', 'GetCurrentTime', 'GetCurrentTime_YYYYMMDD_HHMMSS', 'GetCurrentTime_YYYYMMDD',
+                  'GetCurrentTime_HHMMSS'],
+    'NetworkUtils': ['getLocalIP', 'getSubMask', 'checkIpInSameSubnet', 'getGlobalIP', 'get_globalIP_and_NATtype', 'NATtype'],
+    'BS4Utils': ['selfTexts', 'selfText'],
+    'TypeUtils': ['simpleSubClassCheck', 'simpleTypeCheck', 'compile_checker', 'clear_checker_cache', 'CheckStrategy', 'TypeCheckError',
+                  'typechecked', 'TYPECHECK_ENV', 'set_typecheck_enabled', 'is_typecheck_enabled', 'typecheck_stats', 'reset_typecheck_stats'],
+    'SeleniumUtils': ['ByMethod', 'ChromeCommonOption', 'ChromeOptions', 'ChromeService', 'Chrome'],
+    'AI_Utils': ['addAPIKey', 'get_tokens', 'count_tokens', 'get_embedding_vector', 'get_completion', 'get_chat', 'normalize', 'cosine_similarity'],
+    'SQliteUtils': ['Database', 'Table', 'View', 'EditableView', 'PoolTimeout', 'Page', 'InvalidPageToken', 'AsyncDatabase', 'AsyncTable', 'suggest_column_types', 'TypeTracker', 'IngestStats', 'rows_from_file', 'iter_file_rows', 'Format'],
+})
+'''名稱需與各子模組的__all__保持一致'''
+
+if TYPE_CHECKING:
+    # 只供IDE/類型檢查使用，運行時不會執行
+    from .GlobalValueUtils import *
+    from .CryptoUtils import *
+    from .IDUtils import *
+    from .TimeUtils import *
+    from .NetworkUtils import *
+    from .BS4Utils import *
+    from .TypeUtils import *
+    from .SeleniumUtils import *
+    from .AI_Utils import *
+    from .SQliteUtils import *